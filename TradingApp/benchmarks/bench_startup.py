@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark do tempo de inicialização do CLI por subcomando.
+
+Cada subcomando é executado em um interpretador novo com "python -X importtime"
+dentro de um diretório temporário (com logs/ e config/ próprios), para que o
+benchmark não altere o .bot_control nem os resultados do projeto. São medidos
+o tempo total do processo e o tempo gasto com importações.
+
+Comandos leves (stop, status, config) não devem importar pandas, numpy nem
+matplotlib; se importarem, ou se passarem do limite definido em --budget-ms,
+o script termina com código 1.
+
+Uso:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 10 --budget-ms 300
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = os.path.join(APP_DIR, 'cli.py')
+
+# Subcomando -> argumentos passados ao CLI
+COMMANDS = {
+    'help': ['--help'],
+    'stop': ['stop'],
+    'status': ['status'],
+    'config': ['config', '--show'],
+    'report': ['report'],
+    'backtest': ['backtest', '--help'],
+}
+
+# Comandos que só leem/escrevem arquivos pequenos
+LIGHT_COMMANDS = {'help', 'stop', 'status', 'config'}
+
+HEAVY_MODULES = ('pandas', 'numpy', 'matplotlib')
+
+
+def parse_importtime(stderr):
+    """
+    Interpreta a saída de "python -X importtime".
+
+    Args:
+        stderr (str): Saída de erro do processo
+
+    Returns:
+        tuple: (tempo total de importação em ms, conjunto de pacotes de topo importados)
+    """
+    total_us = 0
+    packages = set()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        total_us += int(self_us)
+        packages.add(name.strip().split('.')[0])
+    return total_us / 1000, packages
+
+
+def make_sandbox():
+    """Cria um diretório de trabalho temporário com a configuração do projeto."""
+    sandbox = tempfile.mkdtemp(prefix='bench_startup_')
+    os.makedirs(os.path.join(sandbox, 'logs'))
+    shutil.copytree(os.path.join(APP_DIR, 'config'), os.path.join(sandbox, 'config'))
+    return sandbox
+
+
+def bench_command(argv, sandbox, repeat):
+    """
+    Executa um subcomando várias vezes e mede o tempo de inicialização.
+
+    Args:
+        argv (list): Argumentos do CLI
+        sandbox (str): Diretório de trabalho
+        repeat (int): Número de execuções
+
+    Returns:
+        dict: wall_ms e import_ms (medianas) e os pacotes pesados importados
+    """
+    wall, imports, packages = [], [], set()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-X', 'importtime', CLI, *argv], cwd=sandbox,
+                                stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                stderr=subprocess.PIPE, text=True)
+        wall.append((time.perf_counter() - start) * 1000)
+        import_ms, loaded = parse_importtime(result.stderr)
+        imports.append(import_ms)
+        packages |= loaded
+
+    return {
+        'wall_ms': statistics.median(wall),
+        'import_ms': statistics.median(imports),
+        'heavy': sorted(packages.intersection(HEAVY_MODULES)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='CLI startup time benchmark')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Runs per subcommand (the median is reported)')
+    parser.add_argument('--budget-ms', type=float,
+                        help='Maximum wall time allowed for light subcommands')
+    parser.add_argument('commands', nargs='*', metavar='command',
+                        help=f"Subcommands to benchmark: {', '.join(COMMANDS)} (default: all)")
+    args = parser.parse_args()
+    unknown = [name for name in args.commands if name not in COMMANDS]
+    if unknown:
+        parser.error(f"unknown subcommand(s): {', '.join(unknown)}")
+
+    sandbox = make_sandbox()
+    failures = []
+    try:
+        print(f"{'command':<10} {'wall (ms)':>10} {'imports (ms)':>13}  heavy modules")
+        for name in args.commands or COMMANDS:
+            stats = bench_command(COMMANDS[name], sandbox, args.repeat)
+            print(f"{name:<10} {stats['wall_ms']:10.1f} {stats['import_ms']:13.1f}  "
+                  f"{', '.join(stats['heavy']) or '-'}")
+
+            if name in LIGHT_COMMANDS:
+                if stats['heavy']:
+                    failures.append(f"{name} imports {', '.join(stats['heavy'])}")
+                if args.budget_ms and stats['wall_ms'] > args.budget_ms:
+                    failures.append(f"{name} took {stats['wall_ms']:.1f} ms (budget {args.budget_ms:.1f} ms)")
+    finally:
+        shutil.rmtree(sandbox, ignore_errors=True)
+
+    for failure in failures:
+        print(f"REGRESSION: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
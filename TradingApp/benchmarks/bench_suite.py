@@ -0,0 +1,321 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark dos caminhos críticos do backtest, das métricas e do monitor.
+
+Cada componente roda sobre dados sintéticos com semente fixa, em tamanhos
+crescentes (barras ou trades), e reporta a vazão (unidades/s, melhor de
+--repeat execuções) e o pico de memória alocada (tracemalloc, em uma
+execução separada para não distorcer o tempo).
+
+Os resultados podem ser comparados com uma linha de base salva em JSON:
+vazão abaixo de (1 - tolerância) da base ou memória acima de
+(1 + tolerância) contam como regressão e o script termina com código 1.
+A linha de base depende da máquina; gere uma no ambiente onde a
+comparação vai rodar.
+
+Uso:
+    python benchmarks/bench_suite.py
+    python benchmarks/bench_suite.py --profile full apply_strategy
+    python benchmarks/bench_suite.py --save-baseline
+    python benchmarks/bench_suite.py --tolerance 0.3 --json results.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+import numpy as np  # noqa: E402
+
+from src.backtesting import Backtest  # noqa: E402
+from src.performance_monitor import PerformanceMonitor  # noqa: E402
+from src.strategies import MovingAverageCrossover  # noqa: E402
+from src.synthetic import generate_ohlcv  # noqa: E402
+
+BASELINE_FILE = os.path.join(APP_DIR, 'benchmarks', 'baseline.json')
+
+SEED = 42
+
+# Tamanhos por perfil: barras para os componentes de backtest, trades para os demais
+PROFILES = {
+    'quick': {'bars': [1_000, 10_000], 'trades': [100, 1_000]},
+    'default': {'bars': [1_000, 100_000, 1_000_000], 'trades': [100, 10_000, 100_000]},
+    'full': {'bars': [1_000, 100_000, 1_000_000, 10_000_000], 'trades': [100, 10_000, 100_000, 1_000_000]},
+}
+
+SYMBOLS = ['SOL/USDT', 'MATIC/USDT', 'AVAX/USDT']
+
+
+def make_bars(n, seed=SEED):
+    """Candles de 5m com semente fixa (src.synthetic)."""
+    return generate_ohlcv(n_bars=n, timeframe='5m', seed=seed)
+
+
+def make_trades(n, seed=SEED):
+    """
+    Trades sem sobreposição sobre 4 barras cada, com os candles correspondentes.
+
+    Returns:
+        tuple: (pandas.DataFrame de candles, lista de trades do Backtest)
+    """
+    data = make_bars(4 * n, seed)
+    close = data['close'].to_numpy()
+    timestamps = data['timestamp']
+    entries = np.arange(n) * 4
+    exits = entries + 2
+    profits = (close[exits] - close[entries]) / close[entries] * 100
+    trades = [
+        {'entry_time': entry_time, 'entry_price': entry_price, 'exit_time': exit_time,
+         'exit_price': exit_price, 'profit_pct': profit_pct, 'exit_reason': 'signal'}
+        for entry_time, entry_price, exit_time, exit_price, profit_pct in zip(
+            timestamps.iloc[entries], close[entries].tolist(), timestamps.iloc[exits],
+            close[exits].tolist(), profits.tolist())
+    ]
+    return data, trades
+
+
+def make_journal_records(n, seed=SEED):
+    """Operações de venda como as registradas pelo bot ao vivo."""
+    rng = np.random.default_rng(seed)
+    profits = rng.normal(0.1, 1.0, n).round(4).tolist()
+    start = np.datetime64('2024-01-01T00:00:00')
+    stamps = (start + np.arange(n) * np.timedelta64(60, 's')).astype(str).tolist()
+    return [{'type': 'sell', 'symbol': SYMBOLS[i % len(SYMBOLS)], 'profit': profit, 'timestamp': stamp}
+            for i, (profit, stamp) in enumerate(zip(profits, stamps))]
+
+
+# Cada componente recebe o tamanho e devolve (preparo, execução): o preparo
+# roda fora da medição e entrega os argumentos para a execução cronometrada.
+
+def bench_apply_strategy(n):
+    data = make_bars(n)
+    backtest = Backtest({'backtest': {'indicator_cache': {'enabled': False}}})
+    strategy = MovingAverageCrossover(9, 21)
+    return lambda: backtest.apply_strategy(data, strategy)
+
+
+def bench_apply_strategy_exits(n):
+    data = make_bars(n)
+    backtest = Backtest({'risk': {'stop_loss_pct': 1.0, 'take_profit_pct': 2.0},
+                         'backtest': {'indicator_cache': {'enabled': False}}})
+    strategy = MovingAverageCrossover(9, 21)
+    return lambda: backtest.apply_strategy(data, strategy)
+
+
+def bench_calculate_metrics(n):
+    data, trades = make_trades(n)
+    backtest = Backtest({'trading': {'timeframe': '5m'}})
+    return lambda: backtest.calculate_metrics(trades, 10000, data)
+
+
+class _MonitorRun:
+    """Monitor em diretório temporário, recriado a cada execução."""
+
+    def __init__(self, records, preload):
+        self.records = records
+        self.preload = preload
+        self.directory = None
+
+    def setup(self):
+        self.directory = tempfile.mkdtemp(prefix='bench_monitor_')
+        monitor = PerformanceMonitor(self.directory, async_writes=not self.preload)
+        if self.preload:
+            monitor.journal.append_many(self.records)
+        return monitor
+
+    def cleanup(self, monitor):
+        monitor.close()
+        monitor.journal.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def bench_record_trade(n):
+    run = _MonitorRun(make_journal_records(n), preload=False)
+
+    def execute(monitor):
+        for record in run.records:
+            monitor.record_trade(record)
+        monitor.flush()
+    return run, execute
+
+
+def bench_generate_performance_report(n):
+    run = _MonitorRun(make_journal_records(n), preload=True)
+    return run, lambda monitor: monitor.generate_performance_report()
+
+
+# Componente -> (função de preparo, tipo de tamanho, unidade)
+COMPONENTS = {
+    'apply_strategy': (bench_apply_strategy, 'bars', 'bars/s'),
+    'apply_strategy_exits': (bench_apply_strategy_exits, 'bars', 'bars/s'),
+    'calculate_metrics': (bench_calculate_metrics, 'trades', 'trades/s'),
+    'record_trade': (bench_record_trade, 'trades', 'trades/s'),
+    'generate_performance_report': (bench_generate_performance_report, 'trades', 'trades/s'),
+}
+
+
+def _timed(prepared):
+    """Executa uma vez e devolve o tempo em segundos."""
+    if isinstance(prepared, tuple):
+        run, execute = prepared
+        monitor = run.setup()
+        try:
+            start = time.perf_counter()
+            execute(monitor)
+            return time.perf_counter() - start
+        finally:
+            run.cleanup(monitor)
+
+    start = time.perf_counter()
+    prepared()
+    return time.perf_counter() - start
+
+
+def measure(component, size, repeat=3, memory=True):
+    """
+    Mede um componente em um tamanho.
+
+    Args:
+        component (str): Nome em COMPONENTS
+        size (int): Número de barras ou de trades
+        repeat (int): Execuções cronometradas após o aquecimento (vale a mais rápida)
+        memory (bool): Mede o pico de memória em uma execução extra
+
+    Returns:
+        dict: seconds, throughput e peak_mb (None sem memória)
+    """
+    setup, _, _ = COMPONENTS[component]
+    prepared = setup(size)
+
+    # Execução de aquecimento: importações tardias, fontes do matplotlib e caches do SO
+    _timed(prepared)
+    gc.collect()
+    seconds = min(_timed(prepared) for _ in range(repeat))
+
+    peak_mb = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            _timed(prepared)
+            peak_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        finally:
+            tracemalloc.stop()
+
+    return {'seconds': seconds, 'throughput': size / seconds if seconds > 0 else float('inf'), 'peak_mb': peak_mb}
+
+
+def environment():
+    """Descrição do ambiente salva com a linha de base."""
+    import pandas as pd
+
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compara os resultados com a linha de base.
+
+    Args:
+        results (dict): Chave 'componente:tamanho' -> medição
+        baseline (dict): Mesmo formato, salvo anteriormente
+        tolerance (float): Variação relativa aceita
+
+    Returns:
+        list: Descrição de cada regressão
+    """
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        if result['throughput'] < base['throughput'] * (1 - tolerance):
+            regressions.append(f"{key} throughput {result['throughput']:,.0f}/s "
+                               f"vs baseline {base['throughput']:,.0f}/s")
+        if result['peak_mb'] is not None and base.get('peak_mb') is not None \
+                and result['peak_mb'] > base['peak_mb'] * (1 + tolerance) and result['peak_mb'] - base['peak_mb'] > 1:
+            regressions.append(f"{key} peak memory {result['peak_mb']:.1f} MB vs baseline {base['peak_mb']:.1f} MB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backtest, metrics and monitor benchmark suite')
+    parser.add_argument('--profile', default='default', choices=sorted(PROFILES),
+                        help='Dataset sizes (quick, default or full: up to 10M bars and 1M trades)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Timed runs per case (the fastest is reported)')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='Skip the traced run that measures peak memory')
+    parser.add_argument('--baseline', default=BASELINE_FILE,
+                        help='Baseline JSON to compare against')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Store these results as the new baseline instead of comparing')
+    parser.add_argument('--tolerance', type=float, default=0.3,
+                        help='Allowed relative slowdown / memory growth before failing')
+    parser.add_argument('--json', dest='json_file',
+                        help='Also write the results to this JSON file')
+    parser.add_argument('components', nargs='*', metavar='component',
+                        help=f"Components to benchmark: {', '.join(COMPONENTS)} (default: all)")
+    args = parser.parse_args()
+    unknown = [name for name in args.components if name not in COMPONENTS]
+    if unknown:
+        parser.error(f"unknown component(s): {', '.join(unknown)}")
+
+    results = {}
+    print(f"{'component':<28} {'size':>10} {'seconds':>9} {'throughput':>16} {'peak (MB)':>10}")
+    for name in args.components or COMPONENTS:
+        _, kind, unit = COMPONENTS[name]
+        for size in PROFILES[args.profile][kind]:
+            result = measure(name, size, args.repeat, memory=not args.no_memory)
+            results[f"{name}:{size}"] = result
+            peak = f"{result['peak_mb']:10.1f}" if result['peak_mb'] is not None else f"{'-':>10}"
+            print(f"{name:<28} {size:>10,} {result['seconds']:9.3f} {result['throughput']:>10,.0f} {unit:<5} {peak}")
+
+    if args.json_file:
+        with open(args.json_file, 'w') as f:
+            json.dump({'environment': environment(), 'results': results}, f, indent=2)
+
+    if args.save_baseline:
+        baseline = {'environment': environment(), 'results': {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline['results'] = json.load(f).get('results', {})
+        baseline['results'].update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get('environment') != environment():
+        print(f"WARNING: baseline recorded on {baseline.get('environment')}, running on {environment()}")
+
+    regressions = compare(results, baseline.get('results', {}), args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,11 +7,10 @@ import os
 import logging
 from datetime import datetime
 
-# Importações dos outros módulos do projeto
-from config import load_config, save_config
-from main import TradingBot
-from performance_monitor import PerformanceMonitor
-from src.backtest import Backtest
+# Importações dos outros módulos do projeto. Módulos que dependem de pandas,
+# numpy ou matplotlib são importados dentro dos subcomandos que os usam, para
+# que comandos simples como "stop" e "status" iniciem em milissegundos.
+from src.config import load_config, save_config
 
 # Configuração de logging
 logging.basicConfig(
@@ -68,6 +67,38 @@ def parse_arguments():
                                 help='Start date (YYYY-MM-DD)')
     backtest_parser.add_argument('--to', dest='to_date', type=str, required=True,
                                 help='End date (YYYY-MM-DD)')
+    backtest_parser.add_argument('--sweep', action='store_true',
+                                help='Run a parameter sweep using the "sweep" section of the configuration')
+    backtest_parser.add_argument('--walk-forward', action='store_true',
+                                help='Walk-forward optimization over the "sweep" section of the configuration')
+    backtest_parser.add_argument('--train-bars', type=int, default=5000,
+                                help='Training bars per walk-forward fold')
+    backtest_parser.add_argument('--test-bars', type=int, default=1000,
+                                help='Test bars per walk-forward fold')
+    backtest_parser.add_argument('--anchored', action='store_true',
+                                help='Anchor every walk-forward training window at the first bar')
+    backtest_parser.add_argument('--symbol', type=str,
+                                help='Symbol for the sweep (default: first trading pair)')
+    backtest_parser.add_argument('--samples', type=int,
+                                help='Random search with this many combinations instead of the full grid')
+    backtest_parser.add_argument('--workers', type=int,
+                                help='Number of worker processes (default: CPU count)')
+    backtest_parser.add_argument('--rank-by', type=str, default='sharpe_ratio',
+                                help='Metric used to rank sweep results')
+    backtest_parser.add_argument('--top', type=int, default=20,
+                                help='Number of sweep results to display')
+    backtest_parser.add_argument('--seed', type=int,
+                                help='Seed for the random search')
+    backtest_parser.add_argument('--all-pairs', action='store_true',
+                                help='Backtest every configured trading pair concurrently')
+    backtest_parser.add_argument('--capital', type=float, default=10000,
+                                help='Initial capital, split evenly across pairs with --all-pairs')
+    backtest_parser.add_argument('--portfolio', action='store_true',
+                                help='Backtest every configured pair as one portfolio with shared cash')
+    backtest_parser.add_argument('--max-positions', type=int,
+                                help='Maximum simultaneous positions with --portfolio')
+    backtest_parser.add_argument('--allocation', type=str, choices=['per_symbol', 'equal_slots', 'max_position_size'],
+                                help='Position sizing rule with --portfolio')
     
     return parser.parse_args()
 
@@ -75,6 +106,8 @@ def start_bot(args):
     """Inicia o bot de trading."""
     logger.info("Starting trading bot...")
     try:
+        from main import TradingBot
+        
         config = load_config(args.config)
         bot = TradingBot(config, paper_trading=args.paper)
         bot.start()
@@ -115,6 +148,22 @@ def check_status():
                 print(f"Bot status: UNKNOWN ({status})")
         else:
             print("Bot status: NOT INITIALIZED")
+        
+        # Resumo de desempenho a partir dos agregados do diário (sem ler o histórico).
+        # O diário é aberto só para leitura: status não cria, migra nem exporta nada
+        trades_db = os.path.join("results", "trades.db")
+        if os.path.exists(trades_db):
+            from src.performance_monitor import TradeJournal
+            
+            journal = TradeJournal(trades_db, read_only=True)
+            try:
+                performance = journal.aggregates()
+            finally:
+                journal.close()
+            if performance['total_trades']:
+                print(f"Trades: {performance['total_trades']} | Win Rate: {performance['win_rate']:.2f}% | "
+                      f"Total Profit: {performance['total_profit']:.2f} USDT | "
+                      f"Capital: {performance['current_capital']:.2f} USDT")
     except Exception as e:
         logger.error(f"Failed to check bot status: {str(e)}")
         sys.exit(1)
@@ -166,6 +215,8 @@ def generate_report(args):
     """Gera um relatório de desempenho."""
     logger.info(f"Generating performance report from {args.from_date} to {args.to_date}...")
     try:
+        from src.performance_monitor import PerformanceMonitor
+        
         from_date = datetime.strptime(args.from_date, "%Y-%m-%d") if args.from_date else None
         to_date = datetime.strptime(args.to_date, "%Y-%m-%d") if args.to_date else datetime.now()
         
@@ -184,10 +235,160 @@ def generate_report(args):
         logger.error(f"Failed to generate report: {str(e)}")
         sys.exit(1)
 
+def run_sweep_backtest(args):
+    """Executa o sweep de parâmetros e mostra o ranking das combinações."""
+    logger.info(f"Running parameter sweep from {args.from_date} to {args.to_date}...")
+    try:
+        from src.backtesting import Backtest
+        from src.optimizer import run_sweep
+        
+        config = load_config(args.config)
+        from_date = datetime.strptime(args.from_date, "%Y-%m-%d")
+        to_date = datetime.strptime(args.to_date, "%Y-%m-%d")
+        symbol = args.symbol or config['trading']['pairs'][0]
+        
+        # Dados carregados uma única vez e compartilhados com os workers
+        data = Backtest(config).load_historical_data(symbol, from_date, to_date)
+        results = run_sweep(config, data, config['sweep'], samples=args.samples, workers=args.workers,
+                            rank_by=args.rank_by, seed=args.seed)
+        
+        print(f"\nSweep Results for {symbol} (ranked by {args.rank_by}):")
+        print(results.head(args.top).to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+        
+        cache = results.attrs.get('indicator_cache')
+        if cache:
+            print(f"\nIndicator cache: {cache['hits'] + cache['disk_hits']} hits, {cache['misses']} misses, "
+                  f"{cache['evictions']} evictions, {cache['saved_seconds']:.2f}s saved")
+        
+        output_file = f"sweep_{symbol.replace('/', '')}_{args.from_date}_to_{args.to_date}.csv"
+        results.to_csv(output_file, index=False)
+        
+        logger.info(f"Sweep completed successfully! Full results saved to {output_file}")
+    except Exception as e:
+        logger.error(f"Failed to run sweep: {str(e)}")
+        sys.exit(1)
+
+def run_walk_forward_backtest(args):
+    """Executa a otimização walk-forward e mostra as métricas por fold."""
+    logger.info(f"Running walk-forward optimization from {args.from_date} to {args.to_date}...")
+    try:
+        from src.backtesting import Backtest
+        from src.walk_forward import run_walk_forward
+        
+        config = load_config(args.config)
+        from_date = datetime.strptime(args.from_date, "%Y-%m-%d")
+        to_date = datetime.strptime(args.to_date, "%Y-%m-%d")
+        symbol = args.symbol or config['trading']['pairs'][0]
+        
+        data = Backtest(config).load_historical_data(symbol, from_date, to_date)
+        results = run_walk_forward(config, data, config['sweep'], args.train_bars, args.test_bars,
+                                   anchored=args.anchored, samples=args.samples, workers=args.workers,
+                                   initial_capital=args.capital, rank_by=args.rank_by, seed=args.seed)
+        
+        folds = results['folds']
+        print(f"\nWalk-Forward Results for {symbol} ({len(folds)} folds, optimized for {args.rank_by}):")
+        print(folds.to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+        
+        metrics = results['metrics']
+        print("\nOut-of-Sample Summary:")
+        print(f"Profit/Loss: {metrics['profit_loss']:.2f}%")
+        print(f"Max Drawdown: {metrics['max_drawdown']:.2f}%")
+        print(f"Sharpe Ratio: {metrics['sharpe_ratio']:.2f}")
+        
+        output_file = f"walkforward_{symbol.replace('/', '')}_{args.from_date}_to_{args.to_date}.csv"
+        folds.to_csv(output_file, index=False)
+        results['equity_curve'].to_csv(output_file.replace('.csv', '_equity.csv'))
+        
+        logger.info(f"Walk-forward completed successfully! Fold table saved to {output_file}")
+    except Exception as e:
+        logger.error(f"Failed to run walk-forward: {str(e)}")
+        sys.exit(1)
+
+def run_multi_backtest(args):
+    """Executa o backtest de todos os pares configurados em paralelo."""
+    logger.info(f"Running multi-symbol backtest from {args.from_date} to {args.to_date}...")
+    try:
+        from src.backtesting import run_multi_symbol_backtest
+        from src.strategies import create_strategy
+        
+        config = load_config(args.config)
+        from_date = datetime.strptime(args.from_date, "%Y-%m-%d")
+        to_date = datetime.strptime(args.to_date, "%Y-%m-%d")
+        
+        results = run_multi_symbol_backtest(config, create_strategy(config), from_date, to_date,
+                                            initial_capital=args.capital, max_workers=args.workers)
+        
+        print("\nBacktest Results per Symbol:")
+        for symbol, result in results['per_symbol'].items():
+            metrics = result['metrics']
+            print(f"{symbol:>12}: {metrics['total_trades']:5d} trades | Win Rate: {metrics['win_rate']:6.2f}% | "
+                  f"P/L: {metrics['profit_loss']:8.2f}% | Max DD: {metrics['max_drawdown']:6.2f}% | "
+                  f"Sharpe: {metrics['sharpe_ratio']:6.2f}")
+        
+        summary = results['summary']
+        print("\nCombined Summary:")
+        print(f"Symbols: {summary['symbols']}")
+        print(f"Total Trades: {summary['total_trades']}")
+        print(f"Win Rate: {summary['win_rate']:.2f}%")
+        print(f"Profit/Loss: {summary['profit_loss']:.2f}%")
+        print(f"Final Capital: {summary['final_capital']:.2f}")
+        print(f"Worst Max Drawdown: {summary['worst_max_drawdown']:.2f}%")
+        print(f"Best / Worst Symbol: {summary['best_symbol']} / {summary['worst_symbol']}")
+        
+        logger.info("Multi-symbol backtest completed successfully!")
+    except Exception as e:
+        logger.error(f"Failed to run multi-symbol backtest: {str(e)}")
+        sys.exit(1)
+
+def run_portfolio_backtest(args):
+    """Executa o backtest de todos os pares como uma carteira com caixa compartilhado."""
+    logger.info(f"Running portfolio backtest from {args.from_date} to {args.to_date}...")
+    try:
+        from src.portfolio import run_portfolio_backtest as run_portfolio
+        from src.strategies import create_strategy
+        
+        config = load_config(args.config)
+        from_date = datetime.strptime(args.from_date, "%Y-%m-%d")
+        to_date = datetime.strptime(args.to_date, "%Y-%m-%d")
+        
+        results = run_portfolio(config, create_strategy(config), from_date, to_date,
+                                initial_capital=args.capital, max_positions=args.max_positions,
+                                allocation=args.allocation)
+        
+        metrics = results['metrics']
+        print("\nPortfolio Backtest Results:")
+        print(f"Total Trades: {metrics['total_trades']} ({metrics['skipped_trades']} entries skipped)")
+        print(f"Win Rate: {metrics['win_rate']:.2f}%")
+        print(f"Profit/Loss: {metrics['profit_loss']:.2f}%")
+        print(f"Final Capital: {metrics['final_capital']:.2f}")
+        print(f"Max Drawdown: {metrics['max_drawdown']:.2f}%")
+        print(f"Sharpe Ratio: {metrics['sharpe_ratio']:.2f}")
+        print(f"Max Open Positions: {metrics['max_open_positions']}")
+        
+        logger.info("Portfolio backtest completed successfully!")
+    except Exception as e:
+        logger.error(f"Failed to run portfolio backtest: {str(e)}")
+        sys.exit(1)
+
 def run_backtest(args):
     """Executa um backtest com os parâmetros definidos."""
+    if args.sweep:
+        run_sweep_backtest(args)
+        return
+    if args.walk_forward:
+        run_walk_forward_backtest(args)
+        return
+    if args.portfolio:
+        run_portfolio_backtest(args)
+        return
+    if args.all_pairs:
+        run_multi_backtest(args)
+        return
+    
     logger.info(f"Running backtest from {args.from_date} to {args.to_date}...")
     try:
+        from main import TradingBot
+        
         config = load_config(args.config)
         from_date = datetime.strptime(args.from_date, "%Y-%m-%d")
         to_date = datetime.strptime(args.to_date, "%Y-%m-%d")
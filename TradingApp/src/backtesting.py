@@ -3,26 +3,58 @@
 
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
 import logging
-import matplotlib.pyplot as plt
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
+from .data_store import OHLCVStore
+from .metrics import (RISK_FREE_RATE, compute_metrics, equity_curve, exit_marks, max_drawdown_stats,
+                      position_from_trades)
+from .exits import EXIT_SIGNAL, simulate_exits
+from .indicator_cache import cache_from_config
+from .indicators import compute_indicators
+from .strategies import SIGNAL_BUY, SIGNAL_HOLD, SIGNAL_SELL, Bar
+from .synthetic import generate_ohlcv
+from .timeframes import infer_periods_per_year
+
 logger = logging.getLogger("TradingBot-Backtest")
 
+# Sinais dos protocolos por barra ('BUY'/'SELL'/None) no formato da coluna de sinais
+SIGNAL_CODES = {'BUY': SIGNAL_BUY, 'SELL': SIGNAL_SELL}
+
+def _pyplot():
+    """Importa o pyplot sob demanda com o backend não interativo Agg."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
 class Backtest:
     """Classe para realizar backtests da estratégia de trading."""
     
-    def __init__(self, config, data_provider=None):
+    def __init__(self, config, data_provider=None, indicator_cache=None):
         """
         Inicializa o módulo de backtest.
         
         Args:
             config (dict): Configuração do backtest
             data_provider: Provedor de dados históricos
+            indicator_cache (IndicatorCache, optional): Cache de indicadores
+                (padrão: o cache do processo definido em backtest.indicator_cache)
         """
         self.config = config
         self.data_provider = data_provider
+        self.indicator_cache = indicator_cache if indicator_cache is not None else cache_from_config(config)
+        self.store = OHLCVStore(config.get('backtest', {}).get('data_dir', 'data_cache'))
+        self.timeframe = config.get('trading', {}).get('timeframe', '1d')
+        risk = config.get('risk', {})
+        self.stop_loss_pct = risk.get('stop_loss_pct')
+        self.take_profit_pct = risk.get('take_profit_pct')
+        self.both_touched = risk.get('both_touched', 'stop_first')
         self.results = {
             'trades': [],
             'equity_curve': [],
@@ -47,105 +79,227 @@ class Backtest:
         # Implementação alternativa (exemplo)
         # Na prática, você conectaria com uma API ou banco de dados
         try:
-            # Verifica se temos dados em cache
-            cache_file = Path(f"data_cache/{symbol}_{from_date.strftime('%Y%m%d')}_{to_date.strftime('%Y%m%d')}.csv")
+            # Verifica se o intervalo já está no armazenamento colunar
+            timeframe = self.timeframe
+            if self.store.covers(symbol, timeframe, from_date, to_date):
+                logger.info(f"Loading stored data for {symbol} ({timeframe}) from {self.store.root}")
+                return self.store.read(symbol, timeframe, from_date, to_date)
             
-            if cache_file.exists():
-                logger.info(f"Loading cached data for {symbol} from {cache_file}")
-                return pd.read_csv(cache_file, parse_dates=['timestamp'])
+            # Importa o cache CSV antigo, se existir
+            legacy_file = self.store.root / Path(f"{symbol}_{from_date.strftime('%Y%m%d')}_{to_date.strftime('%Y%m%d')}.csv")
+            if legacy_file.exists():
+                logger.info(f"Importing legacy cached data for {symbol} from {legacy_file}")
+                self.store.update(symbol, timeframe, pd.read_csv(legacy_file, parse_dates=['timestamp']))
+                return self.store.read(symbol, timeframe, from_date, to_date)
             
             # Se não, cria dados sintéticos para demonstração
             logger.warning(f"No data provider configured. Using synthetic data for {symbol}")
             
-            # Cria uma série temporal com valores sintéticos
-            days = (to_date - from_date).days + 1
-            dates = [from_date + timedelta(days=i) for i in range(days)]
-            
-            # Preços sintéticos com alguma volatilidade
-            base_price = 100.0
-            prices = [base_price]
-            
-            for i in range(1, days):
-                # Adiciona um movimento aleatório de até ±2%
-                change = np.random.normal(0, 0.02)
-                new_price = prices[-1] * (1 + change)
-                prices.append(new_price)
+            # Série sintética no timeframe configurado; a semente opcional é
+            # combinada com o símbolo para que cada par tenha sua própria série
+            synthetic_config = dict(self.config.get('backtest', {}).get('synthetic', {}))
+            seed = synthetic_config.pop('seed', None)
+            data = generate_ohlcv(
+                timeframe=timeframe,
+                start=from_date,
+                end=to_date,
+                seed=None if seed is None else [seed, zlib.crc32(symbol.encode())],
+                **synthetic_config
+            )
             
-            # Cria DataFrame
-            data = pd.DataFrame({
-                'timestamp': dates,
-                'open': prices,
-                'high': [p * (1 + abs(np.random.normal(0, 0.01))) for p in prices],
-                'low': [p * (1 - abs(np.random.normal(0, 0.01))) for p in prices],
-                'close': [p * (1 + np.random.normal(0, 0.005)) for p in prices],
-                'volume': [abs(np.random.normal(1000000, 200000)) for _ in prices]
-            })
+            # Salva no armazenamento; intervalos sobrepostos reutilizam o mesmo arquivo
+            self.store.update(symbol, timeframe, data)
             
-            # Assegura que os diretórios existam
-            cache_file.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Salva para cache
-            data.to_csv(cache_file, index=False)
-            
-            return data
+            return self.store.read(symbol, timeframe, from_date, to_date)
             
         except Exception as e:
             logger.error(f"Error loading historical data: {str(e)}")
             raise
     
-    def apply_strategy(self, data, strategy):
+    def apply_strategy(self, data, strategy, indicators=None):
         """
         Aplica a estratégia de trading aos dados históricos.
         
         Args:
             data (pandas.DataFrame): Dados históricos
             strategy: Estratégia de trading a ser aplicada
+            indicators (dict, optional): Indicadores pré-calculados e alinhados com data
             
         Returns:
             list: Lista de trades gerados
         """
-        trades = []
-        position = None
+        signals = self.compute_signals(data, strategy, indicators)
+        return self._make_trades(data, *self.trade_indices(data, signals))
+    
+    def compute_signals(self, data, strategy, indicators=None):
+        """
+        Calcula a coluna de sinais da estratégia.
+        
+        Estratégias que implementam generate_signals(data) são avaliadas de
+        forma vetorizada; as que implementam on_bar(bar) recebem uma barra
+        por vez; as demais seguem pelo caminho antigo com generate_signal(data).
+        Os indicadores declarados em required_indicators vêm do cache de
+        indicadores quando não são informados.
+        
+        Args:
+            data (pandas.DataFrame): Dados históricos
+            strategy: Estratégia de trading
+            indicators (dict, optional): Indicadores pré-calculados e alinhados
+                com data (ver required_indicators da estratégia)
+            
+        Returns:
+            numpy.ndarray: Sinais por barra (SIGNAL_BUY, SIGNAL_SELL, SIGNAL_HOLD)
+        """
+        if hasattr(strategy, 'generate_signals'):
+            if hasattr(strategy, 'required_indicators'):
+                if indicators is None and self.indicator_cache is not None:
+                    indicators = compute_indicators(data['close'].to_numpy(dtype=float),
+                                                    strategy.required_indicators(), self.indicator_cache)
+                if indicators is not None:
+                    return np.asarray(strategy.generate_signals(data, indicators), dtype=np.int8)
+            return np.asarray(strategy.generate_signals(data), dtype=np.int8)
+        if hasattr(strategy, 'on_bar'):
+            return self._stream_signals(data, strategy)
         
+        signals = np.zeros(len(data), dtype=np.int8)
         for i in range(len(data)):
-            signal = strategy.generate_signal(data.iloc[:i+1])
+            signals[i] = SIGNAL_CODES.get(strategy.generate_signal(data.iloc[:i+1]), SIGNAL_HOLD)
+        return signals
+    
+    def trade_indices(self, data, signals):
+        """
+        Localiza entradas e saídas a partir da coluna de sinais.
+        
+        Com risk.stop_loss_pct ou risk.take_profit_pct configurados, as saídas
+        também acontecem intrabar quando a máxima/mínima toca os níveis.
+        
+        Args:
+            data (pandas.DataFrame): Dados históricos
+            signals (numpy.ndarray): Sinais por barra
             
-            if signal == 'BUY' and position is None:
-                entry_price = data.iloc[i]['close']
-                entry_time = data.iloc[i]['timestamp']
-                position = {'entry_price': entry_price, 'entry_time': entry_time}
-                
-            elif signal == 'SELL' and position is not None:
-                exit_price = data.iloc[i]['close']
-                exit_time = data.iloc[i]['timestamp']
-                
-                profit_pct = (exit_price - position['entry_price']) / position['entry_price'] * 100
-                
-                trade = {
-                    'entry_time': position['entry_time'],
-                    'entry_price': position['entry_price'],
-                    'exit_time': exit_time,
-                    'exit_price': exit_price,
-                    'profit_pct': profit_pct
-                }
-                
-                trades.append(trade)
-                position = None
-        
-        return trades
+        Returns:
+            tuple: (entradas, saídas, preços de saída, motivos)
+        """
+        if self.stop_loss_pct or self.take_profit_pct:
+            return self._apply_exits(data, signals)
+        return self._apply_vectorized(data, signals)
+    
+    def _stream_signals(self, data, strategy):
+        """
+        Alimenta a estratégia barra a barra sem fatiar o DataFrame.
+        
+        Args:
+            data (pandas.DataFrame): Dados históricos
+            strategy: Estratégia com on_bar(bar)
+            
+        Returns:
+            numpy.ndarray: Sinais por barra
+        """
+        if hasattr(strategy, 'reset'):
+            strategy.reset()
+        
+        timestamps = data['timestamp'].tolist()
+        columns = [data[col].to_numpy(dtype=float).tolist() for col in ('open', 'high', 'low', 'close', 'volume')]
+        
+        signals = np.zeros(len(data), dtype=np.int8)
+        for i, values in enumerate(zip(timestamps, *columns)):
+            signals[i] = SIGNAL_CODES.get(strategy.on_bar(Bar._make(values)), SIGNAL_HOLD)
+        return signals
     
-    def calculate_metrics(self, trades, initial_capital=10000):
+    def _make_trades(self, data, entries, exits, exit_prices, reasons):
+        """Monta a lista de trades a partir dos índices de entrada e saída."""
+        close = data['close'].to_numpy(dtype=float)
+        timestamps = data['timestamp']
+        entry_prices = close[entries]
+        profits = (exit_prices - entry_prices) / entry_prices * 100
+        
+        return [
+            {
+                'entry_time': entry_time,
+                'entry_price': entry_price,
+                'exit_time': exit_time,
+                'exit_price': exit_price,
+                'profit_pct': profit_pct,
+                'exit_reason': reason
+            }
+            for entry_time, entry_price, exit_time, exit_price, profit_pct, reason in zip(
+                timestamps.iloc[entries], entry_prices.tolist(),
+                timestamps.iloc[exits], exit_prices.tolist(), profits.tolist(), reasons
+            )
+        ]
+    
+    def _apply_vectorized(self, data, signals):
+        """
+        Calcula entradas e saídas a partir da coluna de sinais inteira.
+        
+        Args:
+            data (pandas.DataFrame): Dados históricos
+            signals (numpy.ndarray): Sinais por barra
+            
+        Returns:
+            tuple: (entradas, saídas, preços de saída, motivos)
+        """
+        # Propaga o último sinal não neutro: 1 = posicionado, -1/0 = fora.
+        # Um BUY com posição aberta ou um SELL sem posição não muda o estado.
+        active = np.flatnonzero(signals)
+        last_signal = np.zeros(len(signals), dtype=np.int8)
+        if len(active):
+            filler = np.zeros(len(signals), dtype=np.intp)
+            filler[active] = active
+            np.maximum.accumulate(filler, out=filler)
+            last_signal[active[0]:] = signals[filler[active[0]:]]
+        
+        in_position = last_signal == SIGNAL_BUY
+        changes = np.diff(in_position.astype(np.int8), prepend=0)
+        entries = np.flatnonzero(changes == 1)
+        exits = np.flatnonzero(changes == -1)
+        
+        # Posição ainda aberta no final não gera trade (como no caminho por barra)
+        entries = entries[:len(exits)]
+        
+        exit_prices = data['close'].to_numpy(dtype=float)[exits]
+        return entries, exits, exit_prices, [EXIT_SIGNAL] * len(exits)
+    
+    def _apply_exits(self, data, signals):
+        """
+        Calcula os trades com stop loss e take profit intrabar (risk.stop_loss_pct/take_profit_pct).
+        
+        Args:
+            data (pandas.DataFrame): Dados históricos
+            signals (numpy.ndarray): Sinais por barra
+            
+        Returns:
+            tuple: (entradas, saídas, preços de saída, motivos)
+        """
+        return simulate_exits(
+            data['open'].to_numpy(dtype=float),
+            data['high'].to_numpy(dtype=float),
+            data['low'].to_numpy(dtype=float),
+            data['close'].to_numpy(dtype=float),
+            signals,
+            self.stop_loss_pct,
+            self.take_profit_pct,
+            self.both_touched
+        )
+    
+    def calculate_metrics(self, trades, initial_capital=10000, data=None):
         """
         Calcula métricas de desempenho a partir dos trades.
         
+        Com os dados históricos, a curva de capital é marcada a mercado a
+        cada barra e Sharpe/Sortino/Calmar são anualizados pelo timeframe,
+        inclusive sem trades (curva plana, com o mesmo conjunto de métricas).
+        Sem eles, a curva é composta trade a trade.
+        
         Args:
             trades (list): Lista de trades
             initial_capital (float): Capital inicial
+            data (pandas.DataFrame, optional): Dados históricos usados no backtest
             
         Returns:
             dict: Métricas de desempenho
         """
-        if not trades:
+        if not trades and data is None:
             return {
                 'total_trades': 0,
                 'win_rate': 0,
@@ -154,42 +308,32 @@ class Backtest:
                 'sharpe_ratio': 0
             }
         
-        # Calcular curva de capital
-        equity = [initial_capital]
-        capital = initial_capital
-        
-        for trade in trades:
-            profit = capital * (trade['profit_pct'] / 100)
-            capital += profit
-            equity.append(capital)
+        profits = np.array([trade['profit_pct'] for trade in trades], dtype=float)
+        win_rate = np.count_nonzero(profits > 0) / len(trades) * 100 if trades else 0
         
-        # Calcular métricas
-        wins = sum(1 for trade in trades if trade['profit_pct'] > 0)
-        win_rate = (wins / len(trades)) * 100
-        
-        total_return = ((capital - initial_capital) / initial_capital) * 100
-        
-        # Calcular drawdown
-        peak = equity[0]
-        drawdowns = []
-        
-        for value in equity:
-            if value > peak:
-                peak = value
-            drawdown = (peak - value) / peak * 100
-            drawdowns.append(drawdown)
-        
-        max_drawdown = max(drawdowns)
+        if data is not None:
+            timestamps = data['timestamp'].to_numpy()
+            position = position_from_trades(timestamps, trades)
+            equity = equity_curve(data['close'].to_numpy(dtype=float), position, initial_capital,
+                                  exit_marks(timestamps, trades))
+            metrics = compute_metrics(equity, position, infer_periods_per_year(timestamps, self.timeframe))
+            
+            return {
+                'total_trades': len(trades),
+                'win_rate': win_rate,
+                **metrics,
+                'equity_curve': equity.tolist()
+            }
         
-        # Calcular retornos diários para Sharpe Ratio
-        daily_returns = [(equity[i] / equity[i-1]) - 1 for i in range(1, len(equity))]
+        # Curva de capital composta por trade
+        equity = initial_capital * np.cumprod(np.concatenate([[1.0], 1 + profits / 100]))
+        total_return = (equity[-1] - initial_capital) / initial_capital * 100
+        max_drawdown, _ = max_drawdown_stats(equity)
         
-        if not daily_returns:
-            sharpe_ratio = 0
-        else:
-            # Assumindo taxa livre de risco anual de 2%
-            risk_free_daily = 0.02 / 252  # 252 dias de trading em um ano
-            sharpe_ratio = (np.mean(daily_returns) - risk_free_daily) / np.std(daily_returns) * np.sqrt(252)
+        returns = profits / 100
+        std = returns.std()
+        # Assumindo taxa livre de risco anual de 2% (retornos por trade)
+        sharpe_ratio = (returns.mean() - RISK_FREE_RATE / 252) / std * np.sqrt(252) if std > 0 else 0
         
         return {
             'total_trades': len(trades),
@@ -197,7 +341,7 @@ class Backtest:
             'profit_loss': total_return,
             'max_drawdown': max_drawdown,
             'sharpe_ratio': sharpe_ratio,
-            'equity_curve': equity
+            'equity_curve': equity.tolist()
         }
     
     def run(self, strategy, symbol, from_date, to_date, initial_capital=10000):
@@ -223,13 +367,15 @@ class Backtest:
         trades = self.apply_strategy(data, strategy)
         
         # Calcular métricas
-        metrics = self.calculate_metrics(trades, initial_capital)
+        metrics = self.calculate_metrics(trades, initial_capital, data)
         
         self.results = {
             'trades': trades,
             'metrics': metrics,
             'equity_curve': metrics.pop('equity_curve', [])
         }
+        if self.indicator_cache is not None:
+            self.results['indicator_cache'] = self.indicator_cache.stats()
         
         return self.results
     
@@ -239,11 +385,13 @@ class Backtest:
         
         Args:
             output_file (str, optional): Caminho para salvar o gráfico
+                (padrão: backtest_results.png, já que o backend é não interativo)
         """
         if not self.results['equity_curve']:
             logger.warning("No equity curve to plot")
             return
         
+        plt = _pyplot()
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10), gridspec_kw={'height_ratios': [3, 1]})
         
         # Curva de capital
@@ -271,11 +419,10 @@ class Backtest:
         
         plt.tight_layout()
         
-        if output_file:
-            plt.savefig(output_file)
-            logger.info(f"Plot saved to {output_file}")
-        else:
-            plt.show()
+        output_file = output_file or 'backtest_results.png'
+        plt.savefig(output_file)
+        plt.close(fig)
+        logger.info(f"Plot saved to {output_file}")
 
 # Função auxiliar para uso direto
 def run_quick_backtest(config, strategy, symbol, from_date, to_date, initial_capital=10000):
@@ -303,4 +450,98 @@ def run_quick_backtest(config, strategy, symbol, from_date, to_date, initial_cap
     results = backtest.run(strategy, symbol, from_date, to_date, initial_capital)
     backtest.plot_results(f"backtest_{symbol}_{from_date.strftime('%Y%m%d')}_{to_date.strftime('%Y%m%d')}.png")
     
-    return results
\ No newline at end of file
+    return results
+
+
+def _run_symbol_backtest(config, strategy, data, initial_capital):
+    """Executa estratégia e métricas de um símbolo (usada nos processos worker)."""
+    backtest = Backtest(config)
+    trades = backtest.apply_strategy(data, strategy)
+    metrics = backtest.calculate_metrics(trades, initial_capital, data)
+    return {
+        'trades': trades,
+        'equity_curve': metrics.pop('equity_curve', []),
+        'metrics': metrics
+    }
+
+
+def summarize_multi_symbol(results, initial_capital):
+    """
+    Consolida os resultados de vários símbolos em um resumo único.
+    
+    Args:
+        results (dict): Símbolo -> resultados de _run_symbol_backtest
+        initial_capital (float): Capital inicial total
+        
+    Returns:
+        dict: Resumo combinado
+    """
+    capital_per_symbol = initial_capital / len(results) if results else 0
+    final_capital = sum(
+        r['equity_curve'][-1] if r['equity_curve'] else capital_per_symbol
+        for r in results.values()
+    )
+    total_trades = sum(r['metrics']['total_trades'] for r in results.values())
+    wins = sum(r['metrics']['win_rate'] * r['metrics']['total_trades'] / 100 for r in results.values())
+    by_return = sorted(results, key=lambda s: results[s]['metrics']['profit_loss'])
+    
+    return {
+        'symbols': len(results),
+        'total_trades': total_trades,
+        'win_rate': wins / total_trades * 100 if total_trades else 0,
+        'profit_loss': (final_capital - initial_capital) / initial_capital * 100 if initial_capital else 0,
+        'final_capital': final_capital,
+        'worst_max_drawdown': max((r['metrics']['max_drawdown'] for r in results.values()), default=0),
+        'best_symbol': by_return[-1] if by_return else None,
+        'worst_symbol': by_return[0] if by_return else None
+    }
+
+
+def run_multi_symbol_backtest(config, strategy, from_date, to_date, symbols=None, initial_capital=10000,
+                              max_workers=None, io_workers=None, data_provider=None):
+    """
+    Executa o backtest de vários símbolos de forma concorrente.
+    
+    O carregamento dos dados (I/O) roda em threads e, assim que os dados de
+    um símbolo ficam prontos, o backtest (CPU) é enviado a um pool de
+    processos. O capital é dividido igualmente entre os símbolos, como no
+    bot ao vivo.
+    
+    Args:
+        config (dict): Configuração
+        strategy: Estratégia de trading (precisa ser serializável via pickle)
+        from_date (datetime): Data inicial
+        to_date (datetime): Data final
+        symbols (list, optional): Símbolos (padrão: trading.pairs da configuração)
+        initial_capital (float): Capital inicial total
+        max_workers (int, optional): Número de processos para os backtests
+        io_workers (int, optional): Número de threads para carregar os dados
+        data_provider: Provedor de dados históricos
+        
+    Returns:
+        dict: {'per_symbol': {símbolo: resultados}, 'summary': resumo combinado}
+    """
+    if symbols is None:
+        symbols = config.get('trading', {}).get('pairs')
+    if not symbols:
+        from .config import CRIPTOS
+        symbols = CRIPTOS
+    
+    capital_per_symbol = initial_capital / len(symbols)
+    loader = Backtest(config, data_provider)
+    logger.info(f"Running multi-symbol backtest for {len(symbols)} symbols from {from_date} to {to_date}")
+    
+    with ThreadPoolExecutor(max_workers=io_workers or min(32, len(symbols))) as io_pool, \
+            ProcessPoolExecutor(max_workers=max_workers or min(os.cpu_count() or 1, len(symbols))) as cpu_pool:
+        
+        def load_and_submit(symbol):
+            data = loader.load_historical_data(symbol, from_date, to_date)
+            return cpu_pool.submit(_run_symbol_backtest, config, strategy, data, capital_per_symbol)
+        
+        loads = {symbol: io_pool.submit(load_and_submit, symbol) for symbol in symbols}
+        per_symbol = {symbol: future.result().result() for symbol, future in loads.items()}
+    
+    return {
+        'per_symbol': per_symbol,
+        'summary': summarize_multi_symbol(per_symbol, initial_capital)
+    }
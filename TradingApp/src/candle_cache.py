@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import logging
+import time
+
+import numpy as np
+
+from .timeframes import timeframe_to_seconds
+
+logger = logging.getLogger("TradingBot-CandleCache")
+
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+class OHLCVRingBuffer:
+    """
+    Buffer circular pré-alocado com os últimos N candles de um símbolo.
+
+    Cada candle é gravado em duas posições (i e i + N) de arrays de tamanho
+    2N. Assim a janela dos últimos N candles é sempre um trecho contíguo dos
+    arrays, e os indicadores recebem views sem cópia, em ordem cronológica,
+    sem nenhuma alocação por atualização.
+    """
+
+    def __init__(self, capacity):
+        """
+        Args:
+            capacity (int): Número máximo de candles mantidos
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._timestamps = np.zeros(2 * capacity, dtype=np.int64)
+        self._values = np.zeros((len(OHLCV_COLUMNS), 2 * capacity), dtype=np.float64)
+        self._next = 0
+        self._length = 0
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def last_timestamp(self):
+        """Timestamp (ms) do candle mais recente, ou None se vazio."""
+        if not self._length:
+            return None
+        return int(self._timestamps[(self._next - 1) % self.capacity])
+
+    def _write(self, position, timestamps, values):
+        """Grava um bloco a partir de position nas duas cópias."""
+        for offset in (0, self.capacity):
+            self._timestamps[offset + position:offset + position + len(timestamps)] = timestamps
+            self._values[:, offset + position:offset + position + len(timestamps)] = values
+
+    def append(self, row):
+        """
+        Adiciona ou atualiza um candle.
+
+        Um candle com o mesmo timestamp do último substitui o último (candle
+        em formação); candles mais antigos são ignorados.
+
+        Args:
+            row (list): [timestamp_ms, open, high, low, close, volume]
+
+        Returns:
+            bool: Se o buffer foi alterado
+        """
+        return self.extend([row]) > 0
+
+    def extend(self, rows):
+        """
+        Adiciona vários candles ordenados de uma vez.
+
+        Args:
+            rows (list or numpy.ndarray): Linhas [timestamp_ms, open, high, low, close, volume]
+
+        Returns:
+            int: Número de candles novos ou atualizados
+        """
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, 6)
+        timestamps = rows[:, 0].astype(np.int64)
+
+        changed = 0
+        last = self.last_timestamp
+        if last is not None:
+            keep = timestamps >= last
+            rows, timestamps = rows[keep], timestamps[keep]
+            if len(timestamps) and timestamps[0] == last:
+                # Atualiza o candle em formação na posição atual
+                self._write((self._next - 1) % self.capacity, timestamps[:1], rows[:1, 1:].T)
+                changed = 1
+                rows, timestamps = rows[1:], timestamps[1:]
+
+        if not len(timestamps):
+            return changed
+
+        # Só os últimos N candles cabem no buffer
+        rows, timestamps = rows[-self.capacity:], timestamps[-self.capacity:]
+        count = len(timestamps)
+        first = min(count, self.capacity - self._next)
+        self._write(self._next, timestamps[:first], rows[:first, 1:].T)
+        if first < count:
+            self._write(0, timestamps[first:], rows[first:, 1:].T)
+
+        self._next = (self._next + count) % self.capacity
+        self._length = min(self.capacity, self._length + count)
+        return changed + count
+
+    def _window(self):
+        # Quando a janela dá a volta, a segunda cópia a continua sem quebra
+        end = self._next if self._next >= self._length else self._next + self.capacity
+        return end - self._length, end
+
+    def view(self, column):
+        """
+        Janela contígua de uma coluna, do candle mais antigo ao mais recente.
+
+        Args:
+            column (str): 'timestamp', 'open', 'high', 'low', 'close' ou 'volume'
+
+        Returns:
+            numpy.ndarray: View somente leitura (sem cópia)
+        """
+        start, end = self._window()
+        if column == 'timestamp':
+            window = self._timestamps[start:end]
+        else:
+            window = self._values[OHLCV_COLUMNS.index(column), start:end]
+        window.flags.writeable = False
+        return window
+
+    def arrays(self):
+        """
+        Todas as colunas como views contíguas.
+
+        Returns:
+            dict: Nome da coluna -> numpy.ndarray
+        """
+        return {column: self.view(column) for column in ('timestamp',) + OHLCV_COLUMNS}
+
+    def to_frame(self):
+        """
+        Janela atual como DataFrame (sem copiar as colunas de preço).
+
+        Returns:
+            pandas.DataFrame: Colunas timestamp, open, high, low, close, volume
+        """
+        import pandas as pd
+
+        arrays = self.arrays()
+        arrays['timestamp'] = arrays['timestamp'].view('datetime64[ms]')
+        return pd.DataFrame(arrays, copy=False)
+
+
+class CandleCache:
+    """
+    Buffers de candles por símbolo e timeframe para o loop ao vivo.
+
+    A carga inicial (warmup) busca os últimos N candles de cada par; depois,
+    refresh busca apenas os candles que faltam desde o último armazenado
+    (normalmente o candle em formação e o recém-fechado), em paralelo para
+    todos os pares.
+    """
+
+    def __init__(self, symbols, timeframes=('5m',), capacity=500, clock=time.time):
+        """
+        Inicializa o cache.
+
+        Args:
+            symbols (list): Pares acompanhados
+            timeframes (list or str): Timeframes de cada par
+            capacity (int): Candles mantidos por par e timeframe
+            clock (callable): Relógio em segundos desde a época
+        """
+        timeframes = [timeframes] if isinstance(timeframes, str) else list(timeframes)
+        self.capacity = capacity
+        self.clock = clock
+        self.buffers = {(symbol, timeframe): OHLCVRingBuffer(capacity)
+                        for symbol in symbols for timeframe in timeframes}
+
+    def buffer(self, symbol, timeframe):
+        """Buffer de um par e timeframe."""
+        return self.buffers[(symbol, timeframe)]
+
+    def update(self, symbol, timeframe, rows):
+        """
+        Acrescenta candles recebidos (por consulta ou por push).
+
+        Returns:
+            int: Número de candles novos ou atualizados
+        """
+        return self.buffers[(symbol, timeframe)].extend(rows)
+
+    def missing_bars(self, symbol, timeframe):
+        """Candles a buscar para atualizar o buffer (inclui o último, que pode estar em formação)."""
+        buffer = self.buffers[(symbol, timeframe)]
+        if buffer.last_timestamp is None:
+            return self.capacity
+        elapsed = int(self.clock() * 1000) - buffer.last_timestamp
+        return int(min(self.capacity, max(0, elapsed) // (timeframe_to_seconds(timeframe) * 1000) + 1))
+
+    async def _fetch(self, market_data, key, limit):
+        symbol, timeframe = key
+        try:
+            rows = await market_data.fetch_ohlcv(symbol, timeframe, limit=limit)
+        except Exception as e:
+            logger.warning(f"Failed to update candles for {symbol} {timeframe}: {e}")
+            return 0
+        return self.buffers[key].extend(rows) if rows else 0
+
+    async def warmup(self, market_data):
+        """
+        Carrega os últimos N candles de todos os pares em paralelo.
+
+        Args:
+            market_data (AsyncMarketData): Camada de dados
+
+        Returns:
+            int: Número de candles carregados
+        """
+        counts = await asyncio.gather(*(self._fetch(market_data, key, self.capacity) for key in self.buffers))
+        return sum(counts)
+
+    async def refresh(self, market_data):
+        """
+        Busca só os candles novos de todos os pares em paralelo.
+
+        Args:
+            market_data (AsyncMarketData): Camada de dados
+
+        Returns:
+            int: Número de candles novos ou atualizados
+        """
+        counts = await asyncio.gather(*(self._fetch(market_data, key, self.missing_bars(*key))
+                                        for key in self.buffers))
+        return sum(counts)
@@ -1,6 +1,8 @@
 # config.py
 # Configurações para o bot de trading
 
+import json
+
 # Credenciais da API (não compartilhe estas informações)
 API_KEY = "SUA_API_KEY_DA_BINANCE"
 API_SECRET = "SUA_API_SECRET_DA_BINANCE"
@@ -18,4 +20,16 @@ INTERVALO_VERIFICACAO = 300    # Intervalo em segundos entre verificações (5 m
 # Configurações avançadas
 MAX_OPERACOES_SIMULTANEAS = 3  # Número máximo de operações simultâneas
 USAR_MACHINE_LEARNING = True   # Utilizar modelos de machine learning
-RETRAIN_INTERVAL = 24          # Retreinar modelos a cada 24 horas
\ No newline at end of file
+RETRAIN_INTERVAL = 24          # Retreinar modelos a cada 24 horas
+
+
+def load_config(path="config/config.json"):
+    """Carrega a configuração em JSON usada pelo CLI e pelo backtest"""
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_config(config, path="config/config.json"):
+    """Salva a configuração em JSON"""
+    with open(path, "w") as f:
+        json.dump(config, f, indent=2)
@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import os
+import shutil
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .timeframes import timeframe_to_seconds
+
+logger = logging.getLogger("TradingBot-DataStore")
+
+# Colunas armazenadas e seus tipos; o timestamp (ms desde a época) é gravado
+# por último em cada append e define quantas linhas são válidas.
+COLUMNS = {
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.float64,
+    'timestamp': np.int64,
+}
+
+# Maior intervalo entre candles consecutivos (em barras) ainda tratado como
+# falta de candles na própria exchange (manutenção, baixa liquidez), e não
+# como um trecho que nunca foi buscado
+MAX_GAP_BARS = 24
+
+
+def to_milliseconds(value):
+    """
+    Converte datas em milissegundos desde a época (UTC).
+
+    Args:
+        value: datetime, string, pandas.Timestamp ou sequência deles
+
+    Returns:
+        int or numpy.ndarray: Timestamp(s) em milissegundos
+    """
+    if isinstance(value, (str, date, datetime, np.datetime64)):
+        timestamp = pd.Timestamp(value)
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.tz_convert(None)
+        return int(timestamp.value // 1_000_000)
+
+    timestamps = pd.to_datetime(pd.Series(value))
+    if timestamps.dt.tz is not None:
+        timestamps = timestamps.dt.tz_convert(None)
+    return timestamps.to_numpy(dtype='datetime64[ms]').view(np.int64)
+
+
+class OHLCVStore:
+    """
+    Armazenamento colunar binário de candles por símbolo e timeframe.
+
+    Cada coluna é um arquivo binário (data_cache/<SIMBOLO>/<TIMEFRAME>/<coluna>.bin)
+    lido com numpy.memmap. Leituras por intervalo usam busca binária no índice
+    de tempo ordenado e devolvem views dos arquivos mapeados, sem parsing e sem
+    cópia. Candles novos são anexados no fim dos arquivos.
+    """
+
+    def __init__(self, root="data_cache", max_gap_bars=MAX_GAP_BARS):
+        """
+        Inicializa o armazenamento.
+
+        Args:
+            root (str): Diretório base dos dados
+            max_gap_bars (int): Maior lacuna (em barras) aceita por covers()
+        """
+        self.root = Path(root)
+        self.max_gap_bars = max_gap_bars
+
+    def _dir(self, symbol, timeframe):
+        return self.root / symbol.replace('/', '_') / timeframe
+
+    def _load(self, symbol, timeframe):
+        """Mapeia as colunas em memória (somente leitura)."""
+        directory = self._dir(symbol, timeframe)
+        timestamp_file = directory / 'timestamp.bin'
+        if not timestamp_file.exists() or timestamp_file.stat().st_size == 0:
+            return None
+
+        length = timestamp_file.stat().st_size // np.dtype(np.int64).itemsize
+        return {
+            name: np.memmap(directory / f'{name}.bin', dtype=dtype, mode='r')[:length]
+            for name, dtype in COLUMNS.items()
+        }
+
+    def __contains__(self, key):
+        return self._load(*key) is not None
+
+    def time_range(self, symbol, timeframe):
+        """
+        Retorna o primeiro e o último timestamp armazenados.
+
+        Returns:
+            tuple or None: (primeiro_ms, ultimo_ms)
+        """
+        columns = self._load(symbol, timeframe)
+        if columns is None:
+            return None
+        return int(columns['timestamp'][0]), int(columns['timestamp'][-1])
+
+    def covers(self, symbol, timeframe, from_date, to_date):
+        """
+        Indica se o intervalo pedido já está inteiramente armazenado.
+
+        Além de estar entre o primeiro e o último candle armazenados, o
+        intervalo não pode ter lacunas maiores que max_gap_bars barras (ex:
+        janeiro e março gravados e fevereiro pedido). Lacunas menores são
+        candles que a própria exchange não tem e não forçam nova busca.
+
+        Args:
+            symbol (str): Símbolo do ativo
+            timeframe (str): Timeframe dos candles (ex: '5m')
+            from_date (datetime): Início do intervalo (inclusivo)
+            to_date (datetime): Fim do intervalo (inclusivo)
+
+        Returns:
+            bool: True se não for preciso buscar dados
+        """
+        columns = self._load(symbol, timeframe)
+        if columns is None:
+            return False
+
+        timestamps = columns['timestamp']
+        start_ms, end_ms = to_milliseconds(from_date), to_milliseconds(to_date)
+        if timestamps[0] > start_ms or timestamps[-1] < end_ms:
+            return False
+
+        # Inclui o candle vizinho quando o limite cai entre candles, para
+        # detectar lacunas logo no início ou no fim do intervalo
+        start = int(np.searchsorted(timestamps, start_ms, side='left'))
+        end = int(np.searchsorted(timestamps, end_ms, side='right'))
+        if start == len(timestamps) or timestamps[start] != start_ms:
+            start -= 1
+        if timestamps[end - 1] != end_ms:
+            end += 1
+
+        step = timeframe_to_seconds(timeframe) * 1000
+        gaps = np.diff(timestamps[start:end])
+        return not (gaps > self.max_gap_bars * step).any()
+
+    def read_arrays(self, symbol, timeframe, from_date=None, to_date=None):
+        """
+        Lê um intervalo de candles como views dos arquivos mapeados.
+
+        Args:
+            symbol (str): Símbolo do ativo
+            timeframe (str): Timeframe dos candles (ex: '5m')
+            from_date (datetime, optional): Início do intervalo (inclusivo)
+            to_date (datetime, optional): Fim do intervalo (inclusivo)
+
+        Returns:
+            dict: Nome da coluna -> numpy.ndarray (vazio se não houver dados)
+        """
+        columns = self._load(symbol, timeframe)
+        if columns is None:
+            return {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS.items()}
+
+        timestamps = columns['timestamp']
+        start = 0 if from_date is None else np.searchsorted(timestamps, to_milliseconds(from_date), side='left')
+        end = len(timestamps) if to_date is None else np.searchsorted(timestamps, to_milliseconds(to_date), side='right')
+        return {name: values[start:end] for name, values in columns.items()}
+
+    def read(self, symbol, timeframe, from_date=None, to_date=None):
+        """
+        Lê um intervalo de candles como DataFrame sem copiar os dados.
+
+        Returns:
+            pandas.DataFrame: Colunas timestamp, open, high, low, close, volume
+        """
+        arrays = self.read_arrays(symbol, timeframe, from_date, to_date)
+        return pd.DataFrame({
+            'timestamp': arrays['timestamp'].view('datetime64[ms]'),
+            'open': arrays['open'],
+            'high': arrays['high'],
+            'low': arrays['low'],
+            'close': arrays['close'],
+            'volume': arrays['volume'],
+        }, copy=False)
+
+    def update(self, symbol, timeframe, data):
+        """
+        Grava candles no armazenamento.
+
+        Candles posteriores ao último armazenado são anexados no fim dos
+        arquivos. Candles anteriores ou intermediários provocam uma fusão
+        (os candles já armazenados têm prioridade) e regravação atômica.
+
+        Args:
+            symbol (str): Símbolo do ativo
+            timeframe (str): Timeframe dos candles
+            data (pandas.DataFrame): Candles com as colunas OHLCV e timestamp
+
+        Returns:
+            int: Número de candles novos gravados
+        """
+        if len(data) == 0:
+            return 0
+
+        new = {name: data[name].to_numpy(dtype=dtype) for name, dtype in COLUMNS.items() if name != 'timestamp'}
+        new['timestamp'] = to_milliseconds(data['timestamp'])
+        order = np.argsort(new['timestamp'], kind='stable')
+        new = {name: values[order] for name, values in new.items()}
+
+        directory = self._dir(symbol, timeframe)
+        directory.mkdir(parents=True, exist_ok=True)
+        current = self._load(symbol, timeframe)
+
+        if current is None or new['timestamp'][0] > current['timestamp'][-1]:
+            length = 0 if current is None else len(current['timestamp'])
+            return self._append(directory, length, new)
+
+        return self._merge(directory, current, new)
+
+    def _append(self, directory, length, new):
+        for name in COLUMNS:
+            with open(directory / f'{name}.bin', 'ab') as f:
+                # Descarta restos de um append interrompido antes do timestamp
+                f.truncate(length * np.dtype(COLUMNS[name]).itemsize)
+                f.write(np.ascontiguousarray(new[name]).tobytes())
+        return len(new['timestamp'])
+
+    def _merge(self, directory, current, new):
+        before = len(current['timestamp'])
+        timestamps = np.concatenate([current['timestamp'], new['timestamp']])
+        # np.unique mantém a primeira ocorrência: candles armazenados vencem
+        timestamps, index = np.unique(timestamps, return_index=True)
+        merged = {
+            name: np.concatenate([current[name], new[name]])[index]
+            for name in COLUMNS if name != 'timestamp'
+        }
+        merged['timestamp'] = timestamps
+
+        # Regrava numa geração nova e troca os diretórios, para que uma falha
+        # no meio nunca deixe colunas de gerações diferentes misturadas
+        tmp_dir = directory.with_name(directory.name + '.tmp')
+        old_dir = directory.with_name(directory.name + '.old')
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        shutil.rmtree(old_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+        for name in COLUMNS:
+            merged[name].tofile(tmp_dir / f'{name}.bin')
+        os.replace(directory, old_dir)
+        os.replace(tmp_dir, directory)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+        logger.debug(f"Merged {len(timestamps) - before} candles into {directory}")
+        return len(timestamps) - before
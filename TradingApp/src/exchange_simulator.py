@@ -0,0 +1,617 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from collections import deque
+
+logger = logging.getLogger("TradingBot-ExchangeSimulator")
+
+# Conta de liquidez (formador de mercado) sem controle de saldo
+MARKET_MAKER = None
+
+# Negócios recentes mantidos em memória (testes de carga geram milhões)
+MAX_TRADE_HISTORY = 100000
+
+# Métodos da API da ccxt que sofrem a latência simulada
+CCXT_METHODS = {
+    'load_markets', 'fetch_ohlcv', 'fetch_order_book', 'fetch_ticker', 'fetch_balance', 'create_order',
+    'create_limit_order', 'create_market_order', 'cancel_order', 'fetch_order', 'fetch_open_orders',
+}
+
+
+class ExchangeError(Exception):
+    """Erro genérico do simulador (mesmo nome da hierarquia da ccxt)."""
+
+
+class InvalidOrder(ExchangeError):
+    """Ordem com parâmetros inválidos."""
+
+
+class InsufficientFunds(ExchangeError):
+    """Saldo livre insuficiente para a ordem."""
+
+
+class OrderNotFound(ExchangeError):
+    """Ordem inexistente ou já encerrada."""
+
+
+class OrderBook:
+    """
+    Livro de ofertas com prioridade preço-tempo.
+
+    Cada nível de preço é uma fila (deque) de ordens em ordem de chegada, e os
+    melhores preços ficam em heaps. Ordens canceladas são removidas de forma
+    preguiçosa: saem do volume do nível na hora e da fila quando chegam à
+    frente dela.
+    """
+
+    def __init__(self):
+        self.levels = {'buy': {}, 'sell': {}}
+        self.volume = {'buy': {}, 'sell': {}}
+        self._heaps = {'buy': [], 'sell': []}
+
+    def best(self, side):
+        """
+        Melhor preço de um lado do livro.
+
+        Args:
+            side (str): 'buy' (bids) ou 'sell' (asks)
+
+        Returns:
+            float or None: Melhor preço, ou None se o lado estiver vazio
+        """
+        heap, volume = self._heaps[side], self.volume[side]
+        while heap:
+            price = -heap[0] if side == 'buy' else heap[0]
+            if price in volume:
+                return price
+            heapq.heappop(heap)
+        return None
+
+    def add(self, order):
+        """Coloca o restante de uma ordem limitada no fim da fila do seu preço."""
+        side, price = order['side'], order['price']
+        level = self.levels[side].get(price)
+        if level is None:
+            level = self.levels[side][price] = deque()
+            self.volume[side][price] = 0.0
+            heapq.heappush(self._heaps[side], -price if side == 'buy' else price)
+        level.append(order)
+        self.volume[side][price] += order['remaining']
+
+    def remove(self, order):
+        """Retira o restante de uma ordem do volume do seu nível."""
+        side, price = order['side'], order['price']
+        volume = self.volume[side]
+        volume[price] -= order['remaining']
+        if volume[price] <= 1e-12:
+            del volume[price]
+            del self.levels[side][price]
+
+    def match(self, side, amount, limit_price=None):
+        """
+        Consome liquidez do lado oposto em prioridade preço-tempo.
+
+        Args:
+            side (str): Lado da ordem agressora
+            amount (float or callable): Quantidade máxima, ou função
+                (preço, restante) -> quantidade executável a esse preço
+            limit_price (float, optional): Pior preço aceito (None: ordem a mercado)
+
+        Returns:
+            list: Tuplas (ordem passiva, quantidade, preço)
+        """
+        opposite = 'sell' if side == 'buy' else 'buy'
+        limit_qty = amount if callable(amount) else None
+        remaining = float('inf') if callable(amount) else amount
+        fills = []
+
+        while remaining > 1e-12:
+            price = self.best(opposite)
+            if price is None:
+                break
+            if limit_price is not None and (price > limit_price if side == 'buy' else price < limit_price):
+                break
+
+            level = self.levels[opposite][price]
+            while level and remaining > 1e-12:
+                maker = level[0]
+                if maker['remaining'] <= 1e-12 or maker['status'] != 'open':
+                    level.popleft()
+                    continue
+                qty = min(remaining, maker['remaining'])
+                if limit_qty is not None:
+                    qty = min(qty, limit_qty(price, qty))
+                    if qty <= 1e-12:
+                        return fills
+                fills.append((maker, qty, price))
+                remaining -= qty
+                self.volume[opposite][price] -= qty
+                maker['remaining'] -= qty
+                if maker['remaining'] <= 1e-12:
+                    level.popleft()
+
+            if not level or self.volume[opposite][price] <= 1e-12:
+                del self.volume[opposite][price]
+                del self.levels[opposite][price]
+        return fills
+
+    def snapshot(self, side, depth=None):
+        """Níveis [preço, volume] de um lado, do melhor para o pior."""
+        prices = sorted(self.volume[side], reverse=(side == 'buy'))
+        return [[price, self.volume[side][price]] for price in prices[:depth]]
+
+
+class ExchangeSimulator:
+    """
+    Exchange local para paper trading e testes de carga.
+
+    Expõe o subconjunto da API da ccxt usado pelo bot (fetch_ohlcv,
+    fetch_ticker, fetch_order_book, create_order, cancel_order, fetch_order,
+    fetch_open_orders e fetch_balance) sobre um livro de ofertas por símbolo.
+    Ordens limitadas que não cruzam o livro ficam abertas e podem ser
+    executadas parcialmente; ordens a mercado executam o que houver de
+    liquidez e cancelam o restante. Taxas maker/taker são cobradas na moeda
+    de cotação.
+    """
+
+    def __init__(self, balances=None, maker_fee=0.001, taker_fee=0.001, latency=0.0, ohlcv=None,
+                 clock=time.time, seed=None):
+        """
+        Inicializa o simulador.
+
+        Args:
+            balances (dict, optional): Saldo inicial da conta (moeda -> quantidade)
+            maker_fee (float): Taxa das ordens passivas
+            taker_fee (float): Taxa das ordens agressoras
+            latency (float or tuple): Latência (s) de cada chamada, ou (mínima, máxima)
+                para latência aleatória uniforme
+            ohlcv (dict, optional): Símbolo -> candles (DataFrame ou linhas da ccxt)
+            clock (callable): Relógio em segundos desde a época
+            seed (int, optional): Semente da latência aleatória
+        """
+        self.maker_fee = maker_fee
+        self.taker_fee = taker_fee
+        self.latency = latency
+        self.clock = clock
+        self._blocking = True
+        self._random = random.Random(seed)
+        self._ids = itertools.count(1)
+
+        self.balances = {}
+        self.deposit(balances or {})
+        self.books = {}
+        self.orders = {}
+        self.trades = deque(maxlen=MAX_TRADE_HISTORY)
+        self.last_price = {}
+        self.ohlcv = {symbol: self._to_rows(rows) for symbol, rows in (ohlcv or {}).items()}
+
+        self._stats = {
+            'orders': 0,
+            'canceled': 0,
+            'trades': 0,
+            'fill_latency_ms': 0.0,
+            'filled_orders': 0,
+            'slippage_bps': 0.0,
+            'market_orders': 0,
+        }
+
+    @staticmethod
+    def _to_rows(data):
+        if hasattr(data, 'columns'):
+            from .data_store import to_milliseconds
+
+            timestamps = to_milliseconds(data['timestamp'])
+            values = data[['open', 'high', 'low', 'close', 'volume']].to_numpy(dtype=float)
+            return [[int(ts), *map(float, value)] for ts, value in zip(timestamps, values)]
+        return [list(row) for row in data]
+
+    def _now_ms(self):
+        return int(self.clock() * 1000)
+
+    def _delay(self):
+        """Latência sorteada para uma chamada."""
+        if isinstance(self.latency, (tuple, list)):
+            return self._random.uniform(*self.latency)
+        return self.latency
+
+    def _wait(self):
+        if not self._blocking:
+            return
+        delay = self._delay()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _book(self, symbol):
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = OrderBook()
+        return book
+
+    def _balance(self, account, currency):
+        account_balances = self.balances.setdefault(account, {})
+        balance = account_balances.get(currency)
+        if balance is None:
+            balance = account_balances[currency] = {'free': 0.0, 'used': 0.0}
+        return balance
+
+    def deposit(self, amounts, account='default'):
+        """
+        Credita saldo livre em uma conta.
+
+        Args:
+            amounts (dict): Moeda -> quantidade
+            account (str): Conta creditada
+        """
+        for currency, amount in amounts.items():
+            self._balance(account, currency)['free'] += amount
+
+    # API da ccxt ------------------------------------------------------------
+
+    def load_markets(self):
+        """Mercados conhecidos (símbolos com candles ou livro)."""
+        self._wait()
+        symbols = set(self.ohlcv) | set(self.books)
+        return {symbol: {'symbol': symbol, 'base': symbol.split('/')[0], 'quote': symbol.split('/')[1]}
+                for symbol in symbols}
+
+    def fetch_ohlcv(self, symbol, timeframe='5m', since=None, limit=None, params=None):
+        """
+        Candles carregados do símbolo, sem candles que abrem depois do relógio.
+
+        Returns:
+            list: Linhas [timestamp_ms, open, high, low, close, volume]
+        """
+        self._wait()
+        rows = self.ohlcv.get(symbol, [])
+        now = self._now_ms()
+        end = len(rows)
+        while end and rows[end - 1][0] > now:
+            end -= 1
+        start = 0
+        if since is not None:
+            while start < end and rows[start][0] < since:
+                start += 1
+        if limit is not None:
+            start = max(start, end - limit) if since is None else start
+            end = min(end, start + limit)
+        return [list(row) for row in rows[start:end]]
+
+    def fetch_order_book(self, symbol, limit=None, params=None):
+        """Livro de ofertas agregado por preço."""
+        self._wait()
+        book = self._book(symbol)
+        return {
+            'symbol': symbol,
+            'bids': book.snapshot('buy', limit),
+            'asks': book.snapshot('sell', limit),
+            'timestamp': self._now_ms(),
+        }
+
+    def fetch_ticker(self, symbol, params=None):
+        """Melhores preços e último negócio do símbolo."""
+        self._wait()
+        book = self._book(symbol)
+        last = self.last_price.get(symbol)
+        if last is None and self.ohlcv.get(symbol):
+            last = self.ohlcv[symbol][-1][4]
+        return {
+            'symbol': symbol,
+            'bid': book.best('buy'),
+            'ask': book.best('sell'),
+            'last': last,
+            'close': last,
+            'timestamp': self._now_ms(),
+        }
+
+    def fetch_balance(self, params=None):
+        """
+        Saldos da conta no formato da ccxt.
+
+        Returns:
+            dict: free, used, total e uma entrada por moeda
+        """
+        self._wait()
+        account = (params or {}).get('account', 'default')
+        result = {'free': {}, 'used': {}, 'total': {}}
+        for currency, balance in self.balances.get(account, {}).items():
+            entry = {'free': balance['free'], 'used': balance['used'], 'total': balance['free'] + balance['used']}
+            result[currency] = entry
+            for key in ('free', 'used', 'total'):
+                result[key][currency] = entry[key]
+        return result
+
+    def create_order(self, symbol, type, side, amount, price=None, params=None):
+        """
+        Envia uma ordem e a executa contra o livro.
+
+        Args:
+            symbol (str): Símbolo (ex: 'SOL/USDT')
+            type (str): 'limit' ou 'market'
+            side (str): 'buy' ou 'sell'
+            amount (float): Quantidade na moeda base
+            price (float, optional): Preço limite (obrigatório para 'limit')
+            params (dict, optional): 'account' seleciona a conta
+
+        Returns:
+            dict: Ordem no formato da ccxt
+        """
+        self._wait()
+        account = (params or {}).get('account', 'default')
+        return self._place(account, symbol, type, side, amount, price)
+
+    def create_limit_order(self, symbol, side, amount, price, params=None):
+        return self.create_order(symbol, 'limit', side, amount, price, params)
+
+    def create_market_order(self, symbol, side, amount, price=None, params=None):
+        return self.create_order(symbol, 'market', side, amount, None, params)
+
+    def cancel_order(self, id, symbol=None, params=None):
+        """
+        Cancela o restante de uma ordem aberta.
+
+        Returns:
+            dict: Ordem cancelada
+        """
+        self._wait()
+        order = self.orders.get(id)
+        if order is None or order['status'] != 'open' or (symbol is not None and order['symbol'] != symbol):
+            raise OrderNotFound(f"Order {id} not found or not open")
+
+        self._book(order['symbol']).remove(order)
+        self._release(order)
+        order['status'] = 'canceled'
+        order['remaining'] = order['amount'] - order['filled']
+        self._stats['canceled'] += 1
+        return self._public(order)
+
+    def fetch_order(self, id, symbol=None, params=None):
+        """Estado atual de uma ordem."""
+        self._wait()
+        order = self.orders.get(id)
+        if order is None:
+            raise OrderNotFound(f"Order {id} not found")
+        return self._public(order)
+
+    def fetch_open_orders(self, symbol=None, since=None, limit=None, params=None):
+        """Ordens abertas da conta."""
+        self._wait()
+        account = (params or {}).get('account', 'default')
+        orders = [self._public(order) for order in self.orders.values()
+                  if order['status'] == 'open' and order['account'] == account
+                  and (symbol is None or order['symbol'] == symbol)]
+        return orders[-limit:] if limit else orders
+
+    def close(self):
+        """Compatível com a ccxt; o simulador não mantém conexões."""
+
+    # Liquidez e estatísticas ------------------------------------------------
+
+    def quote_around(self, symbol, mid, levels=10, size=1.0, spread_bps=5.0, step_bps=5.0):
+        """
+        Coloca ordens da conta de liquidez em torno de um preço médio.
+
+        Args:
+            symbol (str): Símbolo
+            mid (float): Preço central
+            levels (int): Níveis de cada lado
+            size (float): Quantidade em cada nível
+            spread_bps (float): Distância (bps) do melhor nível ao preço central
+            step_bps (float): Distância (bps) entre níveis
+        """
+        for level in range(levels):
+            distance = (spread_bps + level * step_bps) / 10000
+            self._place(MARKET_MAKER, symbol, 'limit', 'buy', size, round(mid * (1 - distance), 8))
+            self._place(MARKET_MAKER, symbol, 'limit', 'sell', size, round(mid * (1 + distance), 8))
+
+    def stats(self):
+        """
+        Contadores de execução do simulador.
+
+        Returns:
+            dict: orders, trades, canceled, avg_fill_latency_ms (ordens limitadas
+                  totalmente executadas) e avg_slippage_bps (ordens a mercado)
+        """
+        stats = self._stats
+        return {
+            'orders': stats['orders'],
+            'trades': stats['trades'],
+            'canceled': stats['canceled'],
+            'avg_fill_latency_ms': stats['fill_latency_ms'] / stats['filled_orders'] if stats['filled_orders'] else 0.0,
+            'avg_slippage_bps': stats['slippage_bps'] / stats['market_orders'] if stats['market_orders'] else 0.0,
+        }
+
+    # Execução ---------------------------------------------------------------
+
+    def _fee_rate(self):
+        return max(self.maker_fee, self.taker_fee)
+
+    def _reserve(self, order):
+        """Move para "used" o saldo necessário para uma ordem limitada ou venda a mercado."""
+        if order['account'] is MARKET_MAKER:
+            return
+        base, quote = order['symbol'].split('/')
+        if order['side'] == 'buy':
+            currency, needed = quote, order['amount'] * order['price'] * (1 + self._fee_rate())
+        else:
+            currency, needed = base, order['amount']
+        balance = self._balance(order['account'], currency)
+        if balance['free'] < needed - 1e-9:
+            raise InsufficientFunds(f"Insufficient {currency}: need {needed:.8f}, free {balance['free']:.8f}")
+        balance['free'] -= needed
+        balance['used'] += needed
+
+    def _release(self, order):
+        """Devolve ao saldo livre a reserva do restante não executado."""
+        if order['account'] is MARKET_MAKER:
+            return
+        base, quote = order['symbol'].split('/')
+        remaining = order['amount'] - order['filled']
+        if order['side'] == 'buy':
+            if order['type'] != 'limit':
+                return
+            currency, amount = quote, remaining * order['price'] * (1 + self._fee_rate())
+        else:
+            currency, amount = base, remaining
+        balance = self._balance(order['account'], currency)
+        balance['used'] -= amount
+        balance['free'] += amount
+
+    def _settle(self, order, qty, price, fee_rate):
+        """Atualiza ordem e saldos de um lado de um negócio."""
+        cost = qty * price
+        fee = cost * fee_rate
+        order['filled'] += qty
+        order['cost'] += cost
+        order['fee']['cost'] += fee
+        order['lastTradeTimestamp'] = self._now_ms()
+
+        if order['account'] is MARKET_MAKER:
+            return
+        base, quote = order['symbol'].split('/')
+        base_balance = self._balance(order['account'], base)
+        quote_balance = self._balance(order['account'], quote)
+        if order['side'] == 'buy':
+            base_balance['free'] += qty
+            if order['type'] == 'limit':
+                reserved = qty * order['price'] * (1 + self._fee_rate())
+                quote_balance['used'] -= reserved
+                quote_balance['free'] += reserved - cost - fee
+            else:
+                quote_balance['free'] -= cost + fee
+        else:
+            base_balance['used'] -= qty
+            quote_balance['free'] += cost - fee
+
+    def _place(self, account, symbol, type, side, amount, price):
+        if type not in ('limit', 'market'):
+            raise InvalidOrder(f"Unsupported order type: {type}")
+        if side not in ('buy', 'sell'):
+            raise InvalidOrder(f"Invalid side: {side}")
+        if amount is None or amount <= 0:
+            raise InvalidOrder("Order amount must be positive")
+        if type == 'limit' and (price is None or price <= 0):
+            raise InvalidOrder("Limit orders require a positive price")
+
+        quote = symbol.split('/')[1]
+        now = self._now_ms()
+        order = {
+            'id': str(next(self._ids)),
+            'account': account,
+            'symbol': symbol,
+            'type': type,
+            'side': side,
+            'price': float(price) if type == 'limit' else None,
+            'amount': float(amount),
+            'filled': 0.0,
+            'remaining': float(amount),
+            'cost': 0.0,
+            'status': 'open',
+            'timestamp': now,
+            'lastTradeTimestamp': None,
+            'fee': {'currency': quote, 'cost': 0.0},
+        }
+        if type == 'limit' or side == 'sell':
+            self._reserve(order)
+
+        book = self._book(symbol)
+        best = book.best('sell' if side == 'buy' else 'buy')
+        available = self._market_buy_capacity(order) if type == 'market' and side == 'buy' else order['amount']
+        fills = book.match(side, available, order['price'])
+
+        for maker, qty, fill_price in fills:
+            self._settle(order, qty, fill_price, self.taker_fee)
+            self._settle(maker, qty, fill_price, self.maker_fee)
+            self.trades.append({'symbol': symbol, 'price': fill_price, 'amount': qty, 'timestamp': now,
+                                'taker': order['id'], 'maker': maker['id'], 'side': side})
+            if maker['remaining'] <= 1e-12:
+                maker['remaining'] = 0.0
+                maker['status'] = 'closed'
+                self._stats['filled_orders'] += 1
+                self._stats['fill_latency_ms'] += now - maker['timestamp']
+        if fills:
+            self.last_price[symbol] = fills[-1][2]
+        self._stats['trades'] += len(fills)
+        self._stats['orders'] += 1
+
+        order['remaining'] = order['amount'] - order['filled']
+        if order['remaining'] <= 1e-12:
+            order['remaining'] = 0.0
+            order['status'] = 'closed'
+        elif type == 'limit':
+            book.add(order)
+        else:
+            # Ordem a mercado: o que não encontrou liquidez é cancelado
+            self._release(order)
+            order['status'] = 'canceled' if order['filled'] == 0 else 'closed'
+
+        if type == 'market' and order['filled'] > 0 and best is not None:
+            average = order['cost'] / order['filled']
+            sign = 1 if side == 'buy' else -1
+            self._stats['slippage_bps'] += sign * (average - best) / best * 10000
+            self._stats['market_orders'] += 1
+
+        self.orders[order['id']] = order
+        return self._public(order)
+
+    def _market_buy_capacity(self, order):
+        """Limita uma compra a mercado ao saldo livre em moeda de cotação."""
+        if order['account'] is MARKET_MAKER:
+            return order['amount']
+        balance = self._balance(order['account'], order['symbol'].split('/')[1])
+        state = {'budget': balance['free'], 'remaining': order['amount']}
+        fee_factor = 1 + self.taker_fee
+
+        def capacity(price, qty):
+            qty = min(qty, state['remaining'], state['budget'] / (price * fee_factor))
+            state['budget'] -= qty * price * fee_factor
+            state['remaining'] -= qty
+            return qty
+
+        return capacity
+
+    def _public(self, order):
+        """Cópia da ordem no formato da ccxt."""
+        public = {key: value for key, value in order.items() if key != 'account'}
+        public['fee'] = dict(order['fee'])
+        public['average'] = order['cost'] / order['filled'] if order['filled'] else None
+        return public
+
+
+class AsyncExchangeSimulator:
+    """
+    Versão assíncrona do simulador (mesma API de ccxt.async_support).
+
+    A latência é simulada com asyncio.sleep, de modo que muitas requisições
+    concorrentes (ex: AsyncMarketData) esperam em paralelo sem bloquear o loop.
+    Os demais atributos (quote_around, stats, books...) são os do simulador.
+    """
+
+    def __init__(self, **kwargs):
+        """
+        Args:
+            **kwargs: Parâmetros de ExchangeSimulator
+        """
+        self.simulator = ExchangeSimulator(**kwargs)
+        self.simulator._blocking = False
+
+    def __getattr__(self, name):
+        attribute = getattr(self.simulator, name)
+        if name not in CCXT_METHODS:
+            return attribute
+
+        async def call(*args, **kwargs):
+            delay = self.simulator._delay()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            return attribute(*args, **kwargs)
+
+        return call
+
+    async def close(self):
+        """Compatível com ccxt.async_support."""
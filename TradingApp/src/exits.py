@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+from .strategies import SIGNAL_BUY, SIGNAL_SELL
+
+EXIT_SIGNAL = 'signal'
+EXIT_STOP_LOSS = 'stop_loss'
+EXIT_TAKE_PROFIT = 'take_profit'
+
+# Regras para barras em que a máxima e a mínima tocam os dois níveis:
+#   stop_first   - assume o stop (pessimista, padrão)
+#   target_first - assume o alvo (otimista)
+#   nearest_open - assume o nível mais próximo da abertura da barra
+BOTH_TOUCHED_RULES = ('stop_first', 'target_first', 'nearest_open')
+
+# Tamanho inicial do bloco examinado a cada busca; dobra a cada bloco sem toque
+_FIRST_BLOCK = 64
+
+
+def exit_levels(entry_price, stop_loss_pct=None, take_profit_pct=None):
+    """
+    Preços de stop e alvo de uma posição comprada.
+
+    Args:
+        entry_price (float): Preço de entrada
+        stop_loss_pct (float, optional): Distância do stop em %
+        take_profit_pct (float, optional): Distância do alvo em %
+
+    Returns:
+        tuple: (stop, target); níveis desligados valem -inf/inf
+    """
+    stop = entry_price * (1 - stop_loss_pct / 100) if stop_loss_pct else -np.inf
+    target = entry_price * (1 + take_profit_pct / 100) if take_profit_pct else np.inf
+    return stop, target
+
+
+def first_touch(high, low, start, end, stop, target):
+    """
+    Primeira barra em [start, end) cuja mínima toca o stop ou a máxima toca o alvo.
+
+    A busca é feita em blocos vetorizados de tamanho crescente, então o custo
+    é proporcional à distância até o toque e não ao tamanho da janela.
+
+    Args:
+        high (numpy.ndarray): Máximas
+        low (numpy.ndarray): Mínimas
+        start (int): Primeira barra examinada
+        end (int): Fim (exclusivo) da janela
+        stop (float): Nível do stop
+        target (float): Nível do alvo
+
+    Returns:
+        int or None: Índice da barra, ou None se nenhum nível foi tocado
+    """
+    block = _FIRST_BLOCK
+    while start < end:
+        stop_at = min(end, start + block)
+        touched = (low[start:stop_at] <= stop) | (high[start:stop_at] >= target)
+        k = int(touched.argmax())
+        if touched[k]:
+            return start + k
+        start = stop_at
+        block *= 2
+    return None
+
+
+def resolve_touch(open_, high, low, stop, target, rule='stop_first'):
+    """
+    Decide qual nível foi atingido em uma barra e o preço de saída.
+
+    Se a barra abre além de um nível (gap), a saída é na abertura. Se a
+    máxima e a mínima tocam os dois níveis, a regra decide qual veio antes.
+
+    Args:
+        open_ (float): Abertura da barra
+        high (float): Máxima da barra
+        low (float): Mínima da barra
+        stop (float): Nível do stop
+        target (float): Nível do alvo
+        rule (str): Uma de BOTH_TOUCHED_RULES
+
+    Returns:
+        tuple: (motivo da saída, preço de saída)
+    """
+    if open_ <= stop:
+        return EXIT_STOP_LOSS, open_
+    if open_ >= target:
+        return EXIT_TAKE_PROFIT, open_
+
+    stop_hit = low <= stop
+    target_hit = high >= target
+    if stop_hit and target_hit:
+        if rule == 'target_first':
+            stop_hit = False
+        elif rule == 'nearest_open':
+            stop_hit = open_ - stop <= target - open_
+    if stop_hit:
+        return EXIT_STOP_LOSS, stop
+    return EXIT_TAKE_PROFIT, target
+
+
+def simulate_exits(open_, high, low, close, signals, stop_loss_pct=None, take_profit_pct=None,
+                   both_touched='stop_first'):
+    """
+    Gera os trades de uma coluna de sinais com stop loss e take profit intrabar.
+
+    Entradas acontecem no fechamento da barra do BUY. A partir da barra
+    seguinte, a máxima e a mínima são comparadas com o alvo e o stop até o
+    próximo SELL; o que vier primeiro encerra o trade. Depois de um stop ou
+    alvo, a posição pode ser reaberta por um BUY no fechamento da mesma barra
+    ou de barras seguintes.
+
+    As barras de BUY e SELL são localizadas por busca binária e cada trade
+    examina só as barras até a sua saída, então o custo total é O(n).
+
+    Args:
+        open_ (numpy.ndarray): Aberturas
+        high (numpy.ndarray): Máximas
+        low (numpy.ndarray): Mínimas
+        close (numpy.ndarray): Fechamentos
+        signals (numpy.ndarray): Sinais por barra (SIGNAL_BUY, SIGNAL_SELL, SIGNAL_HOLD)
+        stop_loss_pct (float, optional): Distância do stop em %
+        take_profit_pct (float, optional): Distância do alvo em %
+        both_touched (str): Regra para barras que tocam os dois níveis
+
+    Returns:
+        tuple: (entradas, saídas, preços de saída, motivos); índices em arrays
+        numpy e motivos em lista. Posição aberta no final não gera trade.
+    """
+    if both_touched not in BOTH_TOUCHED_RULES:
+        raise ValueError(f"both_touched must be one of {BOTH_TOUCHED_RULES}, got {both_touched!r}")
+
+    open_, high, low, close = (np.asarray(values, dtype=float) for values in (open_, high, low, close))
+    signals = np.asarray(signals)
+    # Listas Python: a busca por trade é escalar, e bisect evita o custo fixo do numpy
+    buys = np.flatnonzero(signals == SIGNAL_BUY).tolist()
+    sells = np.flatnonzero(signals == SIGNAL_SELL).tolist()
+    n = len(signals)
+
+    entries, exits, exit_prices, reasons = [], [], [], []
+    ready = 0
+    while True:
+        b = bisect_left(buys, ready)
+        if b == len(buys):
+            break
+        entry = buys[b]
+        s = bisect_right(sells, entry)
+        signal_exit = sells[s] if s < len(sells) else None
+
+        stop, target = exit_levels(float(close[entry]), stop_loss_pct, take_profit_pct)
+        # O SELL encerra no fechamento; um toque na própria barra do SELL vem antes
+        end = n if signal_exit is None else signal_exit + 1
+        touch = first_touch(high, low, entry + 1, end, stop, target)
+
+        if touch is not None:
+            reason, price = resolve_touch(float(open_[touch]), float(high[touch]), float(low[touch]),
+                                          stop, target, both_touched)
+            exit_bar = touch
+        elif signal_exit is not None:
+            reason, price = EXIT_SIGNAL, float(close[signal_exit])
+            exit_bar = signal_exit
+        else:
+            break
+
+        entries.append(entry)
+        exits.append(exit_bar)
+        exit_prices.append(price)
+        reasons.append(reason)
+        ready = exit_bar
+
+    return (np.array(entries, dtype=np.intp), np.array(exits, dtype=np.intp),
+            np.array(exit_prices, dtype=float), reasons)
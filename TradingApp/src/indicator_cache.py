@@ -0,0 +1,274 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger("TradingBot-IndicatorCache")
+
+# Orçamento padrão de memória do cache (MB)
+DEFAULT_MAX_MB = 256
+
+
+def array_digest(values):
+    """
+    Hash do conteúdo de um array (dtype, formato e bytes).
+
+    Args:
+        values (numpy.ndarray): Array de entrada
+
+    Returns:
+        str: Digest hexadecimal
+    """
+    values = np.ascontiguousarray(values)
+    digest = hashlib.sha256(f"{values.dtype.str}{values.shape}".encode())
+    digest.update(memoryview(values).cast('B'))
+    return digest.hexdigest()
+
+
+class IndicatorCache:
+    """
+    Cache de indicadores endereçado pelo conteúdo dos dados.
+
+    A chave combina o hash do array de entrada com o nome e os parâmetros do
+    indicador, então o mesmo cálculo sobre os mesmos dados é reaproveitado
+    entre backtests, combinações do sweep e execuções, independentemente de
+    símbolo ou período. Os resultados ficam em memória até o orçamento em
+    bytes; os menos usados recentemente são descartados ou, com spill_dir,
+    gravados em disco (com o tempo de cálculo ao lado) e lidos depois como
+    arquivos mapeados em memória, que voltam ao LRU a cada acerto em disco.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_MB * 1024 * 1024, spill_dir=None):
+        """
+        Inicializa o cache.
+
+        Args:
+            max_bytes (int): Orçamento de memória
+            spill_dir (str, optional): Diretório para os resultados descartados da memória
+        """
+        self.max_bytes = max_bytes
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        if self.spill_dir:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+
+        self._entries = OrderedDict()  # chave -> (array, segundos de cálculo)
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.spills = 0
+        self.compute_seconds = 0.0
+        self.saved_seconds = 0.0
+
+    @staticmethod
+    def make_key(digest, name, params):
+        """Chave de um indicador: hash dos dados + nome + parâmetros."""
+        return hashlib.sha256(f"{digest}:{name}:{params!r}".encode()).hexdigest()
+
+    def _spill_path(self, key):
+        return self.spill_dir / f"{key}.npy"
+
+    def _seconds_path(self, key):
+        return self.spill_dir / f"{key}.seconds"
+
+    def _spilled_seconds(self, key):
+        try:
+            return float(self._seconds_path(key).read_text())
+        except (OSError, ValueError):
+            return 0.0
+
+    def get(self, key):
+        """
+        Busca um resultado na memória e depois no disco.
+
+        Um acerto em disco conta o tempo de cálculo gravado com o arquivo em
+        saved_seconds e devolve o array mapeado ao LRU (dentro do orçamento),
+        para que os próximos acertos não voltem ao disco.
+
+        Returns:
+            numpy.ndarray or None: Array somente leitura, ou None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.saved_seconds += entry[1]
+                return entry[0]
+
+        if self.spill_dir is not None:
+            path = self._spill_path(key)
+            if path.exists():
+                values = np.load(path, mmap_mode='r')
+                seconds = self._spilled_seconds(key)
+                with self._lock:
+                    self.disk_hits += 1
+                    self.saved_seconds += seconds
+                return self.put(key, values, seconds)
+        return None
+
+    def put(self, key, values, seconds=0.0):
+        """
+        Guarda um resultado, descartando os menos usados se passar do orçamento.
+
+        Args:
+            key (str): Chave de make_key
+            values (numpy.ndarray): Resultado (passa a ser somente leitura)
+            seconds (float): Tempo gasto no cálculo, para as estatísticas
+
+        Returns:
+            numpy.ndarray: O próprio array
+        """
+        values.flags.writeable = False
+        if values.nbytes > self.max_bytes:
+            self._spill(key, values, seconds)
+            return values
+
+        evicted = []
+        with self._lock:
+            if key in self._entries:
+                return values
+            self._entries[key] = (values, seconds)
+            self.bytes += values.nbytes
+            while self.bytes > self.max_bytes:
+                old_key, (old_values, old_seconds) = self._entries.popitem(last=False)
+                self.bytes -= old_values.nbytes
+                self.evictions += 1
+                evicted.append((old_key, old_values, old_seconds))
+
+        for old_key, old_values, old_seconds in evicted:
+            self._spill(old_key, old_values, old_seconds)
+        return values
+
+    def _spill(self, key, values, seconds=0.0):
+        if self.spill_dir is None:
+            return
+        path = self._spill_path(key)
+        if path.exists():
+            return
+        # Grava em arquivo temporário e renomeia: outros processos nunca veem
+        # arquivos parciais. O tempo de cálculo é gravado antes do array, então
+        # todo .npy visível já tem o seu .seconds
+        fd, tmp = tempfile.mkstemp(dir=self.spill_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(repr(float(seconds)))
+            os.replace(tmp, self._seconds_path(key))
+
+            fd, tmp = tempfile.mkstemp(dir=self.spill_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, values)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Failed to spill indicator {key[:12]} to {self.spill_dir}: {e}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        with self._lock:
+            self.spills += 1
+
+    def compute(self, function, values, name, *params, digest=None):
+        """
+        Retorna function(values, *params), calculando só se não estiver no cache.
+
+        Args:
+            function (callable): Função em lote do indicador
+            values (numpy.ndarray): Série de entrada
+            name (str): Nome do indicador (parte da chave)
+            *params: Parâmetros do indicador
+            digest (str, optional): array_digest(values), se já calculado
+
+        Returns:
+            numpy.ndarray: Resultado somente leitura
+        """
+        key = self.make_key(digest or array_digest(values), name, params)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        start = time.perf_counter()
+        result = np.asarray(function(values, *params))
+        seconds = time.perf_counter() - start
+        with self._lock:
+            self.misses += 1
+            self.compute_seconds += seconds
+        return self.put(key, result, seconds)
+
+    def stats(self):
+        """
+        Contadores de uso do cache.
+
+        Returns:
+            dict: hits, disk_hits, misses, evictions, spills, entries, bytes,
+                  compute_seconds e saved_seconds (tempo de cálculo evitado
+                  pelos acertos em memória)
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'spills': self.spills,
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'compute_seconds': self.compute_seconds,
+                'saved_seconds': self.saved_seconds
+            }
+
+    def clear(self):
+        """Esvazia a memória (os arquivos em disco permanecem)."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+
+# Caches compartilhados por processo, um por configuração
+_shared_caches = {}
+
+
+def shared_cache(max_mb=DEFAULT_MAX_MB, spill_dir=None):
+    """
+    Cache único do processo para uma configuração.
+
+    Backtests e combinações do sweep executados no mesmo processo (inclusive
+    em cada worker) reaproveitam os mesmos resultados.
+
+    Args:
+        max_mb (float): Orçamento de memória em MB
+        spill_dir (str, optional): Diretório para spill em disco
+
+    Returns:
+        IndicatorCache: Cache compartilhado
+    """
+    key = (max_mb, str(spill_dir) if spill_dir else None)
+    if key not in _shared_caches:
+        _shared_caches[key] = IndicatorCache(int(max_mb * 1024 * 1024), spill_dir)
+    return _shared_caches[key]
+
+
+def cache_from_config(config):
+    """
+    Cache definido em backtest.indicator_cache da configuração.
+
+    Args:
+        config (dict): Configuração completa
+
+    Returns:
+        IndicatorCache or None: None se desativado (enabled = false)
+    """
+    settings = config.get('backtest', {}).get('indicator_cache', {})
+    if not settings.get('enabled', True):
+        return None
+    return shared_cache(settings.get('max_mb', DEFAULT_MAX_MB), settings.get('spill_dir'))
@@ -0,0 +1,500 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Indicadores técnicos com atualização incremental O(1) e versão em lote.
+
+Cada indicador tem uma classe com estado (update recebe uma barra e devolve
+o valor atual, NaN enquanto não há barras suficientes) e uma função em lote
+sobre arrays numpy. As duas versões executam exatamente as mesmas operações
+de ponto flutuante, na mesma ordem, e por isso produzem resultados idênticos
+bit a bit: o backtest (lote) e o loop ao vivo (incremental) sempre veem os
+mesmos valores.
+
+SMA e Bollinger usam somas acumuladas (np.cumsum é sequencial) dos desvios
+em relação ao primeiro valor, o que reduz o erro de cancelamento nas
+diferenças de somas. Os indicadores recursivos (EMA, WMA, RSI, ATR, MACD)
+são calculados em lote pelo mesmo kernel da versão incremental.
+"""
+
+import math
+from collections import deque
+
+import numpy as np
+
+from .indicator_cache import array_digest
+
+NAN = float('nan')
+
+
+def _as_array(values):
+    return np.asarray(values, dtype=np.float64)
+
+
+def _run(indicator, *columns):
+    """Executa o kernel incremental sobre colunas inteiras (versão em lote)."""
+    columns = [_as_array(column).tolist() for column in columns]
+    update = indicator.update
+    return np.array([update(*row) for row in zip(*columns)], dtype=np.float64)
+
+
+class _WindowSums:
+    """
+    Somas móveis de desvios (e de seus quadrados) pela diferença de somas acumuladas.
+
+    Guarda as últimas period+1 somas acumuladas; a soma da janela é
+    S[t] - S[t - period], com S[-1] = 0.
+    """
+
+    def __init__(self, period, squares=False):
+        self.period = period
+        self.squares = squares
+        self.reset()
+
+    def reset(self):
+        self.reference = None
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.history = deque([(0.0, 0.0)], maxlen=self.period + 1)
+
+    def update(self, value):
+        if self.reference is None:
+            self.reference = value
+        deviation = value - self.reference
+        self.total += deviation
+        if self.squares:
+            self.total_sq += deviation * deviation
+        self.history.append((self.total, self.total_sq))
+        if len(self.history) <= self.period:
+            return None
+        old_total, old_sq = self.history[0]
+        return self.total - old_total, self.total_sq - old_sq
+
+
+def _window_sums(values, period, squares=False):
+    """Versão em lote de _WindowSums: (somas da janela, somas dos quadrados, referência)."""
+    if len(values) == 0:
+        return np.empty(0), np.empty(0), 0.0
+    reference = values[0]
+    deviation = values - reference
+    totals = np.concatenate(([0.0], np.cumsum(deviation)))
+    sums = totals[period:] - totals[:-period]
+    squares_sums = None
+    if squares:
+        totals_sq = np.concatenate(([0.0], np.cumsum(deviation * deviation)))
+        squares_sums = totals_sq[period:] - totals_sq[:-period]
+    return sums, squares_sums, reference
+
+
+def _check_period(period):
+    if int(period) != period or period < 1:
+        raise ValueError(f"period must be a positive integer, got {period}")
+    return int(period)
+
+
+class SMA:
+    """Média móvel simples."""
+
+    def __init__(self, period):
+        """
+        Args:
+            period (int): Número de barras da média
+        """
+        self.period = _check_period(period)
+        self._sums = _WindowSums(self.period)
+        self.value = NAN
+
+    def reset(self):
+        """Descarta o estado acumulado."""
+        self._sums.reset()
+        self.value = NAN
+
+    def update(self, value):
+        """
+        Args:
+            value (float): Novo valor (ex: fechamento)
+
+        Returns:
+            float: Média das últimas period barras (NaN no aquecimento)
+        """
+        sums = self._sums.update(float(value))
+        if sums is not None:
+            self.value = self._sums.reference + sums[0] / self.period
+        return self.value
+
+
+def sma(values, period):
+    """
+    Média móvel simples em lote.
+
+    Args:
+        values (numpy.ndarray): Série de valores
+        period (int): Número de barras da média
+
+    Returns:
+        numpy.ndarray: Médias (NaN nas primeiras period - 1 barras)
+    """
+    values = _as_array(values)
+    period = _check_period(period)
+    out = np.full(len(values), np.nan)
+    if len(values) >= period:
+        sums, _, reference = _window_sums(values, period)
+        out[period - 1:] = reference + sums / period
+    return out
+
+
+class EMA:
+    """Média móvel exponencial (semeada com a SMA das primeiras period barras)."""
+
+    def __init__(self, period):
+        """
+        Args:
+            period (int): Período da média (alpha = 2 / (period + 1))
+        """
+        self.period = _check_period(period)
+        self.alpha = 2.0 / (self.period + 1)
+        self.reset()
+
+    def reset(self):
+        """Descarta o estado acumulado."""
+        self._count = 0
+        self._sum = 0.0
+        self.value = NAN
+
+    def update(self, value):
+        """
+        Args:
+            value (float): Novo valor
+
+        Returns:
+            float: Valor atual da média (NaN no aquecimento)
+        """
+        value = float(value)
+        if self._count < self.period:
+            self._count += 1
+            self._sum += value
+            if self._count == self.period:
+                self.value = self._sum / self.period
+            return self.value
+        self.value = self.value + self.alpha * (value - self.value)
+        return self.value
+
+
+def ema(values, period):
+    """
+    Média móvel exponencial em lote.
+
+    Returns:
+        numpy.ndarray: Médias (NaN nas primeiras period - 1 barras)
+    """
+    return _run(EMA(period), values)
+
+
+class WMA:
+    """Média móvel ponderada linearmente (peso period na barra mais recente)."""
+
+    def __init__(self, period):
+        """
+        Args:
+            period (int): Número de barras da média
+        """
+        self.period = _check_period(period)
+        self._denominator = self.period * (self.period + 1) / 2
+        self.reset()
+
+    def reset(self):
+        """Descarta o estado acumulado."""
+        self._window = deque(maxlen=self.period)
+        self._numerator = 0.0
+        self._sum = 0.0
+        self.value = NAN
+
+    def update(self, value):
+        """
+        Args:
+            value (float): Novo valor
+
+        Returns:
+            float: Valor atual da média (NaN no aquecimento)
+        """
+        value = float(value)
+        window = self._window
+        if len(window) == self.period:
+            # Cada peso cai uma unidade e a barra nova entra com peso period
+            self._numerator += self.period * value - self._sum
+            self._sum += value - window[0]
+        else:
+            self._numerator += (len(window) + 1) * value
+            self._sum += value
+        window.append(value)
+
+        if len(window) == self.period:
+            self.value = self._numerator / self._denominator
+        return self.value
+
+
+def wma(values, period):
+    """
+    Média móvel ponderada em lote.
+
+    Returns:
+        numpy.ndarray: Médias (NaN nas primeiras period - 1 barras)
+    """
+    return _run(WMA(period), values)
+
+
+class RSI:
+    """Índice de força relativa com a suavização de Wilder."""
+
+    def __init__(self, period=14):
+        """
+        Args:
+            period (int): Período da suavização
+        """
+        self.period = _check_period(period)
+        self.reset()
+
+    def reset(self):
+        """Descarta o estado acumulado."""
+        self._previous = None
+        self._count = 0
+        self._gain = 0.0
+        self._loss = 0.0
+        self.value = NAN
+
+    def update(self, value):
+        """
+        Args:
+            value (float): Novo fechamento
+
+        Returns:
+            float: RSI entre 0 e 100 (NaN nas primeiras period barras)
+        """
+        value = float(value)
+        previous, self._previous = self._previous, value
+        if previous is None:
+            return self.value
+
+        change = value - previous
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        if self._count < self.period:
+            self._count += 1
+            self._gain += gain
+            self._loss += loss
+            if self._count < self.period:
+                return self.value
+            self._gain /= self.period
+            self._loss /= self.period
+        else:
+            self._gain = (self._gain * (self.period - 1) + gain) / self.period
+            self._loss = (self._loss * (self.period - 1) + loss) / self.period
+
+        if self._loss == 0:
+            self.value = 100.0 if self._gain > 0 else 50.0
+        else:
+            self.value = 100.0 - 100.0 / (1.0 + self._gain / self._loss)
+        return self.value
+
+
+def rsi(values, period=14):
+    """
+    RSI em lote.
+
+    Returns:
+        numpy.ndarray: RSI por barra (NaN nas primeiras period barras)
+    """
+    return _run(RSI(period), values)
+
+
+class ATR:
+    """Average True Range com a suavização de Wilder."""
+
+    def __init__(self, period=14):
+        """
+        Args:
+            period (int): Período da suavização
+        """
+        self.period = _check_period(period)
+        self.reset()
+
+    def reset(self):
+        """Descarta o estado acumulado."""
+        self._previous_close = None
+        self._count = 0
+        self._sum = 0.0
+        self.value = NAN
+
+    def update(self, high, low, close):
+        """
+        Args:
+            high (float): Máxima da barra
+            low (float): Mínima da barra
+            close (float): Fechamento da barra
+
+        Returns:
+            float: ATR atual (NaN nas primeiras period - 1 barras)
+        """
+        high, low, close = float(high), float(low), float(close)
+        previous, self._previous_close = self._previous_close, close
+        true_range = high - low
+        if previous is not None:
+            true_range = max(true_range, abs(high - previous), abs(low - previous))
+
+        if self._count < self.period:
+            self._count += 1
+            self._sum += true_range
+            if self._count == self.period:
+                self.value = self._sum / self.period
+            return self.value
+        self.value = (self.value * (self.period - 1) + true_range) / self.period
+        return self.value
+
+
+def atr(high, low, close, period=14):
+    """
+    ATR em lote.
+
+    Returns:
+        numpy.ndarray: ATR por barra (NaN nas primeiras period - 1 barras)
+    """
+    return _run(ATR(period), high, low, close)
+
+
+class Bollinger:
+    """Bandas de Bollinger (média simples ± num_std desvios-padrão populacionais)."""
+
+    def __init__(self, period=20, num_std=2.0):
+        """
+        Args:
+            period (int): Número de barras da janela
+            num_std (float): Largura das bandas em desvios-padrão
+        """
+        self.period = _check_period(period)
+        self.num_std = num_std
+        self._sums = _WindowSums(self.period, squares=True)
+        self.value = (NAN, NAN, NAN)
+
+    def reset(self):
+        """Descarta o estado acumulado."""
+        self._sums.reset()
+        self.value = (NAN, NAN, NAN)
+
+    def update(self, value):
+        """
+        Args:
+            value (float): Novo valor
+
+        Returns:
+            tuple: (média, banda superior, banda inferior), NaN no aquecimento
+        """
+        sums = self._sums.update(float(value))
+        if sums is not None:
+            mean_deviation = sums[0] / self.period
+            variance = sums[1] / self.period - mean_deviation * mean_deviation
+            width = self.num_std * math.sqrt(max(variance, 0.0))
+            middle = self._sums.reference + mean_deviation
+            self.value = (middle, middle + width, middle - width)
+        return self.value
+
+
+def bollinger(values, period=20, num_std=2.0):
+    """
+    Bandas de Bollinger em lote.
+
+    Returns:
+        tuple: Arrays (média, banda superior, banda inferior)
+    """
+    values = _as_array(values)
+    period = _check_period(period)
+    middle, upper, lower = (np.full(len(values), np.nan) for _ in range(3))
+    if len(values) >= period:
+        sums, squares_sums, reference = _window_sums(values, period, squares=True)
+        mean_deviation = sums / period
+        variance = squares_sums / period - mean_deviation * mean_deviation
+        width = num_std * np.sqrt(np.maximum(variance, 0.0))
+        middle[period - 1:] = reference + mean_deviation
+        upper[period - 1:] = middle[period - 1:] + width
+        lower[period - 1:] = middle[period - 1:] - width
+    return middle, upper, lower
+
+
+class MACD:
+    """MACD: diferença entre EMAs rápida e lenta, com linha de sinal."""
+
+    def __init__(self, fast_period=12, slow_period=26, signal_period=9):
+        """
+        Args:
+            fast_period (int): Período da EMA rápida
+            slow_period (int): Período da EMA lenta
+            signal_period (int): Período da EMA da linha de sinal
+        """
+        if fast_period >= slow_period:
+            raise ValueError("fast_period must be smaller than slow_period")
+        self._fast = EMA(fast_period)
+        self._slow = EMA(slow_period)
+        self._signal = EMA(signal_period)
+        self.value = (NAN, NAN, NAN)
+
+    def reset(self):
+        """Descarta o estado acumulado."""
+        self._fast.reset()
+        self._slow.reset()
+        self._signal.reset()
+        self.value = (NAN, NAN, NAN)
+
+    def update(self, value):
+        """
+        Args:
+            value (float): Novo fechamento
+
+        Returns:
+            tuple: (macd, sinal, histograma), NaN no aquecimento
+        """
+        fast = self._fast.update(value)
+        slow = self._slow.update(value)
+        if slow != slow:
+            return self.value
+        line = fast - slow
+        signal = self._signal.update(line)
+        self.value = (line, signal, line - signal)
+        return self.value
+
+
+def macd(values, fast_period=12, slow_period=26, signal_period=9):
+    """
+    MACD em lote.
+
+    Returns:
+        tuple: Arrays (macd, sinal, histograma)
+    """
+    indicator = MACD(fast_period, slow_period, signal_period)
+    update = indicator.update
+    rows = [update(value) for value in _as_array(values).tolist()]
+    result = np.array(rows, dtype=np.float64).reshape(-1, 3)
+    return result[:, 0], result[:, 1], result[:, 2]
+
+
+# Indicadores de uma única série (fechamentos), pelo nome usado nas chaves
+BATCH_INDICATORS = {'sma': sma, 'ema': ema, 'wma': wma, 'rsi': rsi}
+
+
+def compute_indicators(close, keys, cache=None):
+    """
+    Calcula vários indicadores sobre a mesma série, uma vez por chave distinta.
+
+    Args:
+        close (numpy.ndarray): Preços de fechamento
+        keys (iterable): Chaves (nome, período) com nome em BATCH_INDICATORS
+        cache (IndicatorCache, optional): Cache consultado antes de calcular
+
+    Returns:
+        dict: Chave -> array alinhado com close
+    """
+    close = _as_array(close)
+    keys = dict.fromkeys(keys)
+    if cache is None:
+        return {key: BATCH_INDICATORS[key[0]](close, *key[1:]) for key in keys}
+
+    # O hash da série é calculado uma vez para todas as chaves
+    digest = array_digest(close)
+    return {key: cache.compute(BATCH_INDICATORS[key[0]], close, key[0], *key[1:], digest=digest) for key in keys}
@@ -45,6 +45,8 @@ def parse_arguments():
                         help=f'Limite de lucro percentual (padrão: {config.LIMITE_LUCRO_PERCENTUAL})')
     parser.add_argument('--stop', type=float, default=config.STOP_LOSS_PERCENTUAL,
                         help=f'Stop loss percentual (padrão: {config.STOP_LOSS_PERCENTUAL})')
+    parser.add_argument('--flush-intervalo', type=float, default=1.0,
+                        help='Intervalo máximo (em segundos) entre gravações do registro de operações (padrão: 1.0)')
     
     return parser.parse_args()
 
@@ -58,14 +60,15 @@ def main():
     args = parse_arguments()
     logger.info(f"Modo de execução: {args.modo}")
     
-    # Criar monitor de desempenho
-    monitor = PerformanceMonitor()
+    # Criar monitor de desempenho (gravação em thread separada, fora do loop de trading)
+    monitor = PerformanceMonitor(async_writes=True, flush_interval=args.flush_intervalo)
     
     # Executar de acordo com o modo
     if args.modo == 'backtest':
         logger.info("Iniciando backtest...")
         demo_backtest()
         logger.info("Backtest concluído")
+        monitor.close()
         return
     
     # Verificar credenciais da API
@@ -135,19 +138,20 @@ def main():
     except KeyboardInterrupt:
         logger.info("Bot interrompido pelo usuário")
         
-        # Gerar relatório final
-        logger.info("Gerando relatório de desempenho...")
-        monitor.generate_performance_report()
-        monitor.print_summary()
-        
     except Exception as e:
         logger.error(f"Erro crítico: {str(e)}", exc_info=True)
-        # Tentar gerar relatório mesmo em caso de erro
+        
+    finally:
+        # Em toda saída (normal, interrupção ou erro): gravar as operações
+        # pendentes na fila antes que a thread de escrita (daemon) morra com
+        # o interpretador, e então gerar o relatório final
+        monitor.close()
         try:
+            logger.info("Gerando relatório de desempenho...")
             monitor.generate_performance_report()
             monitor.print_summary()
-        except:
-            pass
+        except Exception as e:
+            logger.error(f"Falha ao gerar o relatório final: {str(e)}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
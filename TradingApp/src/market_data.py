@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger("TradingBot-MarketData")
+
+
+def create_async_exchange(exchange_id='binance', api_key=None, api_secret=None, options=None):
+    """
+    Cria uma exchange assíncrona do ccxt (ccxt.async_support).
+
+    Cada instância mantém uma única sessão HTTP (pool de conexões), que deve
+    ser encerrada com "await exchange.close()".
+
+    Args:
+        exchange_id (str): Identificador da exchange no ccxt
+        api_key (str, optional): Chave da API
+        api_secret (str, optional): Segredo da API
+        options (dict, optional): Parâmetros extras repassados ao ccxt
+
+    Returns:
+        Exchange assíncrona do ccxt
+    """
+    try:
+        import ccxt.async_support as ccxt_async
+    except ImportError as e:
+        raise ImportError("ccxt is required for live market data (pip install ccxt)") from e
+
+    params = {'enableRateLimit': True, **(options or {})}
+    if api_key and api_secret:
+        params.update(apiKey=api_key, secret=api_secret)
+    return getattr(ccxt_async, exchange_id)(params)
+
+
+class AsyncMarketData:
+    """
+    Camada de dados de mercado que consulta todos os símbolos em paralelo.
+
+    As requisições de um ciclo são disparadas ao mesmo tempo sobre a mesma
+    exchange (e portanto a mesma sessão HTTP), cada uma com seu próprio
+    timeout. A duração do ciclo passa a ser a do símbolo mais lento, e não a
+    soma de todos; um símbolo lento ou com erro não bloqueia os demais.
+    """
+
+    def __init__(self, exchange=None, exchange_id='binance', timeout=10.0, max_concurrency=None,
+                 api_key=None, api_secret=None):
+        """
+        Inicializa a camada de dados.
+
+        Args:
+            exchange (optional): Exchange assíncrona com API do ccxt (ex: uma exchange
+                falsa nos testes). Se omitida, é criada com create_async_exchange.
+            exchange_id (str): Exchange do ccxt usada quando exchange não é informada
+            timeout (float): Tempo máximo (s) de cada requisição por símbolo
+            max_concurrency (int, optional): Máximo de requisições simultâneas
+            api_key (str, optional): Chave da API
+            api_secret (str, optional): Segredo da API
+        """
+        self._owns_exchange = exchange is None
+        self.exchange = exchange if exchange is not None else create_async_exchange(exchange_id, api_key, api_secret)
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        # Criado no primeiro uso, dentro do loop em execução: no Python 3.8/3.9 um
+        # Semaphore se prende ao loop corrente na construção
+        self._semaphore = None
+        self._semaphore_loop = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """Encerra a sessão da exchange, se ela foi criada por esta instância."""
+        if self._owns_exchange:
+            await self.exchange.close()
+
+    def _limiter(self):
+        """Semáforo de concorrência do loop em execução (recriado se o loop mudar)."""
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _call(self, method, *args, **kwargs):
+        if not self.max_concurrency:
+            return await asyncio.wait_for(method(*args, **kwargs), self.timeout)
+        async with self._limiter():
+            return await asyncio.wait_for(method(*args, **kwargs), self.timeout)
+
+    async def fetch_ohlcv(self, symbol, timeframe='5m', limit=100):
+        """
+        Busca os candles de um símbolo.
+
+        Returns:
+            list: Linhas [timestamp_ms, open, high, low, close, volume]
+        """
+        return await self._call(self.exchange.fetch_ohlcv, symbol, timeframe, limit=limit)
+
+    async def fetch_ticker(self, symbol):
+        """
+        Busca o ticker de um símbolo.
+
+        Returns:
+            dict: Ticker no formato do ccxt
+        """
+        return await self._call(self.exchange.fetch_ticker, symbol)
+
+    async def _gather(self, requests):
+        """Executa as requisições (símbolo -> corrotina) em paralelo e separa resultados e erros."""
+        symbols = list(requests)
+        results = await asyncio.gather(*requests.values(), return_exceptions=True)
+
+        data, errors = {}, {}
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, asyncio.TimeoutError):
+                errors[symbol] = TimeoutError(f"Timed out after {self.timeout}s")
+            elif isinstance(result, Exception):
+                errors[symbol] = result
+            else:
+                data[symbol] = result
+
+        for symbol, error in errors.items():
+            logger.warning(f"Failed to fetch market data for {symbol}: {error}")
+        return data, errors
+
+    async def poll(self, symbols, timeframe='5m', limit=100, tickers=False):
+        """
+        Executa um ciclo de consulta de todos os símbolos em paralelo.
+
+        Args:
+            symbols (list): Símbolos a consultar
+            timeframe (str): Timeframe dos candles
+            limit (int): Número de candles por símbolo
+            tickers (bool): Também busca o ticker de cada símbolo
+
+        Returns:
+            dict: ohlcv (símbolo -> candles), tickers (símbolo -> ticker),
+                  errors (símbolo -> exceção) e elapsed (duração do ciclo em s)
+        """
+        start = time.perf_counter()
+        requests = {symbol: self.fetch_ohlcv(symbol, timeframe, limit) for symbol in symbols}
+
+        if tickers:
+            ticker_requests = {symbol: self.fetch_ticker(symbol) for symbol in symbols}
+            (ohlcv, errors), (ticker_data, ticker_errors) = await asyncio.gather(
+                self._gather(requests), self._gather(ticker_requests))
+            for symbol, error in ticker_errors.items():
+                errors.setdefault(symbol, error)
+        else:
+            ohlcv, errors = await self._gather(requests)
+            ticker_data = {}
+
+        return {
+            'ohlcv': ohlcv,
+            'tickers': ticker_data,
+            'errors': errors,
+            'elapsed': time.perf_counter() - start
+        }
+
+
+async def run_polling_loop(market_data, symbols, on_data, interval=300, timeframe='5m', limit=100,
+                           tickers=False, stop_event=None, max_cycles=None):
+    """
+    Loop ao vivo: consulta todos os símbolos a cada intervalo e entrega o resultado.
+
+    Os ciclos seguem uma grade fixa de tempo (início + n * intervalo), de modo
+    que a latência das consultas não desloca os ciclos seguintes.
+
+    Args:
+        market_data (AsyncMarketData): Camada de dados
+        symbols (list): Símbolos a consultar
+        on_data (callable): Função (ou corrotina) chamada com o resultado de cada ciclo
+        interval (float): Intervalo entre ciclos (s)
+        timeframe (str): Timeframe dos candles
+        limit (int): Número de candles por símbolo
+        tickers (bool): Também busca os tickers
+        stop_event (asyncio.Event, optional): Encerra o loop quando sinalizado
+        max_cycles (int, optional): Número máximo de ciclos
+
+    Returns:
+        int: Número de ciclos executados
+    """
+    loop = asyncio.get_running_loop()
+    next_cycle = loop.time()
+    cycles = 0
+
+    while not (stop_event is not None and stop_event.is_set()):
+        snapshot = await market_data.poll(symbols, timeframe, limit, tickers)
+        result = on_data(snapshot)
+        if asyncio.iscoroutine(result):
+            await result
+
+        cycles += 1
+        if max_cycles is not None and cycles >= max_cycles:
+            break
+
+        # Pula ciclos perdidos se o processamento passou do intervalo
+        next_cycle += interval
+        now = loop.time()
+        if next_cycle < now:
+            next_cycle += interval * ((now - next_cycle) // interval + 1)
+
+        if stop_event is None:
+            await asyncio.sleep(next_cycle - now)
+        else:
+            try:
+                await asyncio.wait_for(stop_event.wait(), next_cycle - now)
+            except asyncio.TimeoutError:
+                pass
+
+    return cycles
+
+
+def poll_once(symbols, timeframe='5m', limit=100, tickers=False, **kwargs):
+    """
+    Executa um único ciclo de consulta a partir de código síncrono.
+
+    Args:
+        symbols (list): Símbolos a consultar
+        timeframe (str): Timeframe dos candles
+        limit (int): Número de candles por símbolo
+        tickers (bool): Também busca os tickers
+        **kwargs: Parâmetros de AsyncMarketData
+
+    Returns:
+        dict: Resultado de AsyncMarketData.poll
+    """
+    async def _poll():
+        async with AsyncMarketData(**kwargs) as market_data:
+            return await market_data.poll(symbols, timeframe, limit, tickers)
+
+    return asyncio.run(_poll())
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+# Taxa livre de risco anual usada em Sharpe e Sortino
+RISK_FREE_RATE = 0.02
+
+
+def position_from_trades(timestamps, trades):
+    """
+    Reconstrói a posição (0 ou 1) ao fim de cada barra a partir dos trades.
+
+    A posição vale 1 da barra de entrada até a barra anterior à saída, já que
+    entradas e saídas acontecem no fechamento da barra.
+
+    Args:
+        timestamps (numpy.ndarray): Timestamps ordenados das barras
+        trades (list): Trades com entry_time e exit_time
+
+    Returns:
+        numpy.ndarray: Posição por barra (int8)
+    """
+    timestamps = np.asarray(timestamps)
+    delta = np.zeros(len(timestamps) + 1, dtype=np.int8)
+    if trades:
+        entry_times = np.array([t['entry_time'] for t in trades], dtype=timestamps.dtype)
+        exit_times = np.array([t['exit_time'] for t in trades], dtype=timestamps.dtype)
+        np.add.at(delta, np.searchsorted(timestamps, entry_times), 1)
+        np.add.at(delta, np.searchsorted(timestamps, exit_times), -1)
+    return np.cumsum(delta[:-1], dtype=np.int8)
+
+
+def exit_marks(timestamps, trades):
+    """
+    Preços de saída dos trades por barra, para marcar a curva de capital.
+
+    Args:
+        timestamps (numpy.ndarray): Timestamps ordenados das barras
+        trades (list): Trades com exit_time e exit_price
+
+    Returns:
+        tuple: (índices das barras de saída, preços de saída)
+    """
+    timestamps = np.asarray(timestamps)
+    exit_times = np.array([t['exit_time'] for t in trades], dtype=timestamps.dtype)
+    return np.searchsorted(timestamps, exit_times), np.array([t['exit_price'] for t in trades], dtype=float)
+
+
+def equity_curve(close, position, initial_capital=10000, exits=None):
+    """
+    Curva de capital marcada a mercado barra a barra.
+
+    Args:
+        close (numpy.ndarray): Preços de fechamento
+        position (numpy.ndarray): Posição ao fim de cada barra
+        initial_capital (float): Capital inicial
+        exits (tuple, optional): (barras, preços) de saídas fora do fechamento,
+            como stops intrabar; veja exit_marks
+
+    Returns:
+        numpy.ndarray: Capital ao fim de cada barra
+    """
+    close = np.asarray(close, dtype=float)
+    growth = np.ones(len(close))
+    if len(close) > 1:
+        marks = close
+        if exits is not None:
+            marks = close.copy()
+            marks[exits[0]] = exits[1]
+        growth[1:] += position[:-1] * (marks[1:] / close[:-1] - 1)
+    return initial_capital * np.cumprod(growth)
+
+
+def max_drawdown_stats(equity):
+    """
+    Drawdown máximo (%) e maior duração (em barras) abaixo do topo anterior.
+
+    Args:
+        equity (numpy.ndarray): Curva de capital
+
+    Returns:
+        tuple: (max_drawdown_pct, max_drawdown_duration)
+    """
+    if len(equity) == 0:
+        return 0.0, 0
+    peak = np.maximum.accumulate(equity)
+    max_drawdown = float(np.max((peak - equity) / peak) * 100)
+
+    # Distância entre barras consecutivas que estão no topo
+    at_peak = np.flatnonzero(equity >= peak)
+    gaps = np.diff(np.append(at_peak, len(equity))) - 1
+    return max_drawdown, int(gaps.max())
+
+
+def compute_metrics(equity, position, bars_per_year, risk_free_rate=RISK_FREE_RATE):
+    """
+    Métricas de risco e retorno a partir da curva de capital por barra.
+
+    Todas as métricas são calculadas em O(n) com numpy e anualizadas pelo
+    número de barras em um ano de negociação 24/7 (105120 para '5m').
+
+    Args:
+        equity (numpy.ndarray): Capital ao fim de cada barra
+        position (numpy.ndarray): Posição ao fim de cada barra
+        bars_per_year (float): Barras por ano (ver src.timeframes)
+        risk_free_rate (float): Taxa livre de risco anual
+
+    Returns:
+        dict: profit_loss, max_drawdown, max_drawdown_duration, sharpe_ratio,
+              sortino_ratio, calmar_ratio, exposure e turnover
+    """
+    equity = np.asarray(equity, dtype=float)
+    max_drawdown, max_drawdown_duration = max_drawdown_stats(equity)
+
+    if len(equity) < 2:
+        return {
+            'profit_loss': 0.0,
+            'max_drawdown': max_drawdown,
+            'max_drawdown_duration': max_drawdown_duration,
+            'sharpe_ratio': 0.0,
+            'sortino_ratio': 0.0,
+            'calmar_ratio': 0.0,
+            'exposure': float(np.mean(position) * 100) if len(position) else 0.0,
+            'turnover': 0.0
+        }
+
+    returns = equity[1:] / equity[:-1] - 1
+    excess = returns - risk_free_rate / bars_per_year
+    std = returns.std()
+    downside = np.sqrt(np.mean(np.minimum(excess, 0) ** 2))
+
+    years = (len(equity) - 1) / bars_per_year
+    total_return = equity[-1] / equity[0]
+    annual_return = total_return ** (1 / years) - 1
+
+    return {
+        'profit_loss': float((total_return - 1) * 100),
+        'max_drawdown': max_drawdown,
+        'max_drawdown_duration': max_drawdown_duration,
+        'sharpe_ratio': float(excess.mean() / std * np.sqrt(bars_per_year)) if std > 0 else 0.0,
+        'sortino_ratio': float(excess.mean() / downside * np.sqrt(bars_per_year)) if downside > 0 else 0.0,
+        'calmar_ratio': float(annual_return / (max_drawdown / 100)) if max_drawdown > 0 else 0.0,
+        # Percentual das barras com posição aberta
+        'exposure': float(np.mean(position) * 100),
+        # Mudanças de posição (entradas + saídas) por ano
+        'turnover': float(np.abs(np.diff(position.astype(np.int8))).sum() / years)
+    }
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+
+import numpy as np
+
+from .metrics import max_drawdown_stats
+
+logger = logging.getLogger("TradingBot-MonteCarlo")
+
+# Métodos de reamostragem:
+#   bootstrap - sorteia trades com reposição (varia retorno final e drawdown)
+#   shuffle   - reordena os mesmos trades (retorno final fixo, varia o drawdown)
+METHODS = ('bootstrap', 'shuffle')
+
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Memória máxima das matrizes de cada bloco de simulações
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def _trade_returns(trades):
+    if len(trades) and isinstance(trades[0], dict):
+        return np.array([trade['profit_pct'] for trade in trades], dtype=float) / 100
+    return np.asarray(trades, dtype=float) / 100
+
+
+def _simulate_chunk(growth, rows, method, rng, ruin_level):
+    """
+    Simula um bloco de curvas de capital (rows × trades), normalizadas em 1.
+
+    Returns:
+        tuple: (retornos finais, drawdowns máximos, flags de ruína)
+    """
+    n = len(growth)
+    if method == 'bootstrap':
+        equity = growth[rng.integers(0, n, size=(rows, n))]
+    else:
+        equity = rng.permuted(np.broadcast_to(growth, (rows, n)), axis=1)
+
+    np.cumprod(equity, axis=1, out=equity)
+    final = equity[:, -1] - 1
+    ruined = equity.min(axis=1) <= ruin_level
+
+    # Topo anterior, contando o capital inicial (1.0) como primeiro topo
+    peak = np.maximum.accumulate(equity, axis=1)
+    np.maximum(peak, 1.0, out=peak)
+    np.divide(equity, peak, out=equity)
+    drawdown = 1 - equity.min(axis=1)
+    return final, drawdown, ruined
+
+
+def monte_carlo(trades, simulations=10000, method='bootstrap', ruin_pct=50.0, percentiles=DEFAULT_PERCENTILES,
+                max_bytes=DEFAULT_MAX_BYTES, seed=None):
+    """
+    Análise de Monte Carlo dos retornos dos trades.
+
+    Cada simulação é uma linha de uma matriz (simulações × trades) com os
+    retornos reamostrados; a curva de capital composta, o retorno final, o
+    drawdown máximo e a ruína são calculados para todas as linhas de uma vez.
+    As simulações são processadas em blocos para que as matrizes não passem
+    de max_bytes.
+
+    Args:
+        trades (list): Trades de Backtest.results['trades'] (com profit_pct) ou
+            retornos por trade em %
+        simulations (int): Número de simulações
+        method (str): 'bootstrap' (com reposição) ou 'shuffle' (reordenação)
+        ruin_pct (float): Perda (% do capital inicial) considerada ruína
+        percentiles (tuple): Percentis reportados
+        max_bytes (int): Memória máxima por bloco
+        seed (int, optional): Semente para reprodutibilidade
+
+    Returns:
+        dict: final_return e max_drawdown (percentil -> %), risk_of_ruin e
+        probability_of_loss (%), e os valores da ordem original dos trades
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}, got {method!r}")
+
+    returns = _trade_returns(trades)
+    if not len(returns):
+        raise ValueError("Monte Carlo needs at least one trade")
+
+    growth = 1 + returns
+    n = len(growth)
+    ruin_level = 1 - ruin_pct / 100
+    rng = np.random.default_rng(seed)
+
+    # Cada bloco chega a 3 matrizes de 8 bytes por célula: índices (bootstrap),
+    # curva de capital e topo acumulado (np.maximum.accumulate não opera in-place)
+    chunk = max(1, min(simulations, max_bytes // (3 * 8 * n)))
+    final = np.empty(simulations)
+    drawdown = np.empty(simulations)
+    ruined = np.empty(simulations, dtype=bool)
+    for start in range(0, simulations, chunk):
+        stop = min(start + chunk, simulations)
+        final[start:stop], drawdown[start:stop], ruined[start:stop] = _simulate_chunk(
+            growth, stop - start, method, rng, ruin_level)
+
+    original = np.concatenate([[1.0], np.cumprod(growth)])
+    original_drawdown, _ = max_drawdown_stats(original)
+    logger.info(f"Monte Carlo: {simulations} {method} simulations of {n} trades in chunks of {chunk}")
+
+    return {
+        'simulations': simulations,
+        'trades': n,
+        'method': method,
+        'final_return': {p: float(v) for p, v in zip(percentiles, np.percentile(final, percentiles) * 100)},
+        'max_drawdown': {p: float(v) for p, v in zip(percentiles, np.percentile(drawdown, percentiles) * 100)},
+        'risk_of_ruin': float(ruined.mean() * 100),
+        'probability_of_loss': float(np.mean(final < 0) * 100),
+        'original_return': float((original[-1] - 1) * 100),
+        'original_max_drawdown': original_drawdown
+    }
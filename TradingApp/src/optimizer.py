@@ -0,0 +1,286 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import copy
+import gc
+import itertools
+import logging
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory, util
+
+import numpy as np
+import pandas as pd
+
+from .backtesting import Backtest
+from .strategies import create_strategy
+
+logger = logging.getLogger("TradingBot-Optimizer")
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+# Métricas em que valores menores são melhores na ordenação do sweep
+LOWER_IS_BETTER = {'max_drawdown'}
+
+# Parâmetros do sweep gravados na seção "risk" (os demais vão para "strategy")
+RISK_PARAMS = {'stop_loss_pct', 'take_profit_pct', 'both_touched', 'max_position_size'}
+
+
+class SharedOHLCV:
+    """
+    Dados OHLCV em memória compartilhada.
+
+    O bloco guarda os timestamps (int64, ns) seguidos das colunas OHLCV
+    (float64). Os workers recebem apenas o descritor (nome, tamanho) e
+    montam o DataFrame sobre o mesmo buffer, sem cópia via pickle.
+    """
+
+    def __init__(self, data):
+        """
+        Copia os dados uma única vez para um bloco de memória compartilhada.
+
+        Args:
+            data (pandas.DataFrame): Dados históricos
+        """
+        self.length = len(data)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, self.length * 8 * (1 + len(OHLCV_COLUMNS))))
+        timestamps, values = self._views(self._shm.buf, self.length)
+        timestamps[:] = pd.to_datetime(data['timestamp']).to_numpy(dtype='datetime64[ns]').view(np.int64)
+        for i, col in enumerate(OHLCV_COLUMNS):
+            values[i] = data[col].to_numpy(dtype=float)
+
+    @property
+    def descriptor(self):
+        """Descritor serializável enviado aos workers."""
+        return self._shm.name, self.length
+
+    @staticmethod
+    def _views(buffer, length):
+        timestamps = np.ndarray((length,), dtype=np.int64, buffer=buffer)
+        values = np.ndarray((len(OHLCV_COLUMNS), length), dtype=np.float64, buffer=buffer, offset=length * 8)
+        return timestamps, values
+
+    @classmethod
+    def attach(cls, descriptor):
+        """
+        Abre um bloco criado em outro processo.
+
+        Args:
+            descriptor (tuple): Valor de SharedOHLCV.descriptor
+
+        Returns:
+            tuple: (SharedMemory, pandas.DataFrame)
+        """
+        name, length = descriptor
+        shm = shared_memory.SharedMemory(name=name)
+        timestamps, values = cls._views(shm.buf, length)
+        data = pd.DataFrame({col: values[i] for i, col in enumerate(OHLCV_COLUMNS)}, copy=False)
+        data.insert(0, 'timestamp', pd.to_datetime(timestamps))
+        return shm, data
+
+    def close(self):
+        """Libera o bloco de memória compartilhada."""
+        self._shm.close()
+        self._shm.unlink()
+
+
+def grid_search_space(space):
+    """
+    Gera todas as combinações de parâmetros.
+
+    Args:
+        space (dict): Nome do parâmetro -> lista de valores
+
+    Returns:
+        list: Lista de dicionários de parâmetros
+    """
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def _is_valid(params):
+    fast = params.get('fast_period')
+    slow = params.get('slow_period')
+    return fast is None or slow is None or fast < slow
+
+
+def random_search_space(space, samples, seed=None):
+    """
+    Sorteia combinações distintas e válidas de parâmetros.
+
+    Os índices das combinações são sorteados um a um (amostragem por
+    rejeição sobre o produto cartesiano), sem montar a grade inteira; as
+    inválidas (ex: fast_period >= slow_period) são descartadas no sorteio,
+    então o resultado tem samples combinações sempre que houver válidas
+    suficientes. Se o pedido cobrir boa parte da grade, ela é enumerada.
+
+    Args:
+        space (dict): Nome do parâmetro -> lista de valores
+        samples (int): Número de combinações
+        seed (int, optional): Semente para reprodutibilidade
+
+    Returns:
+        list: Lista de dicionários de parâmetros
+    """
+    names = list(space)
+    sizes = [len(space[name]) for name in names]
+    total = 1
+    for size in sizes:
+        total *= size
+
+    rng = random.Random(seed)
+    if samples * 2 >= total:
+        grid = [params for params in grid_search_space(space) if _is_valid(params)]
+        return rng.sample(grid, min(samples, len(grid)))
+
+    combinations, seen = [], set()
+    while len(combinations) < samples and len(seen) < total:
+        index = rng.randrange(total)
+        if index in seen:
+            continue
+        seen.add(index)
+
+        # Índice linear -> uma posição por parâmetro (último parâmetro varia mais rápido)
+        params = {}
+        for name, size in zip(reversed(names), reversed(sizes)):
+            index, position = divmod(index, size)
+            params[name] = space[name][position]
+        params = {name: params[name] for name in names}
+        if _is_valid(params):
+            combinations.append(params)
+    return combinations
+
+
+def search_space(space, samples=None, seed=None):
+    """
+    Combinações válidas avaliadas pelo sweep e pelo walk-forward.
+
+    Args:
+        space (dict): Nome do parâmetro -> lista de valores
+        samples (int, optional): Busca aleatória com esse número de combinações
+        seed (int, optional): Semente da busca aleatória
+
+    Returns:
+        list: Lista de dicionários de parâmetros
+    """
+    if samples:
+        return random_search_space(space, samples, seed)
+    return [params for params in grid_search_space(space) if _is_valid(params)]
+
+
+def apply_parameters(config, params):
+    """
+    Aplica parâmetros do sweep a uma cópia da configuração.
+
+    Parâmetros de RISK_PARAMS são gravados na seção "risk", mesmo que ela
+    ainda não os tenha; os demais vão para a seção "strategy".
+
+    Args:
+        config (dict): Configuração base
+        params (dict): Parâmetros da combinação
+
+    Returns:
+        dict: Nova configuração
+    """
+    config = copy.deepcopy(config)
+    config.setdefault('strategy', {})
+    risk = config.setdefault('risk', {})
+    for name, value in params.items():
+        section = risk if name in RISK_PARAMS else config['strategy']
+        section[name] = value
+    return config
+
+
+def close_worker_state(state):
+    """
+    Fecha os blocos de memória compartilhada abertos por um worker.
+
+    Registrada como finalizador no initializer: roda quando o processo do
+    pool encerra. As views dos blocos são descartadas antes, pois close()
+    falha enquanto houver arrays apontando para o buffer.
+
+    Args:
+        state (dict): Estado do worker (valores SharedMemory são fechados)
+    """
+    blocks = [value for value in state.values() if isinstance(value, shared_memory.SharedMemory)]
+    state.clear()
+    gc.collect()
+    for shm in blocks:
+        shm.close()
+
+
+# Estado de cada processo worker (preenchido pelo initializer)
+_worker_state = {}
+
+
+def _init_worker(descriptor, config, initial_capital):
+    shm, data = SharedOHLCV.attach(descriptor)
+    _worker_state.update(shm=shm, data=data, config=config, initial_capital=initial_capital)
+    util.Finalize(None, close_worker_state, args=(_worker_state,), exitpriority=10)
+
+
+# Contadores do cache de indicadores somados entre os workers do sweep
+CACHE_COUNTERS = ('hits', 'disk_hits', 'misses', 'evictions', 'compute_seconds', 'saved_seconds')
+
+
+def _evaluate(params):
+    config = apply_parameters(_worker_state['config'], params)
+    backtest = Backtest(config)
+    cache = backtest.indicator_cache
+    before = cache.stats() if cache is not None else None
+
+    trades = backtest.apply_strategy(_worker_state['data'], create_strategy(config))
+    metrics = backtest.calculate_metrics(trades, _worker_state['initial_capital'], _worker_state['data'])
+    metrics.pop('equity_curve', None)
+
+    usage = None
+    if cache is not None:
+        after = cache.stats()
+        usage = {name: after[name] - before[name] for name in CACHE_COUNTERS}
+    return {**params, **metrics}, usage
+
+
+def run_sweep(config, data, space, samples=None, workers=None, initial_capital=10000,
+              rank_by='sharpe_ratio', seed=None):
+    """
+    Executa um backtest para cada combinação de parâmetros em paralelo.
+
+    Args:
+        config (dict): Configuração base
+        data (pandas.DataFrame): Dados históricos, carregados uma única vez
+        space (dict): Nome do parâmetro -> lista de valores
+        samples (int, optional): Se definido, faz busca aleatória com esse número de combinações
+        workers (int, optional): Número de processos (padrão: número de CPUs)
+        initial_capital (float): Capital inicial
+        rank_by (str): Métrica usada para ordenar os resultados
+        seed (int, optional): Semente da busca aleatória
+
+    Returns:
+        pandas.DataFrame: Uma linha por combinação, ordenada pela métrica; os
+        contadores do cache de indicadores ficam em attrs['indicator_cache']
+    """
+    combinations = search_space(space, samples, seed)
+    if not combinations:
+        raise ValueError("No valid parameter combinations in sweep space")
+
+    workers = min(workers or os.cpu_count() or 1, len(combinations))
+    chunksize = max(1, len(combinations) // (workers * 4))
+    logger.info(f"Running sweep with {len(combinations)} combinations on {workers} workers")
+
+    shared = SharedOHLCV(data)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shared.descriptor, config, initial_capital)) as pool:
+            evaluations = list(pool.map(_evaluate, combinations, chunksize=chunksize))
+    finally:
+        shared.close()
+
+    results = pd.DataFrame([row for row, _ in evaluations])
+    results = results.sort_values(rank_by, ascending=rank_by in LOWER_IS_BETTER, ignore_index=True)
+
+    usages = [usage for _, usage in evaluations if usage is not None]
+    if usages:
+        results.attrs['indicator_cache'] = {name: sum(usage[name] for usage in usages) for name in CACHE_COUNTERS}
+        logger.info(f"Indicator cache: {results.attrs['indicator_cache']}")
+    return results
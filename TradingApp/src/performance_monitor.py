@@ -1,43 +1,633 @@
 # performance_monitor.py
-import pandas as pd
-import matplotlib.pyplot as plt
 import os
 import json
+import base64
+import logging
+import queue
+import sqlite3
+import threading
+import time
 from datetime import datetime, timedelta
-import numpy as np
+
+# pandas e matplotlib só são importados ao gerar relatórios, para que
+# comandos leves (ex: "status") não paguem o custo dessas importações
+logger = logging.getLogger("TradingBot-Performance")
+
+# Versão do esquema do diário (PRAGMA user_version)
+JOURNAL_SCHEMA_VERSION = 1
+
+JOURNAL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT,
+    type TEXT,
+    symbol TEXT,
+    profit REAL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS summary (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    first_timestamp TEXT,
+    last_timestamp TEXT,
+    first_initial_capital REAL,
+    total_trades INTEGER NOT NULL DEFAULT 0,
+    winning_trades INTEGER NOT NULL DEFAULT 0,
+    losing_trades INTEGER NOT NULL DEFAULT 0,
+    total_profit REAL NOT NULL DEFAULT 0,
+    best_profit REAL,
+    best_symbol TEXT,
+    worst_profit REAL,
+    worst_symbol TEXT
+);
+CREATE TABLE IF NOT EXISTS daily_returns (
+    date TEXT PRIMARY KEY,
+    profit REAL NOT NULL,
+    trades INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS symbol_stats (
+    symbol TEXT PRIMARY KEY,
+    total_trades INTEGER NOT NULL,
+    winning_trades INTEGER NOT NULL,
+    total_profit REAL NOT NULL,
+    best_trade REAL NOT NULL,
+    worst_trade REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_trades_timestamp ON trades (timestamp);
+CREATE INDEX IF NOT EXISTS idx_trades_symbol_timestamp ON trades (symbol, timestamp);
+INSERT OR IGNORE INTO summary (id) VALUES (1);
+"""
+
+def _pyplot():
+    """Importa o pyplot com o backend não interativo Agg (gráficos só são salvos em arquivo)."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+class TradeJournal:
+    """
+    Diário de operações somente-anexação em SQLite (modo WAL).
+
+    Cada operação é uma linha nova, gravada em O(1) sem reescrever o
+    histórico. O modo WAL mantém o arquivo consistente mesmo se o processo
+    cair no meio de uma gravação.
+
+    Na mesma transação de cada gravação são atualizados os agregados
+    (totais, buckets por dia e por símbolo), de modo que resumos e métricas
+    são lidos prontos em vez de recalculados sobre todo o histórico.
+    """
+
+    def __init__(self, path, read_only=False):
+        """
+        Abre (ou cria) o diário
+
+        Args:
+            path: Caminho do arquivo SQLite
+            read_only: Abre um diário existente só para leitura, sem criar o
+                arquivo nem migrar o esquema (ex: comando "status")
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        if read_only:
+            self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] < JOURNAL_SCHEMA_VERSION:
+                self._conn.close()
+                raise sqlite3.DatabaseError(f"Journal {path} uses an older schema; open it for writing to migrate")
+            return
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(JOURNAL_SCHEMA)
+
+        # Diários antigos (sem agregados) são reprocessados uma única vez
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < JOURNAL_SCHEMA_VERSION:
+            self.rebuild_aggregates()
+
+    @staticmethod
+    def _row(record):
+        return (
+            record.get("timestamp"),
+            record.get("type"),
+            record.get("symbol"),
+            record.get("profit"),
+            json.dumps(record)
+        )
+
+    def append(self, record):
+        """
+        Anexa uma operação ao diário
+
+        Args:
+            record: Dicionário com informações da operação
+        """
+        self.append_many([record])
+
+    def append_many(self, records):
+        """
+        Anexa várias operações em uma única transação
+
+        Args:
+            records: Lista de dicionários de operações
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO trades (timestamp, type, symbol, profit, data) VALUES (?, ?, ?, ?, ?)",
+                [self._row(record) for record in records]
+            )
+            for record in records:
+                self._update_aggregates(record)
+
+    def _update_aggregates(self, record):
+        """
+        Atualiza os agregados com uma operação (O(1), dentro da transação)
+        """
+        timestamp = record.get("timestamp")
+        if timestamp:
+            # No SQLite todas as expressões do SET usam os valores antigos da linha
+            self._conn.execute("""
+                UPDATE summary SET
+                    first_initial_capital = CASE WHEN first_timestamp IS NULL OR :ts < first_timestamp
+                                                 THEN :capital ELSE first_initial_capital END,
+                    first_timestamp = CASE WHEN first_timestamp IS NULL OR :ts < first_timestamp
+                                           THEN :ts ELSE first_timestamp END,
+                    last_timestamp = CASE WHEN last_timestamp IS NULL OR :ts > last_timestamp
+                                          THEN :ts ELSE last_timestamp END
+                WHERE id = 1
+            """, {"ts": timestamp, "capital": record.get("initial_capital")})
+
+        if record.get("type") != "sell":
+            return
+
+        profit = record.get("profit", 0) or 0
+        win = 1 if profit > 0 else 0
+        symbol = record.get("symbol", "unknown")
+
+        self._conn.execute("""
+            UPDATE summary SET
+                total_trades = total_trades + 1,
+                winning_trades = winning_trades + :win,
+                losing_trades = losing_trades + 1 - :win,
+                total_profit = total_profit + :profit,
+                best_symbol = CASE WHEN best_profit IS NULL OR :profit > best_profit THEN :symbol ELSE best_symbol END,
+                best_profit = CASE WHEN best_profit IS NULL OR :profit > best_profit THEN :profit ELSE best_profit END,
+                worst_symbol = CASE WHEN worst_profit IS NULL OR :profit < worst_profit THEN :symbol ELSE worst_symbol END,
+                worst_profit = CASE WHEN worst_profit IS NULL OR :profit < worst_profit THEN :profit ELSE worst_profit END
+            WHERE id = 1
+        """, {"win": win, "profit": profit, "symbol": symbol})
+
+        self._conn.execute("""
+            INSERT INTO symbol_stats (symbol, total_trades, winning_trades, total_profit, best_trade, worst_trade)
+            VALUES (:symbol, 1, :win, :profit, :profit, :profit)
+            ON CONFLICT (symbol) DO UPDATE SET
+                total_trades = total_trades + 1,
+                winning_trades = winning_trades + :win,
+                total_profit = total_profit + :profit,
+                best_trade = MAX(best_trade, :profit),
+                worst_trade = MIN(worst_trade, :profit)
+        """, {"win": win, "profit": profit, "symbol": symbol})
+
+        if timestamp:
+            self._conn.execute("""
+                INSERT INTO daily_returns (date, profit, trades) VALUES (?, ?, 1)
+                ON CONFLICT (date) DO UPDATE SET profit = profit + excluded.profit, trades = trades + 1
+            """, (timestamp.split("T")[0], profit))
+
+    def rebuild_aggregates(self):
+        """
+        Recalcula todos os agregados a partir do histórico completo
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM summary")
+            self._conn.execute("DELETE FROM daily_returns")
+            self._conn.execute("DELETE FROM symbol_stats")
+            self._conn.execute("INSERT INTO summary (id) VALUES (1)")
+            for (data,) in self._conn.execute("SELECT data FROM trades ORDER BY id").fetchall():
+                self._update_aggregates(json.loads(data))
+            self._conn.execute(f"PRAGMA user_version = {JOURNAL_SCHEMA_VERSION}")
+
+    def aggregates(self):
+        """
+        Lê os agregados mantidos incrementalmente
+
+        Returns:
+            dict: Métricas de desempenho no formato do performance.json
+        """
+        with self._lock:
+            summary = self._conn.execute("""
+                SELECT first_timestamp, last_timestamp, first_initial_capital, total_trades, winning_trades,
+                       losing_trades, total_profit, best_profit, best_symbol, worst_profit, worst_symbol
+                FROM summary WHERE id = 1
+            """).fetchone()
+            daily = self._conn.execute("SELECT date, profit FROM daily_returns ORDER BY date").fetchall()
+
+        (first_timestamp, last_timestamp, first_capital, total_trades, winning_trades,
+         losing_trades, total_profit, best_profit, best_symbol, worst_profit, worst_symbol) = summary
+
+        # Capital inicial: o da primeira operação registrada, ou 1000 por padrão
+        start_capital = (first_capital if first_capital is not None else 1000) if total_trades else 0
+
+        return {
+            "start_capital": start_capital,
+            "current_capital": start_capital + total_profit,
+            "total_profit": total_profit,
+            "win_rate": winning_trades / total_trades * 100 if total_trades else 0,
+            "total_trades": total_trades,
+            "winning_trades": winning_trades,
+            "losing_trades": losing_trades,
+            "daily_returns": [{"date": date, "return": value} for date, value in daily],
+            "first_timestamp": first_timestamp,
+            "last_timestamp": last_timestamp,
+            "best_trade": {"symbol": best_symbol, "profit": best_profit} if total_trades else None,
+            "worst_trade": {"symbol": worst_symbol, "profit": worst_profit} if total_trades else None
+        }
+
+    def symbol_stats(self):
+        """
+        Lê as estatísticas agregadas por símbolo
+
+        Returns:
+            dict: Símbolo -> estatísticas (mesmo formato de per_crypto no relatório)
+        """
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT symbol, total_trades, winning_trades, total_profit, best_trade, worst_trade
+                FROM symbol_stats ORDER BY symbol
+            """).fetchall()
+
+        return {
+            symbol: {
+                "total_trades": total,
+                "winning_trades": winning,
+                "win_rate": winning / total * 100,
+                "total_profit": profit,
+                "average_profit": profit / total,
+                "best_trade": best,
+                "worst_trade": worst
+            }
+            for symbol, total, winning, profit, best, worst in rows
+        }
+
+    def read_all(self):
+        """
+        Lê todas as operações na ordem de gravação
+
+        Returns:
+            list: Lista de dicionários de operações
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM trades ORDER BY id").fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def read_range(self, start=None, end=None, symbol=None, trade_type=None):
+        """
+        Lê as operações de um intervalo de tempo usando o índice de timestamp
+
+        Apenas as linhas do intervalo são lidas, independentemente do tamanho
+        do histórico.
+
+        Args:
+            start: Timestamp ISO inicial (inclusivo)
+            end: Timestamp ISO final (exclusivo)
+            symbol: Filtra por símbolo (usa o índice symbol + timestamp)
+            trade_type: Filtra pelo tipo da operação (ex: "sell")
+
+        Returns:
+            list: Lista de dicionários de operações em ordem cronológica
+        """
+        clauses, params = [], []
+        for clause, value in (("timestamp >= ?", start), ("timestamp < ?", end),
+                              ("symbol = ?", symbol), ("type = ?", trade_type)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(f"SELECT data FROM trades {where} ORDER BY timestamp, id", params).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def profit_series(self, trade_type="sell"):
+        """
+        Timestamps e lucros das operações em ordem cronológica, para a curva de capital
+
+        Lê só as colunas indexadas, sem decodificar o JSON de cada operação.
+
+        Args:
+            trade_type: Tipo das operações (ex: "sell")
+
+        Returns:
+            tuple: (lista de timestamps, lista de lucros)
+        """
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT timestamp, COALESCE(profit, 0) FROM trades
+                WHERE type = ? AND timestamp IS NOT NULL AND timestamp != ''
+                ORDER BY timestamp, id
+            """, (trade_type,)).fetchall()
+        return [timestamp for timestamp, _ in rows], [profit for _, profit in rows]
+
+    def profit_before(self, date):
+        """
+        Lucro acumulado de todos os dias anteriores a uma data (pelos buckets diários)
+
+        Args:
+            date: Data ISO (YYYY-MM-DD)
+
+        Returns:
+            float: Soma dos lucros antes da data
+        """
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(profit), 0) FROM daily_returns WHERE date < ?",
+                                      (date,)).fetchone()[0]
+
+    def count(self):
+        """Número de operações gravadas"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM trades").fetchone()[0]
+
+    def migrate_json(self, json_path):
+        """
+        Importa uma única vez o histórico do antigo trades.json
+
+        O arquivo é renomeado para trades.json.migrated após a importação.
+        Se o diário já tiver operações, nada é importado e o arquivo é
+        mantido, com um aviso no log, para não misturar os dois históricos.
+
+        Args:
+            json_path: Caminho do trades.json
+
+        Returns:
+            int: Número de operações importadas
+        """
+        if not os.path.exists(json_path):
+            return 0
+
+        with open(json_path, "r") as f:
+            trades = json.load(f)
+
+        if trades and self.count() > 0:
+            logger.warning(f"Journal {self.path} already has trades; {len(trades)} trades in {json_path} "
+                           f"were not imported and the file was left in place")
+            return 0
+
+        if trades:
+            self.append_many(trades)
+        os.replace(json_path, json_path + ".migrated")
+        return len(trades)
+
+    def close(self):
+        """Fecha a conexão com o diário"""
+        with self._lock:
+            self._conn.close()
+
+
+class AsyncTradeWriter:
+    """
+    Grava operações no diário a partir de uma thread dedicada.
+
+    record() apenas coloca a operação numa fila limitada; a thread de escrita
+    drena a fila e grava em lotes, a cada flush_interval segundos ou quando o
+    lote atinge batch_size operações. Assim o loop de trading nunca espera
+    por I/O de disco nem pelo recálculo de métricas.
+
+    Um lote que falha na gravação continua pendente e é regravado a cada
+    flush_interval; as operações só contam como concluídas (para flush())
+    depois de gravadas. Uma falha de on_flush não afeta o lote já gravado.
+    """
+
+    # Marcadores de controle: encerram a coleta do lote atual imediatamente
+    _STOP = object()
+    _FLUSH = object()
+
+    def __init__(self, journal, on_flush=None, queue_size=10000, flush_interval=1.0, batch_size=500):
+        """
+        Inicia a thread de escrita
+
+        Args:
+            journal: TradeJournal de destino
+            on_flush: Função chamada após cada lote gravado
+            queue_size: Tamanho máximo da fila
+            flush_interval: Tempo máximo (s) que uma operação espera na fila
+            batch_size: Número máximo de operações por lote
+        """
+        self.journal = journal
+        self.on_flush = on_flush
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "max_queue_depth": 0,
+            "queue_full_waits": 0,
+            "flushes": 0,
+            "records_written": 0,
+            "flush_errors": 0,
+            "metrics_errors": 0,
+            "records_lost": 0,
+            "last_flush_latency_ms": 0.0,
+            "max_flush_latency_ms": 0.0,
+            "total_flush_latency_ms": 0.0
+        }
+        # Depois de close() não há quem consuma a fila: record() grava direto no diário
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="trade-writer", daemon=True)
+        self._thread.start()
+
+    def record(self, trade_data):
+        """
+        Enfileira uma operação (bloqueia apenas se a fila estiver cheia)
+
+        Após close() a operação é gravada de forma síncrona no diário.
+
+        Args:
+            trade_data: Dicionário com informações da operação
+        """
+        with self._close_lock:
+            if not self._closed:
+                try:
+                    self._queue.put_nowait(trade_data)
+                except queue.Full:
+                    with self._stats_lock:
+                        self._stats["queue_full_waits"] += 1
+                    self._queue.put(trade_data)
+                closed = False
+            else:
+                closed = True
+
+        if closed:
+            if not self._write([trade_data]):
+                with self._stats_lock:
+                    self._stats["records_lost"] += 1
+            return
+
+        depth = self._queue.qsize()
+        with self._stats_lock:
+            if depth > self._stats["max_queue_depth"]:
+                self._stats["max_queue_depth"] = depth
+
+    def _next_batch(self, retry=False):
+        """
+        Espera a primeira operação e junta as seguintes até o limite do lote
+
+        Com retry (há um lote pendente), espera no máximo flush_interval e
+        devolve uma lista vazia se nada chegar, para regravar o pendente.
+        """
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval) if retry else self._queue.get()]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+
+        while len(batch) < self.batch_size and batch[-1] not in (self._STOP, self._FLUSH):
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, pending):
+        """
+        Grava um lote no diário e atualiza as métricas
+
+        Returns:
+            bool: True se o lote foi gravado (mesmo que on_flush falhe)
+        """
+        start = time.perf_counter()
+        try:
+            self.journal.append_many(pending)
+        except Exception as e:
+            logger.error(f"Failed to write {len(pending)} trades to journal, will retry: {str(e)}")
+            with self._stats_lock:
+                self._stats["flush_errors"] += 1
+            return False
+
+        # O lote já está no diário: uma falha aqui não pode fazê-lo ser gravado de novo
+        if self.on_flush:
+            try:
+                self.on_flush()
+            except Exception as e:
+                logger.error(f"Failed to update performance metrics: {str(e)}")
+                with self._stats_lock:
+                    self._stats["metrics_errors"] += 1
+
+        latency = (time.perf_counter() - start) * 1000
+        with self._stats_lock:
+            self._stats["flushes"] += 1
+            self._stats["records_written"] += len(pending)
+            self._stats["last_flush_latency_ms"] = latency
+            self._stats["max_flush_latency_ms"] = max(self._stats["max_flush_latency_ms"], latency)
+            self._stats["total_flush_latency_ms"] += latency
+        return True
+
+    def _run(self):
+        pending = []
+        # Itens retirados da fila que só são concluídos depois de gravados
+        unfinished = 0
+        while True:
+            batch = self._next_batch(retry=bool(pending))
+            unfinished += len(batch)
+            stop = bool(batch) and batch[-1] is self._STOP
+            pending.extend(item for item in batch if item not in (self._STOP, self._FLUSH))
+
+            if pending and self._write(pending):
+                pending = []
+
+            if stop and pending:
+                logger.error(f"Discarding {len(pending)} trades that could not be written to the journal")
+                with self._stats_lock:
+                    self._stats["records_lost"] += len(pending)
+                pending = []
+
+            if not pending:
+                for _ in range(unfinished):
+                    self._queue.task_done()
+                unfinished = 0
+            if stop:
+                return
+
+    def flush(self):
+        """
+        Grava imediatamente o que estiver na fila e espera a conclusão
+
+        Se o diário falhar, continua esperando enquanto a thread regrava o lote.
+        Depois de close() não há nada na fila e retorna imediatamente.
+        """
+        if self._closed or not self._thread.is_alive():
+            return
+        self._queue.put(self._FLUSH)
+        self._queue.join()
+
+    def close(self):
+        """
+        Grava o que estiver na fila e encerra a thread de escrita
+
+        Operações que ainda não puderam ser gravadas são descartadas, com
+        erro no log e contagem em records_lost.
+        """
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._thread.is_alive():
+                self._queue.put(self._STOP)
+        self._thread.join()
+
+    def stats(self):
+        """
+        Contadores da fila e da escrita
+
+        Returns:
+            dict: Profundidade da fila, lotes gravados e latências de flush (ms)
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["avg_flush_latency_ms"] = stats.pop("total_flush_latency_ms") / stats["flushes"] if stats["flushes"] else 0.0
+        return stats
+
 
 class PerformanceMonitor:
-    def __init__(self, results_dir="./results"):
+    def __init__(self, results_dir="./results", async_writes=False, queue_size=10000,
+                 flush_interval=1.0, batch_size=500, export_interval=5.0):
         """
         Inicializa o monitor de desempenho
         
         Args:
             results_dir: Diretório para salvar os resultados
+            async_writes: Grava as operações em uma thread separada (ver AsyncTradeWriter)
+            queue_size: Tamanho máximo da fila de escrita
+            flush_interval: Intervalo máximo (s) entre gravações no modo assíncrono
+            batch_size: Número máximo de operações por gravação no modo assíncrono
+            export_interval: Intervalo mínimo (s) entre exportações do performance.json
+                durante a gravação de operações; flush() e close() sempre exportam
         """
         self.results_dir = results_dir
         if not os.path.exists(results_dir):
             os.makedirs(results_dir)
         
-        self.trades_file = os.path.join(results_dir, "trades.json")
+        self.trades_file = os.path.join(results_dir, "trades.db")
         self.performance_file = os.path.join(results_dir, "performance.json")
+        self.export_interval = export_interval
+        self._export_lock = threading.Lock()
+        self._export_pending = False
+        self._last_export = float("-inf")
         
-        # Inicializar arquivos se não existirem
-        if not os.path.exists(self.trades_file):
-            with open(self.trades_file, "w") as f:
-                json.dump([], f)
+        # Diário de operações (migra o trades.json antigo na primeira execução)
+        self.journal = TradeJournal(self.trades_file)
+        self.journal.migrate_json(os.path.join(results_dir, "trades.json"))
         
         if not os.path.exists(self.performance_file):
-            with open(self.performance_file, "w") as f:
-                json.dump({
-                    "start_capital": 0,
-                    "current_capital": 0,
-                    "total_profit": 0,
-                    "win_rate": 0,
-                    "total_trades": 0,
-                    "winning_trades": 0,
-                    "losing_trades": 0,
-                    "daily_returns": []
-                }, f)
+            self.update_performance_metrics()
+        
+        self.writer = None
+        if async_writes:
+            self.writer = AsyncTradeWriter(self.journal, on_flush=self._export_if_due,
+                                           queue_size=queue_size, flush_interval=flush_interval,
+                                           batch_size=batch_size)
     
     def record_trade(self, trade_data):
         """
@@ -46,109 +636,134 @@ class PerformanceMonitor:
         Args:
             trade_data: Dicionário com informações da operação
         """
-        # Carregar operações existentes
-        with open(self.trades_file, "r") as f:
-            trades = json.load(f)
-        
         # Adicionar timestamp
         if "timestamp" not in trade_data:
             trade_data["timestamp"] = datetime.now().isoformat()
         
-        # Adicionar nova operação
-        trades.append(trade_data)
+        # No modo assíncrono a gravação e as métricas ficam com a thread de escrita
+        if self.writer:
+            self.writer.record(dict(trade_data))
+            return
         
-        # Salvar operações
-        with open(self.trades_file, "w") as f:
-            json.dump(trades, f, indent=2)
+        # Anexar ao diário sem reescrever o histórico
+        self.journal.append(trade_data)
         
-        # Atualizar métricas de desempenho
-        self.update_performance_metrics()
+        # Exportar métricas de desempenho (no máximo a cada export_interval)
+        self._export_if_due()
     
-    def update_performance_metrics(self):
+    def _export_if_due(self):
         """
-        Atualiza as métricas de desempenho com base nas operações registradas
+        Exporta o performance.json se export_interval já passou desde a última exportação
+        
+        O arquivo inclui todo o histórico de retornos diários; exportá-lo a
+        cada operação custaria O(dias) por operação. Entre exportações ele
+        fica marcado como pendente e é gravado no próximo flush() ou close().
         """
-        # Carregar operações
-        with open(self.trades_file, "r") as f:
-            trades = json.load(f)
+        if time.monotonic() - self._last_export >= self.export_interval:
+            self.update_performance_metrics()
+        else:
+            self._export_pending = True
+    
+    def flush(self):
+        """
+        Garante que todas as operações enfileiradas foram gravadas e exportadas
+        """
+        if self.writer:
+            self.writer.flush()
+        if self._export_pending:
+            self.update_performance_metrics()
+    
+    def close(self):
+        """
+        Grava as operações pendentes, encerra a thread de escrita e exporta as métricas
+        """
+        if self.writer:
+            self.writer.close()
+            logger.info(f"Trade writer stats: {self.writer.stats()}")
+        if self._export_pending:
+            self.update_performance_metrics()
+    
+    def get_writer_stats(self):
+        """
+        Contadores do modo assíncrono (profundidade da fila e latência de flush)
         
-        # Carregar métricas atuais
-        with open(self.performance_file, "r") as f:
-            performance = json.load(f)
+        Returns:
+            dict or None: Estatísticas, ou None no modo síncrono
+        """
+        return self.writer.stats() if self.writer else None
+    
+    def get_performance(self):
+        """
+        Retorna as métricas de desempenho mantidas incrementalmente no diário
         
-        # Calcular métricas
-        completed_trades = [t for t in trades if t.get("type") == "sell"]
+        Returns:
+            dict: Métricas de desempenho
+        """
+        self.flush()
+        return self.journal.aggregates()
+    
+    def update_performance_metrics(self):
+        """
+        Exporta as métricas de desempenho para o performance.json
         
-        if completed_trades:
-            winning_trades = [t for t in completed_trades if t.get("profit", 0) > 0]
-            losing_trades = [t for t in completed_trades if t.get("profit", 0) <= 0]
-            
-            performance["total_trades"] = len(completed_trades)
-            performance["winning_trades"] = len(winning_trades)
-            performance["losing_trades"] = len(losing_trades)
-            performance["win_rate"] = len(winning_trades) / len(completed_trades) * 100 if completed_trades else 0
-            
-            # Calcular capital atual e lucro total
-            if "start_capital" not in performance or performance["start_capital"] == 0:
-                # Inferir capital inicial da primeira operação
-                first_trade = min(trades, key=lambda x: x.get("timestamp", ""))
-                if "initial_capital" in first_trade:
-                    performance["start_capital"] = first_trade["initial_capital"]
-                else:
-                    performance["start_capital"] = 1000  # Valor padrão
-            
-            total_profit = sum([t.get("profit", 0) for t in completed_trades])
-            performance["total_profit"] = total_profit
-            performance["current_capital"] = performance["start_capital"] + total_profit
-            
-            # Calcular retornos diários
-            daily_returns = {}
-            for trade in completed_trades:
-                if "timestamp" in trade:
-                    date = trade["timestamp"].split("T")[0]
-                    if date not in daily_returns:
-                        daily_returns[date] = 0
-                    daily_returns[date] += trade.get("profit", 0)
+        As métricas já são atualizadas a cada operação gravada; aqui apenas
+        os agregados prontos são lidos, sem percorrer o histórico. Durante a
+        gravação de operações é chamada no máximo a cada export_interval
+        (ver _export_if_due), pela thread de escrita no modo assíncrono.
+        """
+        with self._export_lock:
+            self._export_pending = False
+            performance = self.journal.aggregates()
             
-            performance["daily_returns"] = [{"date": date, "return": value} for date, value in daily_returns.items()]
-        
-        # Salvar métricas atualizadas
-        with open(self.performance_file, "w") as f:
-            json.dump(performance, f, indent=2)
+            # Salvar métricas atualizadas
+            with open(self.performance_file, "w") as f:
+                json.dump(performance, f, indent=2)
+            self._last_export = time.monotonic()
     
-    def generate_performance_report(self):
+    def generate_performance_report(self, from_date=None, to_date=None):
         """
         Gera um relatório de desempenho e gráficos
         
+        Com um intervalo de datas, apenas as operações do intervalo são lidas
+        (pelo índice de timestamp) e o resumo, as estatísticas por
+        criptomoeda e os gráficos refletem só esse período.
+        
+        Args:
+            from_date: Data inicial (inclusiva), ou None para o início do histórico
+            to_date: Data final (inclusiva, dia inteiro), ou None para o fim do histórico
+        
         Returns:
             dict: Relatório de desempenho
         """
         # Carregar métricas
-        with open(self.performance_file, "r") as f:
-            performance = json.load(f)
+        performance = self.get_performance()
         
-        # Carregar operações
-        with open(self.trades_file, "r") as f:
-            trades = json.load(f)
-        
-        completed_trades = [t for t in trades if t.get("type") == "sell"]
+        if from_date is None and to_date is None:
+            # Histórico completo: estatísticas por símbolo já mantidas no diário,
+            # e só as colunas timestamp/lucro para a curva de capital
+            per_crypto = self.journal.symbol_stats()
+            timestamps, profits = self.journal.profit_series(trade_type="sell")
+        else:
+            start = from_date.strftime("%Y-%m-%d") if from_date else None
+            end = (to_date + timedelta(days=1)).strftime("%Y-%m-%d") if to_date else None
+            completed_trades = self.journal.read_range(start, end, trade_type="sell")
+            
+            # Uma única passagem produz os totais, as estatísticas por símbolo e a série do gráfico
+            totals, per_crypto, (timestamps, profits) = self._aggregate_trades(completed_trades)
+            performance = self._get_range_performance(totals, performance, start)
         
-        # Criar DataFrame para análise
-        if completed_trades:
-            df_trades = pd.DataFrame(completed_trades)
-            if "timestamp" in df_trades.columns:
-                df_trades["timestamp"] = pd.to_datetime(df_trades["timestamp"])
-                df_trades.sort_values("timestamp", inplace=True)
+        if timestamps:
+            import pandas as pd
             
-            # Adicionar capital acumulado
-            if "profit" in df_trades.columns:
-                df_trades["cumulative_profit"] = df_trades["profit"].cumsum()
-                df_trades["cumulative_capital"] = performance["start_capital"] + df_trades["cumulative_profit"]
+            # Curva de capital acumulado (operações já vêm em ordem cronológica)
+            df_trades = pd.DataFrame({"timestamp": pd.to_datetime(timestamps), "profit": profits})
+            df_trades["cumulative_profit"] = df_trades["profit"].cumsum()
+            df_trades["cumulative_capital"] = performance["start_capital"] + df_trades["cumulative_profit"]
             
             # Gerar gráficos
             self._generate_equity_curve(df_trades, performance)
             self._generate_win_loss_chart(performance)
-            self._generate_crypto_performance(df_trades)
+            self._generate_crypto_performance(per_crypto)
         
         # Preparar relatório
         report = {
@@ -161,10 +776,10 @@ class PerformanceMonitor:
                 "total_trades": performance["total_trades"]
             },
             "trading_period": {
-                "start_date": min([t.get("timestamp", "") for t in trades]).split("T")[0] if trades else "N/A",
-                "end_date": max([t.get("timestamp", "") for t in trades]).split("T")[0] if trades else "N/A"
+                "start_date": performance["first_timestamp"].split("T")[0] if performance["first_timestamp"] else "N/A",
+                "end_date": performance["last_timestamp"].split("T")[0] if performance["last_timestamp"] else "N/A"
             },
-            "per_crypto": self._get_per_crypto_stats(completed_trades)
+            "per_crypto": per_crypto
         }
         
         # Salvar relatório
@@ -173,32 +788,149 @@ class PerformanceMonitor:
         
         return report
     
-    def _get_per_crypto_stats(self, completed_trades):
+    def _get_range_performance(self, totals, performance, start):
+        """
+        Monta o resumo de desempenho de um intervalo de datas
+        
+        O capital inicial do período é o capital inicial da conta mais o
+        lucro dos dias anteriores ao período (lido dos buckets diários).
+        """
+        start_capital = performance["start_capital"]
+        if start and start_capital:
+            start_capital += self.journal.profit_before(start)
+        
+        return {
+            "start_capital": start_capital,
+            "current_capital": start_capital + totals["total_profit"],
+            **totals
+        }
+    
+    def generate_report(self, from_date=None, to_date=None):
+        """
+        Gera o relatório de desempenho de um período em HTML
+        
+        Args:
+            from_date: Data inicial (inclusiva)
+            to_date: Data final (inclusiva)
+        
+        Returns:
+            str: Documento HTML com resumo, estatísticas por criptomoeda e gráficos
         """
-        Calcula estatísticas por criptomoeda
+        report = self.generate_performance_report(from_date, to_date)
+        summary = report["summary"]
+        period = report["trading_period"]
+        
+        rows = "".join(
+            f"<tr><td>{symbol}</td><td>{stats['total_trades']}</td><td>{stats['win_rate']:.2f}%</td>"
+            f"<td>{stats['total_profit']:.2f}</td><td>{stats['average_profit']:.2f}</td>"
+            f"<td>{stats['best_trade']:.2f}</td><td>{stats['worst_trade']:.2f}</td></tr>"
+            for symbol, stats in sorted(report["per_crypto"].items())
+        )
+        
+        # Gráficos embutidos para o HTML não depender dos arquivos em results/
+        charts = ""
+        if summary["total_trades"]:
+            for name in ("equity_curve.png", "win_loss_chart.png", "crypto_performance.png"):
+                path = os.path.join(self.results_dir, name)
+                if os.path.exists(path):
+                    with open(path, "rb") as f:
+                        encoded = base64.b64encode(f.read()).decode("ascii")
+                    charts += f'<img src="data:image/png;base64,{encoded}" alt="{name}">\n'
+        
+        return f"""<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Relatório de Desempenho</title></head>
+<body>
+<h1>Relatório de Desempenho</h1>
+<p>Período: {period['start_date']} a {period['end_date']}</p>
+<table>
+<tr><th>Capital inicial</th><td>{summary['start_capital']:.2f} USDT</td></tr>
+<tr><th>Capital final</th><td>{summary['current_capital']:.2f} USDT</td></tr>
+<tr><th>Lucro total</th><td>{summary['total_profit']:.2f} USDT ({summary['total_profit_percentage']:.2f}%)</td></tr>
+<tr><th>Taxa de acerto</th><td>{summary['win_rate']:.2f}%</td></tr>
+<tr><th>Total de operações</th><td>{summary['total_trades']}</td></tr>
+</table>
+<h2>Desempenho por Criptomoeda</h2>
+<table>
+<tr><th>Símbolo</th><th>Operações</th><th>Taxa de acerto</th><th>Lucro total</th><th>Lucro médio</th><th>Melhor</th><th>Pior</th></tr>
+{rows}
+</table>
+{charts}</body>
+</html>
+"""
+    
+    def _aggregate_trades(self, completed_trades):
         """
-        stats = {}
+        Calcula estatísticas globais e por criptomoeda em uma única passagem
         
-        for crypto in set([t.get("symbol", "unknown") for t in completed_trades]):
-            crypto_trades = [t for t in completed_trades if t.get("symbol") == crypto]
-            winning = [t for t in crypto_trades if t.get("profit", 0) > 0]
+        Args:
+            completed_trades: Operações concluídas em ordem cronológica
+        
+        Returns:
+            tuple: (totais, estatísticas por símbolo, (timestamps, lucros) da curva de capital)
+        """
+        # Acumuladores por símbolo: [operações, vencedoras, lucro total, melhor, pior]
+        buckets = {}
+        timestamps = []
+        profits = []
+        total_profit = 0
+        winning_trades = 0
+        
+        for trade in completed_trades:
+            # Mesma normalização dos agregados do diário: lucro ausente ou nulo conta como 0
+            profit = trade.get("profit") or 0
+            win = profit > 0
+            total_profit += profit
+            winning_trades += win
             
-            stats[crypto] = {
-                "total_trades": len(crypto_trades),
-                "winning_trades": len(winning),
-                "win_rate": len(winning) / len(crypto_trades) * 100 if crypto_trades else 0,
-                "total_profit": sum([t.get("profit", 0) for t in crypto_trades]),
-                "average_profit": sum([t.get("profit", 0) for t in crypto_trades]) / len(crypto_trades) if crypto_trades else 0,
-                "best_trade": max([t.get("profit", 0) for t in crypto_trades]) if crypto_trades else 0,
-                "worst_trade": min([t.get("profit", 0) for t in crypto_trades]) if crypto_trades else 0
+            bucket = buckets.get(trade.get("symbol", "unknown"))
+            if bucket is None:
+                buckets[trade.get("symbol", "unknown")] = [1, int(win), profit, profit, profit]
+            else:
+                bucket[0] += 1
+                bucket[1] += win
+                bucket[2] += profit
+                if profit > bucket[3]:
+                    bucket[3] = profit
+                if profit < bucket[4]:
+                    bucket[4] = profit
+            
+            timestamp = trade.get("timestamp")
+            if timestamp:
+                timestamps.append(timestamp)
+                profits.append(profit)
+        
+        total_trades = len(completed_trades)
+        totals = {
+            "total_profit": total_profit,
+            "win_rate": winning_trades / total_trades * 100 if total_trades else 0,
+            "total_trades": total_trades,
+            "winning_trades": winning_trades,
+            "losing_trades": total_trades - winning_trades,
+            "first_timestamp": timestamps[0] if timestamps else None,
+            "last_timestamp": timestamps[-1] if timestamps else None
+        }
+        
+        per_crypto = {
+            crypto: {
+                "total_trades": count,
+                "winning_trades": wins,
+                "win_rate": wins / count * 100,
+                "total_profit": profit,
+                "average_profit": profit / count,
+                "best_trade": best,
+                "worst_trade": worst
             }
+            for crypto, (count, wins, profit, best, worst) in buckets.items()
+        }
         
-        return stats
+        return totals, per_crypto, (timestamps, profits)
     
     def _generate_equity_curve(self, df_trades, performance):
         """
         Gera gráfico de curva de capital
         """
+        plt = _pyplot()
         if "cumulative_capital" in df_trades.columns and "timestamp" in df_trades.columns:
             plt.figure(figsize=(12, 6))
             plt.plot(df_trades["timestamp"], df_trades["cumulative_capital"])
@@ -215,6 +947,7 @@ class PerformanceMonitor:
         """
         Gera gráfico de vitórias e derrotas
         """
+        plt = _pyplot()
         labels = ['Vitórias', 'Derrotas']
         sizes = [performance["winning_trades"], performance["losing_trades"]]
         colors = ['#4CAF50', '#F44336']
@@ -226,19 +959,21 @@ class PerformanceMonitor:
         plt.savefig(os.path.join(self.results_dir, "win_loss_chart.png"))
         plt.close()
     
-    def _generate_crypto_performance(self, df_trades):
+    def _generate_crypto_performance(self, per_crypto):
         """
         Gera gráfico de desempenho por criptomoeda
         """
-        if "symbol" in df_trades.columns and "profit" in df_trades.columns:
-            crypto_profit = df_trades.groupby("symbol")["profit"].sum()
+        plt = _pyplot()
+        if per_crypto:
+            symbols = sorted(per_crypto)
+            crypto_profit = [per_crypto[symbol]["total_profit"] for symbol in symbols]
             
             plt.figure(figsize=(10, 6))
-            bars = plt.bar(crypto_profit.index, crypto_profit.values)
+            bars = plt.bar(symbols, crypto_profit)
             
             # Colorir barras (verde para lucro, vermelho para prejuízo)
             for i, bar in enumerate(bars):
-                bar.set_color('#4CAF50' if crypto_profit.values[i] > 0 else '#F44336')
+                bar.set_color('#4CAF50' if crypto_profit[i] > 0 else '#F44336')
             
             plt.title("Lucro/Prejuízo por Criptomoeda")
             plt.xlabel("Criptomoeda")
@@ -252,8 +987,7 @@ class PerformanceMonitor:
         Imprime um resumo do desempenho no console
         """
         # Carregar métricas
-        with open(self.performance_file, "r") as f:
-            performance = json.load(f)
+        performance = self.get_performance()
         
         print("\n" + "="*50)
         print("RESUMO DE DESEMPENHO DO BOT DE TRADING")
@@ -266,18 +1000,12 @@ class PerformanceMonitor:
         print(f"Operações vencedoras: {performance['winning_trades']} ({performance['win_rate']:.2f}%)")
         print(f"Operações perdedoras: {performance['losing_trades']} ({(100-performance['win_rate']):.2f}%)")
         
-        # Carregar operações
-        with open(self.trades_file, "r") as f:
-            trades = json.load(f)
-        
-        if trades:
-            completed_trades = [t for t in trades if t.get("type") == "sell"]
-            if completed_trades:
-                best_trade = max(completed_trades, key=lambda x: x.get("profit", 0))
-                worst_trade = min(completed_trades, key=lambda x: x.get("profit", 0))
-                
-                print(f"\nMelhor operação: {best_trade.get('symbol', 'N/A')} - Lucro: {best_trade.get('profit', 0):.2f} USDT")
-                print(f"Pior operação: {worst_trade.get('symbol', 'N/A')} - Lucro: {worst_trade.get('profit', 0):.2f} USDT")
+        if performance["best_trade"]:
+            best_trade = performance["best_trade"]
+            worst_trade = performance["worst_trade"]
+            
+            print(f"\nMelhor operação: {best_trade['symbol']} - Lucro: {best_trade['profit']:.2f} USDT")
+            print(f"Pior operação: {worst_trade['symbol']} - Lucro: {worst_trade['profit']:.2f} USDT")
         
         print("\nRelatório completo salvo em:", os.path.join(self.results_dir, "report.json"))
         print("="*50)
@@ -285,6 +1013,8 @@ class PerformanceMonitor:
 
 # Exemplo de uso
 if __name__ == "__main__":
+    import numpy as np
+    
     # Criar monitor de desempenho
     monitor = PerformanceMonitor()
     
@@ -0,0 +1,292 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import heapq
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .backtesting import Backtest
+from .metrics import compute_metrics
+from .timeframes import infer_periods_per_year
+
+logger = logging.getLogger("TradingBot-Portfolio")
+
+# Regras de alocação de cada nova posição:
+#   per_symbol        - capital inicial / número de símbolos (como o bot ao vivo)
+#   equal_slots       - caixa livre dividido pelas vagas restantes
+#   max_position_size - fração risk.max_position_size do patrimônio atual
+ALLOCATION_RULES = ('per_symbol', 'equal_slots', 'max_position_size')
+
+
+def align_symbols(data_by_symbol):
+    """
+    Alinha os dados de vários símbolos em uma grade única de timestamps.
+
+    Args:
+        data_by_symbol (dict): Símbolo -> DataFrame OHLCV
+
+    Returns:
+        tuple: (timestamps datetime64[ns] da grade, matriz de fechamentos
+        (barras × símbolos) propagados para frente e 0 antes da primeira
+        barra do símbolo, lista com o índice de cada barra do símbolo na grade)
+    """
+    stamps = [data['timestamp'].to_numpy(dtype='datetime64[ns]') for data in data_by_symbol.values()]
+    if all(len(stamp) == len(stamps[0]) and np.array_equal(stamp, stamps[0]) for stamp in stamps[1:]):
+        # Caso comum: todos os símbolos com as mesmas barras
+        grid = stamps[0] if stamps else np.array([], dtype='datetime64[ns]')
+    else:
+        grid = np.sort(np.concatenate(stamps))
+        grid = grid[np.concatenate(([True], grid[1:] != grid[:-1]))]
+
+    close = np.zeros((len(grid), len(stamps)))
+    rows = []
+    for j, (data, stamp) in enumerate(zip(data_by_symbol.values(), stamps)):
+        row = np.searchsorted(grid, stamp)
+        rows.append(row)
+
+        # Preenche as barras sem negociação com o último fechamento
+        filler = np.full(len(grid), -1, dtype=np.intp)
+        filler[row] = np.arange(len(row))
+        np.maximum.accumulate(filler, out=filler)
+        listed = filler >= 0
+        close[listed, j] = data['close'].to_numpy(dtype=float)[filler[listed]]
+
+    return grid, close, rows
+
+
+class PortfolioBacktest:
+    """
+    Backtest de carteira com caixa compartilhado e limite de posições abertas.
+
+    Os sinais e as saídas (inclusive stops intrabar) de cada símbolo são
+    calculados de forma vetorizada pelo Backtest. Depois, um único passe
+    percorre apenas os eventos de entrada em ordem cronológica, liberando o
+    caixa das saídas anteriores e aplicando o limite de posições e a regra de
+    alocação. Por fim, posições, caixa e patrimônio por barra são montados
+    de uma vez sobre a matriz alinhada (barras × símbolos).
+    """
+
+    def __init__(self, config, max_positions=None, allocation=None):
+        """
+        Inicializa o backtest de carteira.
+
+        Args:
+            config (dict): Configuração (seções risk e portfolio)
+            max_positions (int, optional): Máximo de posições simultâneas
+                (padrão: portfolio.max_open_positions ou MAX_OPERACOES_SIMULTANEAS)
+            allocation (str, optional): Uma de ALLOCATION_RULES
+                (padrão: portfolio.allocation ou 'per_symbol')
+        """
+        from .config import MAX_OPERACOES_SIMULTANEAS
+
+        portfolio = config.get('portfolio', {})
+        self.backtest = Backtest(config)
+        self.max_positions = max_positions or portfolio.get('max_open_positions', MAX_OPERACOES_SIMULTANEAS)
+        self.allocation = allocation or portfolio.get('allocation', 'per_symbol')
+        self.max_position_size = config.get('risk', {}).get('max_position_size', 0.1)
+
+        if self.allocation not in ALLOCATION_RULES:
+            raise ValueError(f"allocation must be one of {ALLOCATION_RULES}, got {self.allocation!r}")
+        if self.max_positions <= 0:
+            raise ValueError("max_positions must be positive")
+
+    def candidate_trades(self, data_by_symbol, strategy, rows):
+        """
+        Trades que cada símbolo faria sozinho, em índices da grade alinhada.
+
+        Returns:
+            dict: Arrays symbol, entry_bar, exit_bar, entry_price, exit_price e
+            lista reason, ordenados por barra de entrada e símbolo
+        """
+        columns = {'symbol': [], 'entry_bar': [], 'exit_bar': [], 'entry_price': [], 'exit_price': [], 'reason': []}
+        for j, data in enumerate(data_by_symbol.values()):
+            signals = self.backtest.compute_signals(data, strategy)
+            entries, exits, exit_prices, reasons = self.backtest.trade_indices(data, signals)
+            columns['symbol'].append(np.full(len(entries), j, dtype=np.intp))
+            columns['entry_bar'].append(rows[j][entries])
+            columns['exit_bar'].append(rows[j][exits])
+            columns['entry_price'].append(data['close'].to_numpy(dtype=float)[entries])
+            columns['exit_price'].append(np.asarray(exit_prices, dtype=float))
+            columns['reason'].append(np.asarray(reasons, dtype=object))
+
+        candidates = {name: np.concatenate(values) if values else np.array([]) for name, values in columns.items()}
+        order = np.lexsort((candidates['symbol'], candidates['entry_bar']))
+        return {name: values[order] for name, values in candidates.items()}
+
+    def _allocate(self, cash, free_slots, equity, initial_capital, symbols):
+        if self.allocation == 'per_symbol':
+            return initial_capital / symbols
+        if self.allocation == 'equal_slots':
+            return cash / free_slots
+        return equity * self.max_position_size
+
+    def select_trades(self, candidates, close, initial_capital):
+        """
+        Aplica caixa compartilhado, limite de posições e alocação.
+
+        Percorre os candidatos por barra de entrada; saídas na mesma barra
+        liberam caixa e vagas antes das entradas. Quando faltam vagas, os
+        símbolos são atendidos na ordem em que foram informados.
+
+        Args:
+            candidates (dict): Retorno de candidate_trades
+            close (numpy.ndarray): Matriz de fechamentos alinhada
+            initial_capital (float): Capital inicial
+
+        Returns:
+            tuple: (índices dos candidatos aceitos, quantidades, número de
+            entradas recusadas por falta de vaga ou de caixa)
+        """
+        symbol = candidates['symbol'].tolist()
+        entry_bar = candidates['entry_bar'].tolist()
+        exit_bar = candidates['exit_bar'].tolist()
+        entry_price = candidates['entry_price'].tolist()
+        exit_price = candidates['exit_price'].tolist()
+        symbols = close.shape[1]
+
+        cash = float(initial_capital)
+        open_positions = []  # heap de (barra de saída, candidato, quantidade)
+        accepted, quantities = [], []
+        skipped = 0
+
+        for i, bar in enumerate(entry_bar):
+            while open_positions and open_positions[0][0] <= bar:
+                _, k, qty = heapq.heappop(open_positions)
+                cash += qty * exit_price[k]
+
+            free_slots = self.max_positions - len(open_positions)
+            if free_slots <= 0:
+                skipped += 1
+                continue
+
+            equity = cash
+            if self.allocation == 'max_position_size':
+                equity += sum(qty * close[bar, symbol[k]] for _, k, qty in open_positions)
+            amount = min(cash, self._allocate(cash, free_slots, equity, initial_capital, symbols))
+            if amount <= 0:
+                skipped += 1
+                continue
+
+            qty = amount / entry_price[i]
+            cash -= amount
+            heapq.heappush(open_positions, (exit_bar[i], i, qty))
+            accepted.append(i)
+            quantities.append(qty)
+
+        return np.array(accepted, dtype=np.intp), np.array(quantities, dtype=float), skipped
+
+    def run(self, data_by_symbol, strategy, initial_capital=10000):
+        """
+        Executa o backtest da carteira.
+
+        Args:
+            data_by_symbol (dict): Símbolo -> DataFrame OHLCV
+            strategy: Estratégia de trading
+            initial_capital (float): Capital inicial compartilhado
+
+        Returns:
+            dict: trades, equity_curve, open_positions (por barra), metrics
+        """
+        symbols = list(data_by_symbol)
+        grid, close, rows = align_symbols(data_by_symbol)
+        candidates = self.candidate_trades(data_by_symbol, strategy, rows)
+        accepted, quantities, skipped = self.select_trades(candidates, close, initial_capital)
+
+        symbol = candidates['symbol'][accepted]
+        entry_bar = candidates['entry_bar'][accepted]
+        exit_bar = candidates['exit_bar'][accepted]
+        entry_price = candidates['entry_price'][accepted]
+        exit_price = candidates['exit_price'][accepted]
+
+        # Posições e caixa por barra a partir das variações nas entradas e saídas
+        bars = len(grid)
+        counts = np.zeros((bars + 1, len(symbols)), dtype=np.int32)
+        holdings = np.zeros((bars + 1, len(symbols)))
+        cash = np.zeros(bars + 1)
+        np.add.at(counts, (entry_bar, symbol), 1)
+        np.add.at(counts, (exit_bar, symbol), -1)
+        np.add.at(holdings, (entry_bar, symbol), quantities)
+        np.add.at(holdings, (exit_bar, symbol), -quantities)
+        np.add.at(cash, entry_bar, -quantities * entry_price)
+        np.add.at(cash, exit_bar, quantities * exit_price)
+
+        counts = np.cumsum(counts[:-1], axis=0)
+        holdings = np.where(counts > 0, np.cumsum(holdings[:-1], axis=0), 0.0)
+        cash = initial_capital + np.cumsum(cash[:-1])
+        equity = cash + np.einsum('ij,ij->i', holdings, close)
+        open_positions = counts.sum(axis=1)
+
+        profits = (exit_price - entry_price) / entry_price * 100
+        times = pd.DatetimeIndex(grid)
+        trades = [
+            {
+                'symbol': symbols[s],
+                'entry_time': entry_time,
+                'entry_price': price_in,
+                'exit_time': exit_time,
+                'exit_price': price_out,
+                'quantity': qty,
+                'profit_pct': profit,
+                'exit_reason': reason
+            }
+            for s, entry_time, price_in, exit_time, price_out, qty, profit, reason in zip(
+                symbol.tolist(), times[entry_bar], entry_price.tolist(), times[exit_bar],
+                exit_price.tolist(), quantities.tolist(), profits.tolist(), candidates['reason'][accepted]
+            )
+        ]
+
+        metrics = compute_metrics(equity, open_positions > 0,
+                                  infer_periods_per_year(grid, self.backtest.timeframe))
+        metrics.update({
+            'total_trades': len(trades),
+            'win_rate': float(np.count_nonzero(profits > 0) / len(trades) * 100) if trades else 0.0,
+            'skipped_trades': skipped,
+            'max_open_positions': int(open_positions.max()) if bars else 0,
+            'final_capital': float(equity[-1]) if bars else float(initial_capital)
+        })
+        logger.info(f"Portfolio backtest: {len(trades)} trades on {len(symbols)} symbols, {skipped} entries skipped")
+
+        return {
+            'trades': trades,
+            'equity_curve': equity.tolist(),
+            'open_positions': open_positions.tolist(),
+            'metrics': metrics
+        }
+
+
+def run_portfolio_backtest(config, strategy, from_date, to_date, symbols=None, initial_capital=10000,
+                           io_workers=None, data_provider=None, max_positions=None, allocation=None):
+    """
+    Carrega os dados de todos os símbolos em paralelo e executa o backtest de carteira.
+
+    Args:
+        config (dict): Configuração
+        strategy: Estratégia de trading
+        from_date (datetime): Data inicial
+        to_date (datetime): Data final
+        symbols (list, optional): Símbolos (padrão: trading.pairs da configuração)
+        initial_capital (float): Capital inicial compartilhado
+        io_workers (int, optional): Número de threads para carregar os dados
+        data_provider: Provedor de dados históricos
+        max_positions (int, optional): Máximo de posições simultâneas
+        allocation (str, optional): Regra de alocação
+
+    Returns:
+        dict: Resultados de PortfolioBacktest.run
+    """
+    if symbols is None:
+        symbols = config.get('trading', {}).get('pairs')
+    if not symbols:
+        from .config import CRIPTOS
+        symbols = CRIPTOS
+
+    loader = Backtest(config, data_provider)
+    logger.info(f"Running portfolio backtest for {len(symbols)} symbols from {from_date} to {to_date}")
+    with ThreadPoolExecutor(max_workers=io_workers or min(32, len(symbols))) as io_pool:
+        loads = {symbol: io_pool.submit(loader.load_historical_data, symbol, from_date, to_date) for symbol in symbols}
+        data_by_symbol = {symbol: future.result() for symbol, future in loads.items()}
+
+    return PortfolioBacktest(config, max_positions, allocation).run(data_by_symbol, strategy, initial_capital)
@@ -0,0 +1,343 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import copy
+import heapq
+import itertools
+import logging
+import time
+
+logger = logging.getLogger("TradingBot-RequestScheduler")
+
+# Prioridades (menor = mais urgente): ordens passam na frente de consultas
+PRIORITY_ORDERS = 0
+PRIORITY_ACCOUNT = 1
+PRIORITY_MARKET_DATA = 2
+
+# Peso de cada endpoint no limite de requisições da Binance (por minuto)
+ENDPOINT_WEIGHTS = {
+    'create_order': 1,
+    'cancel_order': 1,
+    'fetch_order': 4,
+    'fetch_open_orders': 6,
+    'fetch_balance': 20,
+    'fetch_ticker': 2,
+    'fetch_ohlcv': 2,
+    'fetch_order_book': 5,
+    'load_markets': 20,
+}
+
+ENDPOINT_PRIORITIES = {
+    'create_order': PRIORITY_ORDERS,
+    'cancel_order': PRIORITY_ORDERS,
+    'fetch_order': PRIORITY_ACCOUNT,
+    'fetch_open_orders': PRIORITY_ACCOUNT,
+    'fetch_balance': PRIORITY_ACCOUNT,
+}
+
+# Consultas idênticas em andamento são respondidas por uma única requisição
+COALESCED_ENDPOINTS = {'fetch_ticker', 'fetch_ohlcv', 'fetch_order_book', 'load_markets'}
+
+# Endpoints que também contam no limite de ordens
+ORDER_ENDPOINTS = {'create_order'}
+
+# Limites padrão da Binance: (capacidade, período em segundos)
+DEFAULT_LIMITS = {
+    'weight': (1200, 60),
+    'orders': (50, 10),
+}
+
+# Erros da ccxt que indicam limite excedido
+RATE_LIMIT_ERRORS = {'RateLimitExceeded', 'DDoSProtection'}
+
+
+class TokenBucket:
+    """Balde de fichas: até capacity fichas, repostas continuamente a rate por segundo."""
+
+    def __init__(self, capacity, rate, clock=time.monotonic):
+        """
+        Args:
+            capacity (float): Máximo de fichas acumuladas
+            rate (float): Fichas repostas por segundo
+            clock (callable): Relógio monotônico em segundos
+        """
+        self.capacity = capacity
+        self.rate = rate
+        self.clock = clock
+        self.tokens = capacity
+        self._updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, cost):
+        """Segundos até haver fichas suficientes para o custo."""
+        self._refill()
+        return max(0.0, (min(cost, self.capacity) - self.tokens) / self.rate)
+
+    def consume(self, cost):
+        """Retira as fichas (o saldo pode ficar negativo para custos acima da capacidade)."""
+        self._refill()
+        self.tokens -= cost
+
+    def drain(self):
+        """Zera o balde (ex: após a exchange responder que o limite foi excedido)."""
+        self._refill()
+        self.tokens = min(self.tokens, 0.0)
+
+
+class RequestScheduler:
+    """
+    Agendador central das requisições à exchange.
+
+    Todas as chamadas passam por uma fila de prioridades: ordens e
+    cancelamentos são liberados antes de consultas de conta, que passam na
+    frente de dados de mercado. Cada requisição só é liberada quando há
+    fichas no balde de peso (e no de ordens, para create_order), evitando
+    rajadas que fariam a exchange limitar o bot. Consultas idênticas em
+    andamento são agrupadas em uma única requisição.
+
+    O agendador expõe os mesmos métodos da exchange (ex: fetch_ohlcv) e pode
+    substituí-la em AsyncMarketData. A exchange mantém uma única sessão HTTP
+    persistente (ver create_pooled_exchange).
+    """
+
+    def __init__(self, exchange, limits=None, weights=None, max_in_flight=10, clock=time.monotonic):
+        """
+        Inicializa o agendador.
+
+        Args:
+            exchange: Exchange assíncrona com API da ccxt
+            limits (dict, optional): Nome do balde -> (capacidade, período em s)
+            weights (dict, optional): Pesos por endpoint (substituem ENDPOINT_WEIGHTS)
+            max_in_flight (int): Máximo de requisições simultâneas (tamanho do pool)
+            clock (callable): Relógio monotônico em segundos
+        """
+        self.exchange = exchange
+        self.weights = {**ENDPOINT_WEIGHTS, **(weights or {})}
+        self.buckets = {name: TokenBucket(capacity, capacity / period, clock)
+                        for name, (capacity, period) in {**DEFAULT_LIMITS, **(limits or {})}.items()}
+        self.max_in_flight = max_in_flight
+        self.clock = clock
+
+        self._queue = []
+        self._sequence = itertools.count()
+        self._inflight = {}
+        self._running = set()
+        self._wakeup = None
+        self._dispatcher = None
+        self._stats = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def __getattr__(self, name):
+        exchange = self.__dict__.get('exchange')
+        if name.startswith('_') or not callable(getattr(exchange, name, None)):
+            raise AttributeError(name)
+
+        async def call(*args, **kwargs):
+            return await self.request(name, *args, **kwargs)
+
+        return call
+
+    def _costs(self, method):
+        costs = {'weight': self.weights.get(method, 1)}
+        if method in ORDER_ENDPOINTS and 'orders' in self.buckets:
+            costs['orders'] = 1
+        return {name: cost for name, cost in costs.items() if name in self.buckets}
+
+    def _endpoint_stats(self, method):
+        stats = self._stats.get(method)
+        if stats is None:
+            stats = self._stats[method] = {
+                'requests': 0, 'coalesced': 0, 'errors': 0, 'rate_limited': 0,
+                'latency_total': 0.0, 'latency_max': 0.0, 'queue_total': 0.0, 'queue_max': 0.0,
+            }
+        return stats
+
+    async def request(self, method, *args, priority=None, **kwargs):
+        """
+        Enfileira uma chamada à exchange e espera o resultado.
+
+        Args:
+            method (str): Nome do método da ccxt (ex: 'create_order')
+            *args: Argumentos posicionais do método
+            priority (int, optional): Prioridade (padrão: a do endpoint)
+            **kwargs: Argumentos nomeados do método
+
+        Returns:
+            Resultado do método da exchange; chamadas agrupadas recebem cada
+            uma sua própria cópia, então alterar o resultado não afeta as demais
+        """
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch_loop())
+
+        key = None
+        if method in COALESCED_ENDPOINTS:
+            key = (method, args, tuple(sorted(kwargs.items())))
+            try:
+                hash(key)
+            except TypeError:
+                key = None
+        if key is not None:
+            future = self._inflight.get(key)
+            if future is not None:
+                self._endpoint_stats(method)['coalesced'] += 1
+                return copy.deepcopy(await asyncio.shield(future))
+
+        future = asyncio.get_running_loop().create_future()
+        if key is not None:
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        if priority is None:
+            priority = ENDPOINT_PRIORITIES.get(method, PRIORITY_MARKET_DATA)
+        heapq.heappush(self._queue, (priority, next(self._sequence), method, args, kwargs, future, self.clock(), 0))
+        self._wakeup.set()
+        return await asyncio.shield(future)
+
+    async def _dispatch_loop(self):
+        while True:
+            if not self._queue or len(self._running) >= self.max_in_flight:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            # Espera fichas para a requisição mais prioritária; uma chegada
+            # mais urgente durante a espera reavalia a cabeça da fila
+            method = self._queue[0][2]
+            costs = self._costs(method)
+            delay = max((self.buckets[name].wait_time(cost) for name, cost in costs.items()), default=0.0)
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            item = heapq.heappop(self._queue)
+            for name, cost in costs.items():
+                self.buckets[name].consume(cost)
+            task = asyncio.get_running_loop().create_task(self._execute(*item))
+            self._running.add(task)
+            task.add_done_callback(self._finished)
+
+    def _finished(self, task):
+        self._running.discard(task)
+        self._wakeup.set()
+
+    async def _execute(self, priority, sequence, method, args, kwargs, future, enqueued, attempt):
+        stats = self._endpoint_stats(method)
+        started = self.clock()
+        queue_time = started - enqueued
+        try:
+            result = await getattr(self.exchange, method)(*args, **kwargs)
+        except Exception as e:
+            if type(e).__name__ in RATE_LIMIT_ERRORS and attempt == 0:
+                # A exchange recusou por limite: esvazia os baldes e tenta de novo uma vez
+                stats['rate_limited'] += 1
+                logger.warning(f"Rate limited on {method}, backing off")
+                for bucket in self.buckets.values():
+                    bucket.drain()
+                heapq.heappush(self._queue, (priority, sequence, method, args, kwargs, future, enqueued, 1))
+                self._wakeup.set()
+                return
+            stats['errors'] += 1
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(result)
+        finally:
+            latency = self.clock() - started
+            stats['requests'] += 1
+            stats['latency_total'] += latency
+            stats['latency_max'] = max(stats['latency_max'], latency)
+            stats['queue_total'] += queue_time
+            stats['queue_max'] = max(stats['queue_max'], queue_time)
+
+    def stats(self):
+        """
+        Latência e tempo de fila por endpoint.
+
+        Returns:
+            dict: Endpoint -> requests, coalesced, errors, rate_limited,
+                  avg/max_latency_ms e avg/max_queue_ms
+        """
+        report = {}
+        for method, stats in self._stats.items():
+            requests = stats['requests'] or 1
+            report[method] = {
+                'requests': stats['requests'],
+                'coalesced': stats['coalesced'],
+                'errors': stats['errors'],
+                'rate_limited': stats['rate_limited'],
+                'avg_latency_ms': stats['latency_total'] / requests * 1000,
+                'max_latency_ms': stats['latency_max'] * 1000,
+                'avg_queue_ms': stats['queue_total'] / requests * 1000,
+                'max_queue_ms': stats['queue_max'] * 1000,
+            }
+        return report
+
+    async def close(self):
+        """Para o despachante e espera as requisições em andamento."""
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+        for item in self._queue:
+            if not item[5].done():
+                item[5].cancel()
+        self._queue.clear()
+
+
+async def create_pooled_exchange(exchange_id='binance', pool_size=10, keepalive=60.0, api_key=None,
+                                 api_secret=None, options=None):
+    """
+    Cria uma exchange assíncrona da ccxt com um pool de conexões persistentes.
+
+    Deve ser chamada dentro do loop de eventos, que passa a ser o dono da
+    sessão. As conexões ficam abertas por keepalive segundos entre usos. O
+    limitador interno da ccxt é desligado, já que o RequestScheduler controla
+    o ritmo das requisições.
+
+    Args:
+        exchange_id (str): Identificador da exchange no ccxt
+        pool_size (int): Máximo de conexões simultâneas
+        keepalive (float): Tempo (s) que uma conexão ociosa fica aberta
+        api_key (str, optional): Chave da API
+        api_secret (str, optional): Segredo da API
+        options (dict, optional): Parâmetros extras repassados ao ccxt
+
+    Returns:
+        Exchange assíncrona do ccxt
+    """
+    try:
+        import aiohttp
+    except ImportError as e:
+        raise ImportError("aiohttp is required for pooled connections (pip install aiohttp)") from e
+
+    from .market_data import create_async_exchange
+
+    connector = aiohttp.TCPConnector(limit=pool_size, keepalive_timeout=keepalive, ttl_dns_cache=300,
+                                     enable_cleanup_closed=True)
+    session = aiohttp.ClientSession(connector=connector, trust_env=True)
+    exchange = create_async_exchange(exchange_id, api_key, api_secret,
+                                     {'enableRateLimit': False, 'session': session, **(options or {})})
+    # Faz exchange.close() encerrar também a sessão criada aqui
+    exchange.own_session = True
+    return exchange
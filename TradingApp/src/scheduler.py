@@ -0,0 +1,320 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import itertools
+import logging
+import time
+from datetime import datetime, timezone
+
+from .strategies import bar_from_ohlcv
+from .timeframes import timeframe_to_seconds
+
+logger = logging.getLogger("TradingBot-Scheduler")
+
+# 1970-01-01 foi uma quinta-feira; candles semanais da ccxt começam na segunda
+WEEK_ORIGIN_MS = 4 * 24 * 60 * 60 * 1000
+
+
+def candle_open_time(timestamp_ms, timeframe):
+    """
+    Abertura do candle que contém o instante informado.
+
+    Args:
+        timestamp_ms (int): Instante em milissegundos desde a época (UTC)
+        timeframe (str): Timeframe no formato da ccxt
+
+    Returns:
+        int: Abertura do candle em milissegundos
+    """
+    if timeframe.endswith('M'):
+        months = int(timeframe[:-1])
+        moment = datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)
+        index = (moment.year * 12 + moment.month - 1) // months * months
+        start = datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+        return int(start.timestamp() * 1000)
+
+    step = timeframe_to_seconds(timeframe) * 1000
+    origin = WEEK_ORIGIN_MS if timeframe.endswith('w') else 0
+    return (timestamp_ms - origin) // step * step + origin
+
+
+def candle_close_time(open_ms, timeframe):
+    """
+    Fechamento do candle que abre em open_ms (abertura do candle seguinte).
+
+    Args:
+        open_ms (int): Abertura do candle em milissegundos
+        timeframe (str): Timeframe no formato da ccxt
+
+    Returns:
+        int: Fechamento do candle em milissegundos
+    """
+    if timeframe.endswith('M'):
+        months = int(timeframe[:-1])
+        moment = datetime.fromtimestamp(open_ms / 1000, tz=timezone.utc)
+        index = moment.year * 12 + moment.month - 1 + months
+        end = datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+        return int(end.timestamp() * 1000)
+    return open_ms + timeframe_to_seconds(timeframe) * 1000
+
+
+def next_candle_close(now_ms, timeframe, offset=0.0):
+    """
+    Próximo instante de avaliação alinhado ao fechamento dos candles.
+
+    Args:
+        now_ms (int): Instante atual em milissegundos
+        timeframe (str): Timeframe no formato da ccxt
+        offset (float): Atraso (s) após o fechamento, para a exchange publicar o candle
+
+    Returns:
+        int: Instante da próxima avaliação em milissegundos
+    """
+    offset_ms = int(offset * 1000)
+    close = candle_close_time(candle_open_time(now_ms - offset_ms, timeframe), timeframe)
+    return close + offset_ms
+
+
+class CandleCloseScheduler:
+    """
+    Executa as estratégias no fechamento de cada candle.
+
+    Atualizações podem chegar por push (um feed de streaming entrega o candle
+    em formação várias vezes) ou por consulta agendada no fechamento dos
+    candles + offset. Em ambos os casos cada candle fechado é entregue uma
+    única vez, em ordem, a on_candle(symbol, bar), assim que se sabe que ele
+    fechou: quando o feed marca o candle como fechado, quando chega o candle
+    seguinte ou quando o relógio passa do fechamento.
+    """
+
+    def __init__(self, symbols, timeframe, on_candle, offset=1.0, clock=time.time):
+        """
+        Inicializa o agendador.
+
+        Args:
+            symbols (list): Símbolos acompanhados
+            timeframe (str): Timeframe dos candles (ex: '5m')
+            on_candle (callable): Função ou corrotina chamada com (symbol, Bar)
+            offset (float): Atraso (s) após o fechamento para consultar a exchange
+            clock (callable): Relógio em segundos desde a época
+        """
+        self.symbols = list(symbols)
+        self.timeframe = timeframe
+        self.on_candle = on_candle
+        self.offset = offset
+        self.clock = clock
+        self.last_closed = {}
+        self.pending = {}
+        self.dispatched = {symbol: 0 for symbol in self.symbols}
+
+    def _now_ms(self):
+        return int(self.clock() * 1000)
+
+    def _is_closed(self, row, now_ms):
+        return candle_close_time(int(row[0]), self.timeframe) <= now_ms
+
+    async def _dispatch(self, symbol, row):
+        self.last_closed[symbol] = int(row[0])
+        self.dispatched[symbol] = self.dispatched.get(symbol, 0) + 1
+        result = self.on_candle(symbol, bar_from_ohlcv(row))
+        if asyncio.iscoroutine(result):
+            await result
+
+    async def update(self, symbol, row, closed=None):
+        """
+        Recebe uma atualização de candle (push) e entrega os candles fechados.
+
+        Args:
+            symbol (str): Símbolo do candle
+            row (list): [timestamp_ms, open, high, low, close, volume]
+            closed (bool, optional): Se o feed informa que o candle fechou.
+                None: decide pelo candle seguinte ou pelo relógio.
+
+        Returns:
+            int: Número de candles entregues
+        """
+        timestamp = int(row[0])
+        if timestamp <= self.last_closed.get(symbol, -1):
+            return 0
+
+        delivered = 0
+        pending = self.pending.get(symbol)
+        if pending is not None and int(pending[0]) < timestamp:
+            # Chegou um candle mais novo: o pendente está fechado
+            del self.pending[symbol]
+            await self._dispatch(symbol, pending)
+            delivered += 1
+
+        if closed is None:
+            closed = self._is_closed(row, self._now_ms())
+
+        if closed:
+            self.pending.pop(symbol, None)
+            await self._dispatch(symbol, row)
+            delivered += 1
+        else:
+            self.pending[symbol] = row
+        return delivered
+
+    async def flush_due(self):
+        """
+        Entrega os candles pendentes cujo fechamento já passou pelo relógio.
+
+        Returns:
+            int: Número de candles entregues
+        """
+        now_ms = self._now_ms()
+        due = [symbol for symbol, row in self.pending.items() if self._is_closed(row, now_ms)]
+        for symbol in due:
+            await self._dispatch(symbol, self.pending.pop(symbol))
+        return len(due)
+
+    async def consume(self, feed):
+        """
+        Processa um feed de streaming até ele terminar.
+
+        Args:
+            feed: Iterador assíncrono de (symbol, row, closed), ex: ReplayFeed
+
+        Returns:
+            int: Número de candles entregues
+        """
+        delivered = 0
+        async for symbol, row, closed in feed:
+            delivered += await self.update(symbol, row, closed)
+        return delivered
+
+    async def run(self, market_data=None, limit=2, stop_event=None, max_cycles=None):
+        """
+        Acorda no fechamento de cada candle + offset.
+
+        A cada ciclo, consulta os candles recentes de todos os símbolos (se
+        market_data for informado) e entrega os candles fechados que o feed
+        de push ainda não entregou.
+
+        Args:
+            market_data (AsyncMarketData, optional): Camada de dados para consulta
+            limit (int): Candles consultados por símbolo a cada ciclo
+            stop_event (asyncio.Event, optional): Encerra o loop quando sinalizado
+            max_cycles (int, optional): Número máximo de ciclos
+
+        Returns:
+            int: Número de ciclos executados
+        """
+        cycles = 0
+        while not (stop_event is not None and stop_event.is_set()):
+            wake_ms = next_candle_close(self._now_ms(), self.timeframe, self.offset)
+            delay = max(0.0, wake_ms / 1000 - self.clock())
+            if stop_event is None:
+                await asyncio.sleep(delay)
+            else:
+                try:
+                    await asyncio.wait_for(stop_event.wait(), delay)
+                    break
+                except asyncio.TimeoutError:
+                    pass
+
+            if market_data is not None:
+                snapshot = await market_data.poll(self.symbols, self.timeframe, limit)
+                for symbol, rows in snapshot['ohlcv'].items():
+                    for row in rows:
+                        await self.update(symbol, row)
+            await self.flush_due()
+
+            cycles += 1
+            if max_cycles is not None and cycles >= max_cycles:
+                break
+        return cycles
+
+
+def strategy_dispatcher(strategies, on_signal=None):
+    """
+    Cria um on_candle que alimenta uma estratégia incremental por símbolo.
+
+    Args:
+        strategies (dict): Símbolo -> estratégia com on_bar
+        on_signal (callable, optional): Chamada com (symbol, sinal, bar) quando
+            on_bar devolve 'BUY' ou 'SELL'
+
+    Returns:
+        callable: Função on_candle(symbol, bar)
+    """
+    def on_candle(symbol, bar):
+        signal = strategies[symbol].on_bar(bar)
+        if signal is not None and on_signal is not None:
+            return on_signal(symbol, signal, bar)
+        return None
+
+    return on_candle
+
+
+class ReplayFeed:
+    """
+    Feed local que reproduz candles históricos como um stream da exchange.
+
+    Os candles de todos os símbolos são intercalados pelo timestamp. Cada
+    candle pode ser entregue em várias atualizações parciais antes da final,
+    como nos streams de klines das exchanges.
+    """
+
+    def __init__(self, data, timeframe, ticks_per_bar=1, mark_closed=True, speed=None):
+        """
+        Inicializa o feed.
+
+        Args:
+            data (dict): Símbolo -> DataFrame (timestamp e OHLCV) ou lista de linhas da ccxt
+            timeframe (str): Timeframe dos candles
+            ticks_per_bar (int): Atualizações entregues por candle (a última é a final)
+            mark_closed (bool): Marca a atualização final como fechada; se False,
+                o fechamento só é percebido com a chegada do candle seguinte
+            speed (float, optional): Fator de aceleração em relação ao tempo real
+                (None: o mais rápido possível)
+        """
+        self.timeframe = timeframe
+        self.ticks_per_bar = max(1, int(ticks_per_bar))
+        self.mark_closed = mark_closed
+        self.speed = speed
+        self.rows = sorted(
+            ((int(row[0]), symbol, row) for symbol, rows in data.items() for row in self._to_rows(rows)),
+            key=lambda item: item[:2]
+        )
+
+    @staticmethod
+    def _to_rows(data):
+        if hasattr(data, 'columns'):
+            from .data_store import to_milliseconds
+
+            timestamps = to_milliseconds(data['timestamp'])
+            values = data[['open', 'high', 'low', 'close', 'volume']].to_numpy(dtype=float)
+            return [[int(ts), *map(float, value)] for ts, value in zip(timestamps, values)]
+        return [list(row) for row in data]
+
+    def _ticks(self, row):
+        """Atualizações parciais do candle seguidas da final."""
+        timestamp, open_, high, low, close, volume = row[:6]
+        for tick in range(1, self.ticks_per_bar):
+            fraction = tick / self.ticks_per_bar
+            price = open_ + (close - open_) * fraction
+            yield [timestamp, open_, max(open_, price), min(open_, price), price, volume * fraction], False
+        yield row, self.mark_closed
+
+    def __aiter__(self):
+        return self._stream()
+
+    async def _stream(self):
+        tick_seconds = timeframe_to_seconds(self.timeframe) / self.ticks_per_bar
+        previous = None
+        for timestamp, group in itertools.groupby(self.rows, key=lambda item: item[0]):
+            # Candles de todos os símbolos no mesmo timestamp avançam juntos
+            streams = [(symbol, self._ticks(row)) for _, symbol, row in group]
+            if self.speed is not None and previous is not None:
+                gap = (timestamp - previous) / 1000 - tick_seconds * self.ticks_per_bar
+                await asyncio.sleep(max(0.0, gap) / self.speed)
+            previous = timestamp
+
+            for tick in range(self.ticks_per_bar):
+                await asyncio.sleep(0 if self.speed is None or tick == 0 else tick_seconds / self.speed)
+                for symbol, ticks in streams:
+                    row, closed = next(ticks)
+                    yield symbol, row, closed
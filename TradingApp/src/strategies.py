@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from .indicators import SMA, sma
+
+# Sinais numéricos usados pelo protocolo vetorizado (generate_signals)
+SIGNAL_BUY = 1
+SIGNAL_SELL = -1
+SIGNAL_HOLD = 0
+
+# Barra entregue às estratégias incrementais (on_bar)
+Bar = namedtuple('Bar', ['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+
+
+def bar_from_ohlcv(row):
+    """
+    Converte uma linha de fetch_ohlcv (ccxt) em Bar.
+
+    Args:
+        row (list): [timestamp_ms, open, high, low, close, volume]
+
+    Returns:
+        Bar: Barra com timestamp em milissegundos
+    """
+    return Bar(*row[:6])
+
+
+class MovingAverageCrossover:
+    """
+    Estratégia de cruzamento de médias móveis simples.
+
+    As médias vêm de src.indicators: a versão em lote (generate_signals) e a
+    incremental (on_bar) produzem valores idênticos, então backtest e bot ao
+    vivo geram exatamente os mesmos sinais.
+    """
+
+    def __init__(self, fast_period=9, slow_period=21):
+        """
+        Inicializa a estratégia.
+
+        Args:
+            fast_period (int): Período da média rápida
+            slow_period (int): Período da média lenta
+        """
+        if fast_period >= slow_period:
+            raise ValueError("fast_period must be smaller than slow_period")
+
+        self.fast_period = fast_period
+        self.slow_period = slow_period
+        self.reset()
+
+    def reset(self):
+        """Descarta o estado acumulado por on_bar."""
+        self._fast = SMA(self.fast_period)
+        self._slow = SMA(self.slow_period)
+        self._prev_above = None
+
+    def on_bar(self, bar):
+        """
+        Processa uma nova barra em O(1) (protocolo incremental).
+
+        Pode ser chamada tanto pelo backtest quanto pelo loop do bot ao vivo,
+        uma vez por barra fechada.
+
+        Args:
+            bar (Bar): Barra recém-fechada
+
+        Returns:
+            str or None: 'BUY', 'SELL' ou None
+        """
+        fast = self._fast.update(bar.close)
+        slow = self._slow.update(bar.close)
+        if slow != slow:
+            return None
+
+        above = fast > slow
+        prev_above, self._prev_above = self._prev_above, above
+
+        if prev_above is None or above == prev_above:
+            return None
+        return 'BUY' if above else 'SELL'
+
+    def required_indicators(self):
+        """
+        Indicadores usados por generate_signals, para pré-cálculo.
+
+        Returns:
+            list: Chaves (nome, período) de src.indicators.compute_indicators
+        """
+        return [('sma', self.fast_period), ('sma', self.slow_period)]
+
+    def generate_signals(self, data, indicators=None):
+        """
+        Gera os sinais para todas as barras de uma só vez.
+
+        Args:
+            data (pandas.DataFrame): Dados históricos com a coluna 'close'
+            indicators (dict, optional): Arrays já calculados e alinhados com
+                data, pelas chaves de required_indicators; os ausentes são
+                calculados aqui
+
+        Returns:
+            pandas.Series: SIGNAL_BUY, SIGNAL_SELL ou SIGNAL_HOLD por barra
+        """
+        indicators = indicators or {}
+        close = data['close'].to_numpy(dtype=float)
+        fast = indicators.get(('sma', self.fast_period))
+        if fast is None:
+            fast = sma(close, self.fast_period)
+        slow = indicators.get(('sma', self.slow_period))
+        if slow is None:
+            slow = sma(close, self.slow_period)
+
+        # Só há sinal quando as duas médias existem na barra atual e na anterior
+        ready = ~np.isnan(slow)
+        valid = ready & np.roll(ready, 1)
+        valid[:1] = False
+        above = fast > slow
+        prev_above = np.roll(above, 1)
+
+        signals = np.full(len(data), SIGNAL_HOLD, dtype=np.int8)
+        signals[valid & above & ~prev_above] = SIGNAL_BUY
+        signals[valid & ~above & prev_above] = SIGNAL_SELL
+
+        return pd.Series(signals, index=data.index, name='signal')
+
+    def generate_signal(self, data):
+        """
+        Gera o sinal da última barra (protocolo por barra).
+
+        Args:
+            data (pandas.DataFrame): Dados históricos até a barra atual
+
+        Returns:
+            str or None: 'BUY', 'SELL' ou None
+        """
+        window = data.iloc[-(self.slow_period + 1):]
+        signal = self.generate_signals(window).iloc[-1] if len(window) else SIGNAL_HOLD
+
+        if signal == SIGNAL_BUY:
+            return 'BUY'
+        if signal == SIGNAL_SELL:
+            return 'SELL'
+        return None
+
+
+# Estratégias disponíveis, indexadas pelo campo "type" da configuração
+STRATEGIES = {
+    'moving_average_crossover': MovingAverageCrossover,
+}
+
+
+def create_strategy(config):
+    """
+    Cria a estratégia descrita na seção "strategy" da configuração.
+
+    Args:
+        config (dict): Configuração completa ou apenas a seção "strategy"
+
+    Returns:
+        Estratégia de trading
+    """
+    strategy_config = dict(config.get('strategy', config))
+    strategy_type = strategy_config.pop('type', 'moving_average_crossover')
+
+    if strategy_type not in STRATEGIES:
+        raise ValueError(f"Unknown strategy type: {strategy_type}")
+
+    return STRATEGIES[strategy_type](**strategy_config)
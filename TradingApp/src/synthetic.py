@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+
+from .data_store import to_milliseconds
+from .timeframes import SECONDS_PER_YEAR, timeframe_to_seconds
+
+MODELS = ('gbm', 'stochastic_volatility', 'regime')
+
+
+def _volatility_path(rng, n_bars, volatility, model, persistence, vol_of_vol, regimes):
+    """
+    Volatilidade anualizada de cada barra.
+
+    'stochastic_volatility' suaviza ruído gaussiano com um kernel exponencial
+    (uma convolução, sem laço por barra) para obter períodos persistentes de
+    alta e baixa volatilidade. 'regime' sorteia durações geométricas de
+    regimes e repete o multiplicador de cada um com np.repeat.
+    """
+    if model == 'gbm' or n_bars == 0:
+        return np.full(n_bars, volatility)
+
+    if model == 'stochastic_volatility':
+        length = max(1, min(n_bars, int(persistence * 5)))
+        kernel = np.exp(-np.arange(length) / persistence)
+        kernel /= np.sqrt(np.sum(kernel ** 2))
+        noise = rng.standard_normal(n_bars + length - 1)
+        log_factor = np.convolve(noise, kernel, mode='valid')[:n_bars]
+        return volatility * np.exp(vol_of_vol * log_factor - 0.5 * vol_of_vol ** 2)
+
+    if model == 'regime':
+        multipliers = np.asarray(regimes, dtype=float)
+        # Durações suficientes para cobrir todas as barras
+        durations = rng.geometric(1.0 / persistence, size=n_bars // max(1, int(persistence)) + 16)
+        while durations.sum() < n_bars:
+            durations = np.concatenate([durations, rng.geometric(1.0 / persistence, size=len(durations))])
+        states = rng.integers(0, len(multipliers), size=len(durations))
+        return volatility * np.repeat(multipliers[states], durations)[:n_bars]
+
+    raise ValueError(f"Unknown synthetic model: {model} (expected one of {MODELS})")
+
+
+def generate_ohlcv(n_bars=None, timeframe='1d', start=None, end=None, seed=None, start_price=100.0,
+                   drift=0.0, volatility=0.8, model='gbm', persistence=100.0, vol_of_vol=0.5,
+                   regimes=(0.5, 1.0, 2.5), base_volume=1000000.0):
+    """
+    Gera candles sintéticos em uma única passagem vetorizada.
+
+    Os preços de fechamento seguem um movimento browniano geométrico
+    (produto cumulativo dos retornos). Cada barra abre no fechamento da
+    anterior, e máxima/mínima envolvem abertura e fechamento, então
+    low <= min(open, close) <= max(open, close) <= high sempre vale.
+
+    Args:
+        n_bars (int, optional): Número de barras (alternativa a end)
+        timeframe (str): Timeframe das barras (ex: '5m')
+        start (datetime, optional): Timestamp da primeira barra (padrão: 2024-01-01)
+        end (datetime, optional): Último timestamp permitido (inclusivo)
+        seed (int or list, optional): Semente para reprodutibilidade
+        start_price (float): Preço inicial
+        drift (float): Retorno anual esperado
+        volatility (float): Volatilidade anual
+        model (str): 'gbm', 'stochastic_volatility' ou 'regime'
+        persistence (float): Duração média (em barras) dos regimes/aglomerados de volatilidade
+        vol_of_vol (float): Intensidade da variação da volatilidade ('stochastic_volatility')
+        regimes (tuple): Multiplicadores de volatilidade dos regimes ('regime')
+        base_volume (float): Volume médio por barra
+
+    Returns:
+        pandas.DataFrame: Colunas timestamp, open, high, low, close, volume
+    """
+    step_ms = timeframe_to_seconds(timeframe) * 1000
+    start_ms = to_milliseconds(start if start is not None else '2024-01-01')
+    if n_bars is None:
+        if end is None:
+            raise ValueError("Either n_bars or end must be given")
+        n_bars = max(0, (to_milliseconds(end) - start_ms) // step_ms + 1)
+
+    rng = np.random.default_rng(seed)
+    dt = timeframe_to_seconds(timeframe) / SECONDS_PER_YEAR
+
+    sigma = _volatility_path(rng, n_bars, volatility, model, persistence, vol_of_vol, regimes) * np.sqrt(dt)
+    shocks = rng.standard_normal(n_bars)
+    log_returns = (drift * dt - 0.5 * sigma ** 2) + sigma * shocks
+
+    close = start_price * np.exp(np.cumsum(log_returns))
+    open_ = np.empty(n_bars)
+    open_[:1] = start_price
+    open_[1:] = close[:-1]
+
+    # Excursão intrabar proporcional à volatilidade da barra
+    wick = np.abs(rng.standard_normal((2, n_bars))) * sigma * 0.5
+    high = np.maximum(open_, close) * np.exp(wick[0])
+    low = np.minimum(open_, close) * np.exp(-wick[1])
+
+    # Volume maior em barras com movimentos maiores
+    volume = base_volume * rng.lognormal(-0.125, 0.5, n_bars) * (1 + np.abs(shocks))
+
+    timestamps = start_ms + np.arange(n_bars, dtype=np.int64) * step_ms
+    return pd.DataFrame({
+        'timestamp': timestamps.view('datetime64[ms]'),
+        'open': open_,
+        'high': high,
+        'low': low,
+        'close': close,
+        'volume': volume,
+    }, copy=False)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+# Duração em segundos de cada unidade de timeframe no formato da ccxt
+TIMEFRAME_UNITS = {
+    's': 1,
+    'm': 60,
+    'h': 60 * 60,
+    'd': 24 * 60 * 60,
+    'w': 7 * 24 * 60 * 60,
+    'M': 30 * 24 * 60 * 60,
+}
+
+# Criptomoedas negociam 24/7, então o ano tem 365 dias completos
+SECONDS_PER_YEAR = 365 * 24 * 60 * 60
+
+
+def timeframe_to_seconds(timeframe):
+    """
+    Converte um timeframe (ex: '5m', '1h', '1d') em segundos.
+
+    Args:
+        timeframe (str): Timeframe no formato da ccxt
+
+    Returns:
+        int: Duração de uma barra em segundos
+    """
+    amount, unit = timeframe[:-1], timeframe[-1]
+    if unit not in TIMEFRAME_UNITS or not amount.isdigit() or int(amount) <= 0:
+        raise ValueError(f"Invalid timeframe: {timeframe}")
+    return int(amount) * TIMEFRAME_UNITS[unit]
+
+
+def periods_per_year(timeframe):
+    """
+    Número de barras em um ano de negociação contínua.
+
+    Args:
+        timeframe (str): Timeframe no formato da ccxt
+
+    Returns:
+        float: Barras por ano (ex: 105120 para '5m')
+    """
+    return SECONDS_PER_YEAR / timeframe_to_seconds(timeframe)
+
+
+def infer_periods_per_year(timestamps, default_timeframe='1d'):
+    """
+    Barras por ano inferidas do espaçamento mediano entre timestamps.
+
+    Args:
+        timestamps (numpy.ndarray): Timestamps datetime64 ordenados
+        default_timeframe (str): Timeframe usado quando não há barras suficientes
+
+    Returns:
+        float: Barras por ano
+    """
+    if len(timestamps) > 1:
+        spacing = np.median(np.diff(np.asarray(timestamps)).astype('timedelta64[ms]').astype(np.int64)) / 1000
+        if spacing > 0:
+            return SECONDS_PER_YEAR / spacing
+    return periods_per_year(default_timeframe)
@@ -0,0 +1,258 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory, util
+
+import numpy as np
+import pandas as pd
+
+from .backtesting import Backtest
+from .indicator_cache import cache_from_config
+from .indicators import compute_indicators
+from .metrics import compute_metrics, position_from_trades
+from .optimizer import LOWER_IS_BETTER, SharedOHLCV, apply_parameters, close_worker_state, search_space
+from .strategies import create_strategy
+from .timeframes import infer_periods_per_year
+
+logger = logging.getLogger("TradingBot-WalkForward")
+
+
+def walk_forward_folds(length, train_size, test_size, anchored=False):
+    """
+    Divide a série em janelas consecutivas de treino e teste.
+
+    No modo móvel (rolling) a janela de treino tem tamanho fixo e avança
+    test_size barras por fold; no modo ancorado ela sempre começa na
+    primeira barra e cresce. O último teste pode ser menor que test_size.
+
+    Args:
+        length (int): Número de barras
+        train_size (int): Barras de treino
+        test_size (int): Barras de teste
+        anchored (bool): Treino ancorado no início da série
+
+    Returns:
+        list: Tuplas (train_start, train_end, test_start, test_end), fim exclusivo
+    """
+    if train_size <= 0 or test_size <= 0:
+        raise ValueError("train_size and test_size must be positive")
+
+    folds = []
+    test_start = train_size
+    while test_start < length:
+        train_start = 0 if anchored else test_start - train_size
+        folds.append((train_start, test_start, test_start, min(test_start + test_size, length)))
+        test_start += test_size
+    return folds
+
+
+class SharedIndicators:
+    """
+    Indicadores pré-calculados em memória compartilhada.
+
+    Cada indicador ocupa uma linha de uma matriz (indicadores × barras); os
+    workers recebem apenas o descritor e montam o dicionário de arrays sobre
+    o mesmo buffer.
+    """
+
+    def __init__(self, indicators, length):
+        """
+        Args:
+            indicators (dict): Chave -> array sobre a série inteira
+            length (int): Número de barras
+        """
+        self.keys = list(indicators)
+        self.length = length
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, len(self.keys) * length * 8))
+        values = np.ndarray((len(self.keys), length), dtype=np.float64, buffer=self._shm.buf)
+        for i, key in enumerate(self.keys):
+            values[i] = indicators[key]
+
+    @property
+    def descriptor(self):
+        """Descritor serializável enviado aos workers."""
+        return self._shm.name, self.keys, self.length
+
+    @staticmethod
+    def attach(descriptor):
+        """
+        Abre um bloco criado em outro processo.
+
+        Returns:
+            tuple: (SharedMemory, dict chave -> array)
+        """
+        name, keys, length = descriptor
+        shm = shared_memory.SharedMemory(name=name)
+        values = np.ndarray((len(keys), length), dtype=np.float64, buffer=shm.buf)
+        return shm, dict(zip(keys, values))
+
+    def close(self):
+        """Libera o bloco de memória compartilhada."""
+        self._shm.close()
+        self._shm.unlink()
+
+
+def evaluate_window(config, data, indicators, params, start, stop, initial_capital=10000):
+    """
+    Backtest de uma combinação de parâmetros em um trecho da série.
+
+    Os indicadores calculados sobre a série inteira são apenas fatiados, então
+    o início do trecho já tem médias aquecidas com o histórico anterior.
+
+    Args:
+        config (dict): Configuração base
+        data (pandas.DataFrame): Série inteira
+        indicators (dict): Indicadores sobre a série inteira
+        params (dict): Parâmetros da combinação
+        start (int): Primeira barra do trecho
+        stop (int): Fim (exclusivo) do trecho
+        initial_capital (float): Capital inicial
+
+    Returns:
+        tuple: (métricas, curva de capital, posição por barra)
+    """
+    config = apply_parameters(config, params)
+    backtest = Backtest(config)
+    window = data.iloc[start:stop]
+    sliced = {key: values[start:stop] for key, values in indicators.items()}
+
+    trades = backtest.apply_strategy(window, create_strategy(config), sliced)
+    metrics = backtest.calculate_metrics(trades, initial_capital, window)
+    equity = np.asarray(metrics.pop('equity_curve', None) or np.full(len(window), float(initial_capital)))
+    position = position_from_trades(window['timestamp'].to_numpy(), trades)
+    return metrics, equity, position
+
+
+def _select_best(rows, rank_by):
+    """
+    Índice da melhor combinação.
+
+    Métricas ausentes e combinações sem trades no treino ficam por último: uma
+    curva plana não diz nada sobre os parâmetros e não deve vencer candidatos
+    que operaram, mesmo com Sharpe negativo.
+    """
+    scores = np.array([row.get(rank_by, np.nan) if row.get('total_trades') else np.nan for row in rows],
+                      dtype=float)
+    if rank_by in LOWER_IS_BETTER:
+        return int(np.argmin(np.where(np.isnan(scores), np.inf, scores)))
+    return int(np.argmax(np.where(np.isnan(scores), -np.inf, scores)))
+
+
+# Estado de cada processo worker (preenchido pelo initializer)
+_worker_state = {}
+
+
+def _init_worker(data_descriptor, indicators_descriptor, config, combinations, rank_by, initial_capital):
+    shm, data = SharedOHLCV.attach(data_descriptor)
+    indicators_shm, indicators = SharedIndicators.attach(indicators_descriptor)
+    _worker_state.update(shm=shm, data=data, indicators_shm=indicators_shm, indicators=indicators,
+                         config=config, combinations=combinations, rank_by=rank_by,
+                         initial_capital=initial_capital)
+    util.Finalize(None, close_worker_state, args=(_worker_state,), exitpriority=10)
+
+
+def _run_fold(fold):
+    train_start, train_end, test_start, test_end = fold
+    state = _worker_state
+    args = (state['config'], state['data'], state['indicators'])
+
+    train = [evaluate_window(*args, params, train_start, train_end, state['initial_capital'])[0]
+             for params in state['combinations']]
+    best = _select_best(train, state['rank_by'])
+    params = state['combinations'][best]
+
+    metrics, equity, position = evaluate_window(*args, params, test_start, test_end, state['initial_capital'])
+    return params, train[best].get(state['rank_by'], np.nan), metrics, equity, position
+
+
+def run_walk_forward(config, data, space, train_size, test_size, anchored=False, samples=None, workers=None,
+                     initial_capital=10000, rank_by='sharpe_ratio', seed=None):
+    """
+    Otimização walk-forward: escolhe parâmetros no treino e avalia no teste seguinte.
+
+    Os indicadores exigidos por todas as combinações são calculados uma única
+    vez sobre a série inteira e compartilhados com os workers junto com os
+    dados; cada fold apenas fatia os arrays. Os folds rodam em paralelo.
+
+    Args:
+        config (dict): Configuração base
+        data (pandas.DataFrame): Dados históricos
+        space (dict): Nome do parâmetro -> lista de valores
+        train_size (int): Barras de treino por fold
+        test_size (int): Barras de teste por fold
+        anchored (bool): Treino ancorado no início da série em vez de janela móvel
+        samples (int, optional): Busca aleatória com esse número de combinações
+        workers (int, optional): Número de processos (padrão: número de CPUs)
+        initial_capital (float): Capital inicial
+        rank_by (str): Métrica otimizada no treino
+        seed (int, optional): Semente da busca aleatória
+
+    Returns:
+        dict: folds (pandas.DataFrame com uma linha por fold), equity_curve
+        (pandas.Series fora da amostra, encadeada entre folds) e metrics
+    """
+    combinations = search_space(space, samples, seed)
+    if not combinations:
+        raise ValueError("No valid parameter combinations in walk-forward space")
+
+    folds = walk_forward_folds(len(data), train_size, test_size, anchored)
+    if not folds:
+        raise ValueError("Not enough data for a single train/test fold")
+
+    # Indicadores de todas as combinações, uma vez por chave distinta
+    keys = []
+    for params in combinations:
+        strategy = create_strategy(apply_parameters(config, params))
+        if hasattr(strategy, 'required_indicators'):
+            keys.extend(strategy.required_indicators())
+    indicators = compute_indicators(data['close'].to_numpy(dtype=float), keys, cache_from_config(config))
+
+    workers = min(workers or os.cpu_count() or 1, len(folds))
+    logger.info(f"Running walk-forward with {len(folds)} folds x {len(combinations)} combinations "
+                f"and {len(indicators)} indicators on {workers} workers")
+
+    shared_data = SharedOHLCV(data)
+    shared_indicators = SharedIndicators(indicators, len(data))
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shared_data.descriptor, shared_indicators.descriptor, config,
+                                           combinations, rank_by, initial_capital)) as pool:
+            results = list(pool.map(_run_fold, folds))
+    finally:
+        shared_data.close()
+        shared_indicators.close()
+
+    # Curva fora da amostra: cada fold começa com o capital final do anterior
+    timestamps = data['timestamp']
+    rows, curves, positions = [], [], []
+    capital = float(initial_capital)
+    for number, ((train_start, train_end, test_start, test_end), result) in enumerate(zip(folds, results)):
+        params, train_score, metrics, equity, position = result
+        curves.append(equity * (capital / initial_capital))
+        positions.append(position)
+        capital = float(curves[-1][-1])
+        rows.append({
+            'fold': number,
+            'train_start': timestamps.iloc[train_start],
+            'train_end': timestamps.iloc[train_end - 1],
+            'test_start': timestamps.iloc[test_start],
+            'test_end': timestamps.iloc[test_end - 1],
+            **params,
+            f'train_{rank_by}': train_score,
+            **metrics
+        })
+
+    first_test = folds[0][2]
+    equity = np.concatenate(curves)
+    position = np.concatenate(positions)
+    stamps = timestamps.iloc[first_test:].to_numpy()
+    metrics = compute_metrics(equity, position, infer_periods_per_year(stamps, Backtest(config).timeframe))
+
+    return {
+        'folds': pd.DataFrame(rows),
+        'equity_curve': pd.Series(equity, index=pd.DatetimeIndex(stamps), name='equity'),
+        'metrics': metrics
+    }
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtesting import Backtest, run_multi_symbol_backtest
+from src.strategies import MovingAverageCrossover, bar_from_ohlcv, create_strategy
+
+
+def make_data(n=400, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, n))
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=n, freq='5min'),
+        'open': close,
+        'high': close * 1.002,
+        'low': close * 0.998,
+        'close': close,
+        'volume': np.full(n, 1000.0),
+    })
+
+
+class PerBarOnly:
+    """Expõe apenas o protocolo antigo generate_signal."""
+
+    def __init__(self, strategy):
+        self.strategy = strategy
+
+    def generate_signal(self, data):
+        return self.strategy.generate_signal(data)
+
+
+class StreamingOnly:
+    """Expõe apenas o protocolo incremental on_bar."""
+
+    def __init__(self, strategy):
+        self.strategy = strategy
+
+    def reset(self):
+        self.strategy.reset()
+
+    def on_bar(self, bar):
+        return self.strategy.on_bar(bar)
+
+
+def test_vectorized_matches_per_bar_path():
+    data = make_data()
+    strategy = MovingAverageCrossover(fast_period=5, slow_period=13)
+    backtest = Backtest({})
+
+    vectorized = backtest.apply_strategy(data, strategy)
+    per_bar = backtest.apply_strategy(data, PerBarOnly(strategy))
+
+    assert len(vectorized) > 0
+    assert len(vectorized) == len(per_bar)
+    for fast, slow in zip(vectorized, per_bar):
+        assert fast['entry_time'] == slow['entry_time']
+        assert fast['exit_time'] == slow['exit_time']
+        assert fast['profit_pct'] == pytest.approx(slow['profit_pct'])
+
+
+def test_streaming_matches_vectorized_path():
+    data = make_data()
+    strategy = MovingAverageCrossover(fast_period=5, slow_period=13)
+    backtest = Backtest({})
+
+    vectorized = backtest.apply_strategy(data, strategy)
+    streaming = backtest.apply_strategy(data, StreamingOnly(strategy))
+
+    assert [t['entry_time'] for t in streaming] == [t['entry_time'] for t in vectorized]
+    assert [t['exit_time'] for t in streaming] == [t['exit_time'] for t in vectorized]
+
+
+def test_on_bar_accepts_live_ohlcv_rows():
+    data = make_data(60)
+    strategy = MovingAverageCrossover(fast_period=5, slow_period=13)
+    rows = [[i * 300000, o, h, l, c, v] for i, (o, h, l, c, v) in enumerate(
+        data[['open', 'high', 'low', 'close', 'volume']].itertuples(index=False))]
+
+    live = [strategy.on_bar(bar_from_ohlcv(row)) for row in rows]
+    expected = MovingAverageCrossover(5, 13).generate_signals(data)
+
+    assert [s == 'BUY' for s in live] == (expected == 1).tolist()
+    assert [s == 'SELL' for s in live] == (expected == -1).tolist()
+
+
+def test_create_strategy_from_config():
+    strategy = create_strategy({'strategy': {'type': 'moving_average_crossover',
+                                             'fast_period': 9, 'slow_period': 21}})
+    assert isinstance(strategy, MovingAverageCrossover)
+    assert (strategy.fast_period, strategy.slow_period) == (9, 21)
+
+    with pytest.raises(ValueError):
+        create_strategy({'strategy': {'type': 'unknown'}})
+
+
+class FakeProvider:
+    def __init__(self):
+        self.seeds = {'SOL/USDT': 1, 'MATIC/USDT': 2, 'AVAX/USDT': 3}
+
+    def get_historical_data(self, symbol, from_date, to_date):
+        return make_data(1000, seed=self.seeds[symbol])
+
+
+def test_multi_symbol_backtest_matches_single_runs():
+    config = {'trading': {'pairs': ['SOL/USDT', 'MATIC/USDT', 'AVAX/USDT']}}
+    strategy = MovingAverageCrossover(fast_period=5, slow_period=13)
+    provider = FakeProvider()
+
+    results = run_multi_symbol_backtest(config, strategy, None, None, initial_capital=3000,
+                                        max_workers=2, data_provider=provider)
+
+    assert set(results['per_symbol']) == set(config['trading']['pairs'])
+    single = Backtest(config, provider).run(strategy, 'AVAX/USDT', None, None, initial_capital=1000)
+    assert results['per_symbol']['AVAX/USDT']['metrics'] == single['metrics']
+
+    summary = results['summary']
+    assert summary['symbols'] == 3
+    assert summary['total_trades'] == sum(r['metrics']['total_trades'] for r in results['per_symbol'].values())
+    final = sum(r['equity_curve'][-1] for r in results['per_symbol'].values())
+    assert summary['profit_loss'] == pytest.approx((final - 3000) / 3000 * 100)
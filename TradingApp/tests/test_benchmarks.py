@@ -0,0 +1,31 @@
+import json
+import os
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SUITE = os.path.join(APP_DIR, 'benchmarks', 'bench_suite.py')
+
+
+def run_suite(*args):
+    return subprocess.run([sys.executable, SUITE, '--profile', 'quick', '--repeat', '1', *args],
+                          capture_output=True, text=True, cwd=APP_DIR)
+
+
+def test_suite_saves_baseline_and_flags_regressions(tmp_path):
+    baseline = tmp_path / 'baseline.json'
+    saved = run_suite('--save-baseline', '--baseline', str(baseline), 'apply_strategy', 'calculate_metrics')
+    assert saved.returncode == 0, saved.stderr
+
+    stored = json.loads(baseline.read_text())
+    assert set(stored['results']) == {'apply_strategy:1000', 'apply_strategy:10000',
+                                      'calculate_metrics:100', 'calculate_metrics:1000'}
+    assert all(result['throughput'] > 0 and result['peak_mb'] is not None for result in stored['results'].values())
+
+    # Uma linha de base impossível de alcançar precisa falhar
+    for result in stored['results'].values():
+        result['throughput'] *= 1000
+    baseline.write_text(json.dumps(stored))
+    compared = run_suite('--baseline', str(baseline), '--no-memory', 'apply_strategy')
+    assert compared.returncode == 1
+    assert 'REGRESSION: apply_strategy:1000 throughput' in compared.stdout
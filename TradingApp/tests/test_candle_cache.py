@@ -0,0 +1,81 @@
+import asyncio
+
+import numpy as np
+
+from src.candle_cache import CandleCache, OHLCVRingBuffer
+from src.exchange_simulator import AsyncExchangeSimulator
+from src.market_data import AsyncMarketData
+from tests.test_backtest import make_data
+
+STEP = 5 * 60 * 1000
+
+
+def rows(start, count):
+    return [[(start + i) * STEP, i, i + 1, i - 1, i + 0.5, 10 * i] for i in range(count)]
+
+
+def test_ring_buffer_keeps_last_n_as_contiguous_views():
+    buffer = OHLCVRingBuffer(8)
+    data = rows(0, 30)
+    for i in range(0, 30, 3):
+        buffer.extend(data[i:i + 3])
+
+        expected = np.array(data[max(0, i + 3 - 8):i + 3])
+        close = buffer.view('close')
+        assert np.array_equal(buffer.view('timestamp'), expected[:, 0].astype(np.int64))
+        assert np.array_equal(close, expected[:, 4])
+        assert close.flags.c_contiguous
+        assert np.shares_memory(close, buffer._values)
+
+    assert len(buffer) == 8
+    assert buffer.last_timestamp == 29 * STEP
+
+
+def test_in_progress_candle_is_replaced_and_stale_rows_ignored():
+    buffer = OHLCVRingBuffer(4)
+    buffer.extend(rows(0, 5))
+    assert buffer.append([4 * STEP, 4, 9, 1, 7.5, 99])
+    assert not buffer.append([1 * STEP, 0, 0, 0, 0, 0])
+
+    assert buffer.view('close').tolist() == [1.5, 2.5, 3.5, 7.5]
+    assert buffer.view('high')[-1] == 9
+    assert buffer.to_frame()['timestamp'].iloc[-1].value // 1_000_000 == 4 * STEP
+
+
+def test_update_does_not_allocate_new_storage():
+    buffer = OHLCVRingBuffer(16)
+    buffer.extend(rows(0, 16))
+    storage = buffer._values.__array_interface__['data'][0]
+    for i in range(16, 100):
+        buffer.append(rows(i, 1)[0])
+    assert buffer._values.__array_interface__['data'][0] == storage
+
+
+def test_warmup_then_refresh_fetches_only_new_bars():
+    symbols = ['SOL/USDT', 'MATIC/USDT', 'AVAX/USDT']
+    data = make_data(300)
+    now = [data['timestamp'].iloc[199].timestamp() + 60]
+    exchange = AsyncExchangeSimulator(ohlcv={symbol: data for symbol in symbols}, clock=lambda: now[0])
+    cache = CandleCache(symbols, '5m', capacity=100, clock=lambda: now[0])
+    limits = []
+    original = exchange.simulator.fetch_ohlcv
+
+    def fetch_ohlcv(symbol, timeframe='5m', since=None, limit=None, params=None):
+        limits.append(limit)
+        return original(symbol, timeframe, since, limit, params)
+
+    exchange.simulator.fetch_ohlcv = fetch_ohlcv
+
+    async def run():
+        market_data = AsyncMarketData(exchange=exchange)
+        loaded = await cache.warmup(market_data)
+        now[0] += 3 * 300
+        refreshed = await cache.refresh(market_data)
+        return loaded, refreshed
+
+    loaded, refreshed = asyncio.run(run())
+    assert loaded == 300
+    assert limits[3:] == [4, 4, 4]
+    assert refreshed == 12  # o último candle da carga inicial foi atualizado
+    close = cache.buffer('AVAX/USDT', '5m').view('close')
+    assert np.array_equal(close, data['close'].to_numpy()[103:203])
@@ -0,0 +1,8 @@
+from src.config import load_config, save_config
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    config = {'trading': {'timeframe': '5m'}, 'risk': {'stop_loss_pct': 2.0, 'take_profit_pct': None}}
+    path = tmp_path / 'config.json'
+    save_config(config, path)
+    assert load_config(path) == config
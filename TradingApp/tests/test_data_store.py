@@ -0,0 +1,72 @@
+from datetime import datetime
+
+import numpy as np
+
+from src.backtesting import Backtest
+from src.data_store import OHLCVStore
+from tests.test_backtest import make_data
+
+
+def test_append_and_range_read(tmp_path):
+    store = OHLCVStore(tmp_path)
+    data = make_data(100)
+
+    assert store.update('SOL/USDT', '5m', data.iloc[:60]) == 60
+    assert store.update('SOL/USDT', '5m', data.iloc[60:]) == 40
+
+    window = store.read('SOL/USDT', '5m', data['timestamp'].iloc[10], data['timestamp'].iloc[19])
+    assert len(window) == 10
+    np.testing.assert_array_equal(window['close'].to_numpy(), data['close'].to_numpy()[10:20])
+    assert (window['timestamp'].to_numpy() == data['timestamp'].to_numpy()[10:20]).all()
+
+    arrays = store.read_arrays('SOL/USDT', '5m')
+    assert isinstance(arrays['close'], np.memmap)
+
+
+def test_overlapping_update_keeps_stored_candles(tmp_path):
+    store = OHLCVStore(tmp_path)
+    data = make_data(100)
+    store.update('SOL/USDT', '5m', data.iloc[50:])
+
+    changed = data.copy()
+    changed['close'] = -1.0
+    assert store.update('SOL/USDT', '5m', changed) == 50
+
+    stored = store.read('SOL/USDT', '5m')
+    assert len(stored) == 100
+    assert (stored['close'].to_numpy()[:50] == -1.0).all()
+    np.testing.assert_array_equal(stored['close'].to_numpy()[50:], data['close'].to_numpy()[50:])
+
+
+def test_backtest_reuses_store_for_overlapping_ranges(tmp_path):
+    backtest = Backtest({'backtest': {'data_dir': str(tmp_path)}})
+    full = backtest.load_historical_data('SOL/USDT', datetime(2024, 1, 1), datetime(2024, 3, 31))
+    inner = backtest.load_historical_data('SOL/USDT', datetime(2024, 2, 1), datetime(2024, 2, 29))
+
+    assert len(inner) == 29
+    np.testing.assert_array_equal(inner['close'].to_numpy(), full['close'].to_numpy()[31:60])
+    assert [p.name for p in tmp_path.iterdir()] == ['SOL_USDT']
+
+
+def test_gap_between_stored_ranges_is_fetched(tmp_path):
+    backtest = Backtest({'backtest': {'data_dir': str(tmp_path)}})
+    backtest.load_historical_data('SOL/USDT', datetime(2024, 1, 1), datetime(2024, 1, 31))
+    backtest.load_historical_data('SOL/USDT', datetime(2024, 3, 1), datetime(2024, 3, 31))
+    assert not backtest.store.covers('SOL/USDT', '1d', datetime(2024, 2, 1), datetime(2024, 2, 29))
+    assert not backtest.store.covers('SOL/USDT', '1d', datetime(2024, 1, 15), datetime(2024, 3, 15))
+
+    february = backtest.load_historical_data('SOL/USDT', datetime(2024, 2, 1), datetime(2024, 2, 29))
+    assert len(february) == 29
+    assert len(backtest.store.read('SOL/USDT', '1d')) == 91
+    assert backtest.store.covers('SOL/USDT', '1d', datetime(2024, 1, 15), datetime(2024, 3, 15))
+
+
+def test_missing_exchange_candles_still_covered(tmp_path):
+    store = OHLCVStore(tmp_path)
+    data = make_data(300)
+    # Pouco mais de uma hora de manutenção (15 candles de 5m) faltando na exchange
+    store.update('SOL/USDT', '5m', data.drop(index=range(100, 115)))
+
+    first, last = data['timestamp'].iloc[10], data['timestamp'].iloc[290]
+    assert store.covers('SOL/USDT', '5m', first, last)
+    assert not OHLCVStore(tmp_path, max_gap_bars=6).covers('SOL/USDT', '5m', first, last)
@@ -0,0 +1,123 @@
+import asyncio
+import random
+import time
+
+import pytest
+
+from src.exchange_simulator import (AsyncExchangeSimulator, ExchangeSimulator, InsufficientFunds, InvalidOrder,
+                                    OrderNotFound)
+from src.market_data import AsyncMarketData
+from tests.test_backtest import make_data
+
+
+def make_exchange(**kwargs):
+    exchange = ExchangeSimulator(balances={'USDT': 10000.0, 'SOL': 50.0}, maker_fee=0.001, taker_fee=0.002, **kwargs)
+    exchange.deposit({'USDT': 10000.0, 'SOL': 50.0}, account='other')
+    return exchange
+
+
+def test_price_time_priority_and_partial_fills():
+    exchange = make_exchange()
+    first = exchange.create_order('SOL/USDT', 'limit', 'sell', 2.0, 101.0, {'account': 'other'})
+    second = exchange.create_order('SOL/USDT', 'limit', 'sell', 2.0, 101.0)
+    better = exchange.create_order('SOL/USDT', 'limit', 'sell', 1.0, 100.5, {'account': 'other'})
+
+    buy = exchange.create_order('SOL/USDT', 'limit', 'buy', 2.5, 101.0)
+
+    assert buy['status'] == 'closed'
+    assert buy['filled'] == 2.5
+    assert buy['average'] == pytest.approx((100.5 + 1.5 * 101.0) / 2.5)
+    # Melhor preço primeiro; no mesmo preço, a ordem mais antiga
+    assert exchange.fetch_order(better['id'])['status'] == 'closed'
+    assert exchange.fetch_order(first['id'])['remaining'] == pytest.approx(0.5)
+    assert exchange.fetch_order(second['id'])['filled'] == 0
+    assert exchange.fetch_order_book('SOL/USDT')['asks'] == [[101.0, pytest.approx(2.5)]]
+
+
+def test_balances_fees_and_cancel():
+    exchange = make_exchange()
+    order = exchange.create_order('SOL/USDT', 'limit', 'buy', 10.0, 100.0)
+    balance = exchange.fetch_balance()
+    assert balance['used']['USDT'] == pytest.approx(10.0 * 100.0 * 1.002)
+
+    exchange.create_order('SOL/USDT', 'market', 'sell', 4.0, params={'account': 'other'})
+    canceled = exchange.cancel_order(order['id'])
+    assert canceled['status'] == 'canceled'
+    assert canceled['filled'] == 4.0
+
+    # Comprador pagou a taxa maker, vendedor a taker, e nada ficou reservado
+    balance = exchange.fetch_balance()
+    assert balance['USDT']['total'] == pytest.approx(10000 - 400 * 1.001)
+    assert balance['USDT']['used'] == pytest.approx(0)
+    assert balance['SOL']['total'] == 54.0
+    other = exchange.fetch_balance({'account': 'other'})
+    assert other['USDT']['total'] == pytest.approx(10000 + 400 * 0.998)
+
+    with pytest.raises(OrderNotFound):
+        exchange.cancel_order(order['id'])
+    with pytest.raises(InsufficientFunds):
+        exchange.create_order('SOL/USDT', 'limit', 'buy', 1000.0, 100.0)
+    with pytest.raises(InvalidOrder):
+        exchange.create_order('SOL/USDT', 'limit', 'buy', 1.0)
+
+
+def test_market_orders_walk_the_book_within_budget():
+    exchange = ExchangeSimulator(balances={'USDT': 1000.0}, taker_fee=0.0)
+    exchange.quote_around('SOL/USDT', 100.0, levels=5, size=2.0, spread_bps=10, step_bps=10)
+
+    order = exchange.create_order('SOL/USDT', 'market', 'buy', 100.0)
+
+    # O saldo acaba antes da quantidade pedida: o restante é cancelado
+    assert order['status'] == 'closed'
+    assert order['cost'] == pytest.approx(1000.0)
+    assert order['filled'] < 100.0
+    assert exchange.fetch_balance()['USDT']['free'] == pytest.approx(0.0)
+    assert exchange.stats()['avg_slippage_bps'] > 0
+    assert exchange.fetch_ticker('SOL/USDT')['last'] > 100.1
+
+
+def test_fetch_ohlcv_hides_future_candles():
+    data = make_data(100)
+    now = [data['timestamp'].iloc[49].timestamp()]
+    exchange = ExchangeSimulator(ohlcv={'SOL/USDT': data}, clock=lambda: now[0])
+
+    rows = exchange.fetch_ohlcv('SOL/USDT', '5m', limit=10)
+    assert len(rows) == 10
+    assert rows[-1][4] == data['close'].iloc[49]
+    assert exchange.fetch_ohlcv('SOL/USDT', since=rows[0][0], limit=3)[0] == rows[0]
+    assert exchange.fetch_ticker('SOL/USDT')['last'] == data['close'].iloc[-1]
+
+
+def test_async_simulator_latency_overlaps():
+    symbols = ['A/USDT', 'B/USDT', 'C/USDT']
+    exchange = AsyncExchangeSimulator(latency=0.1, ohlcv={symbol: make_data(30) for symbol in symbols},
+                                      clock=lambda: 2e9)
+
+    async def run():
+        async with AsyncMarketData(exchange=exchange) as market_data:
+            return await market_data.poll(symbols, limit=5)
+
+    start = time.perf_counter()
+    snapshot = asyncio.run(run())
+    assert time.perf_counter() - start < 0.25
+    assert all(len(rows) == 5 for rows in snapshot['ohlcv'].values())
+
+
+def test_sustains_high_order_rate():
+    exchange = ExchangeSimulator(balances={'USDT': 1e12, 'SOL': 1e9})
+    exchange.quote_around('SOL/USDT', 100.0, levels=20, size=5.0)
+    rng = random.Random(1)
+
+    start = time.perf_counter()
+    for _ in range(20000):
+        side = rng.choice(('buy', 'sell'))
+        if rng.random() < 0.1:
+            exchange.create_order('SOL/USDT', 'market', side, rng.uniform(0.1, 2.0))
+        else:
+            exchange.create_order('SOL/USDT', 'limit', side, rng.uniform(0.1, 2.0), round(100 + rng.gauss(0, 0.3), 2))
+    elapsed = time.perf_counter() - start
+
+    stats = exchange.stats()
+    assert stats['orders'] == 20040
+    assert stats['trades'] > 0
+    assert 20000 / elapsed > 5000
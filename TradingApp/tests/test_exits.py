@@ -0,0 +1,96 @@
+import time
+
+import numpy as np
+import pytest
+
+from src.backtesting import Backtest
+from src.exits import resolve_touch, simulate_exits
+from src.strategies import MovingAverageCrossover
+from tests.test_backtest import make_data
+
+
+def bars(rows):
+    """Linhas (open, high, low, close) -> arrays."""
+    return [np.array(column, dtype=float) for column in zip(*rows)]
+
+
+def test_stop_and_target_exit_before_sell_signal():
+    open_, high, low, close = bars([
+        (100, 100, 100, 100),  # BUY no fechamento
+        (100, 101, 99, 100),
+        (100, 100, 97, 98),    # toca o stop de 2% (98)
+        (98, 99, 97, 98),      # BUY de novo
+        (98, 103, 98, 102),    # toca o alvo de 4% (101.92)
+        (102, 102, 101, 101),  # SELL
+    ])
+    signals = np.array([1, 0, 0, 1, 0, -1])
+
+    entries, exits, prices, reasons = simulate_exits(open_, high, low, close, signals, 2.0, 4.0)
+
+    assert entries.tolist() == [0, 3]
+    assert exits.tolist() == [2, 4]
+    assert prices.tolist() == pytest.approx([98.0, 98 * 1.04])
+    assert reasons == ['stop_loss', 'take_profit']
+
+
+def test_both_touched_rules_and_gaps():
+    # Barra toca stop (98) e alvo (104); abertura mais próxima do alvo
+    assert resolve_touch(103, 105, 97, 98, 104, 'stop_first') == ('stop_loss', 98)
+    assert resolve_touch(103, 105, 97, 98, 104, 'target_first') == ('take_profit', 104)
+    assert resolve_touch(103, 105, 97, 98, 104, 'nearest_open') == ('take_profit', 104)
+    assert resolve_touch(99, 105, 97, 98, 104, 'nearest_open') == ('stop_loss', 98)
+    # Gap além do nível: saída na abertura, qualquer que seja a regra
+    assert resolve_touch(95, 106, 94, 98, 104, 'target_first') == ('stop_loss', 95)
+    assert resolve_touch(106, 107, 97, 98, 104, 'stop_first') == ('take_profit', 106)
+
+    with pytest.raises(ValueError):
+        simulate_exits([1.0], [1.0], [1.0], [1.0], [0], 2.0, 4.0, both_touched='random')
+
+
+def test_without_levels_matches_signal_only_trades():
+    data = make_data(2000)
+    strategy = MovingAverageCrossover(fast_period=5, slow_period=13)
+    signals = strategy.generate_signals(data)
+    expected = Backtest({}).apply_strategy(data, strategy)
+
+    columns = [data[col].to_numpy() for col in ('open', 'high', 'low', 'close')]
+    entries, exits, prices, reasons = simulate_exits(*columns, signals)
+
+    assert data['timestamp'].iloc[entries].tolist() == [t['entry_time'] for t in expected]
+    assert data['timestamp'].iloc[exits].tolist() == [t['exit_time'] for t in expected]
+    assert set(reasons) == {'signal'}
+
+
+def test_backtest_uses_risk_config_and_marks_equity_at_exit_price():
+    data = make_data(2000)
+    strategy = MovingAverageCrossover(fast_period=5, slow_period=13)
+    backtest = Backtest({'risk': {'stop_loss_pct': 0.5, 'take_profit_pct': 1.0}})
+
+    trades = backtest.apply_strategy(data, strategy)
+    reasons = {t['exit_reason'] for t in trades}
+    assert {'stop_loss', 'take_profit'} <= reasons
+    for trade in trades:
+        if trade['exit_reason'] == 'stop_loss':
+            assert trade['profit_pct'] <= -0.5 + 1e-9
+        elif trade['exit_reason'] == 'take_profit':
+            assert trade['profit_pct'] >= 1.0 - 1e-9
+
+    # Sem posições sobrepostas no fim, a curva termina no retorno composto dos trades
+    metrics = backtest.calculate_metrics(trades, 10000, data)
+    compounded = 10000 * np.prod([1 + t['profit_pct'] / 100 for t in trades])
+    assert metrics['equity_curve'][-1] == pytest.approx(compounded)
+
+
+def test_cost_is_linear_when_every_bar_reenters():
+    # BUY em todas as barras e um único SELL no fim: cada stop reabre a posição
+    n = 200_000
+    rng = np.random.default_rng(1)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, n))
+    signals = np.ones(n, dtype=np.int8)
+    signals[-1] = -1
+
+    start = time.perf_counter()
+    entries, exits, _, _ = simulate_exits(close, close * 1.01, close * 0.99, close, signals, 1.5, 3.0)
+    assert time.perf_counter() - start < 5.0
+    assert len(entries) > 100
+    assert np.all(entries[1:] >= exits[:-1])
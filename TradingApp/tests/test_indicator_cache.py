@@ -0,0 +1,87 @@
+import numpy as np
+
+from src.backtesting import Backtest
+from src.indicator_cache import IndicatorCache, array_digest
+from src.indicators import compute_indicators, ema, sma
+from src.optimizer import run_sweep
+from src.strategies import MovingAverageCrossover
+from tests.test_backtest import make_data
+
+
+def test_hits_are_content_addressed():
+    cache = IndicatorCache()
+    close = make_data(1000)['close'].to_numpy()
+
+    first = cache.compute(sma, close, 'sma', 21)
+    again = cache.compute(sma, close.copy(), 'sma', 21)
+    other = cache.compute(sma, close, 'sma', 9)
+
+    assert again is first
+    assert not first.flags.writeable
+    assert np.array_equal(first, sma(close, 21), equal_nan=True)
+    assert not np.array_equal(other, first, equal_nan=True)
+    assert array_digest(close) != array_digest(close[:-1])
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 2
+
+
+def test_lru_eviction_respects_byte_budget():
+    close = np.arange(1000, dtype=float)
+    cache = IndicatorCache(max_bytes=2 * close.nbytes)
+
+    cache.compute(sma, close, 'sma', 5)
+    cache.compute(sma, close, 'sma', 10)
+    cache.compute(sma, close, 'sma', 5)   # 5 passa a ser o mais recente
+    cache.compute(sma, close, 'sma', 20)  # descarta 10
+
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['bytes'] <= cache.max_bytes
+    cache.compute(sma, close, 'sma', 5)
+    assert cache.stats()['hits'] == 2
+    cache.compute(sma, close, 'sma', 10)
+    assert cache.stats()['misses'] == 4
+
+
+def test_evicted_results_spill_to_disk_and_are_shared(tmp_path):
+    close = np.linspace(1, 2, 5000)
+    cache = IndicatorCache(max_bytes=close.nbytes, spill_dir=tmp_path)
+    expected = cache.compute(ema, close, 'ema', 9)
+    cache.compute(ema, close, 'ema', 21)
+
+    assert cache.stats()['spills'] == 1
+    assert len(list(tmp_path.glob('*.npy'))) == 1
+
+    # Outro processo/execução com o mesmo diretório lê o arquivo mapeado em memória
+    other = IndicatorCache(max_bytes=close.nbytes, spill_dir=tmp_path)
+    result = other.compute(ema, close, 'ema', 9)
+    assert isinstance(result, np.memmap)
+    assert np.array_equal(result, expected, equal_nan=True)
+    assert other.stats()['disk_hits'] == 1 and other.stats()['misses'] == 0
+    # O tempo de cálculo gravado com o arquivo conta como economizado
+    [seconds_file] = tmp_path.glob('*.seconds')
+    assert other.stats()['saved_seconds'] == float(seconds_file.read_text()) > 0
+
+    # O acerto em disco volta ao LRU: o próximo acerto é em memória
+    assert other.compute(ema, close, 'ema', 9) is result
+    assert other.stats()['disk_hits'] == 1 and other.stats()['hits'] == 1
+
+
+def test_backtest_and_sweep_reuse_indicators():
+    data = make_data(3000, seed=123)
+    strategy = MovingAverageCrossover(fast_period=5, slow_period=13)
+    cache = IndicatorCache()
+    backtest = Backtest({}, indicator_cache=cache)
+
+    first = backtest.apply_strategy(data, strategy)
+    second = backtest.apply_strategy(data, MovingAverageCrossover(fast_period=5, slow_period=21))
+    uncached = Backtest({'backtest': {'indicator_cache': {'enabled': False}}}).apply_strategy(data, strategy)
+
+    assert first == uncached
+    assert len(second) > 0
+    assert cache.stats()['misses'] == 3 and cache.stats()['hits'] == 1
+    assert set(compute_indicators(data['close'], [('sma', 5)], cache)) == {('sma', 5)}
+
+    space = {'fast_period': [5, 9], 'slow_period': [21, 30]}
+    results = run_sweep({}, make_data(3000, seed=321), space, workers=1)
+    usage = results.attrs['indicator_cache']
+    assert usage['misses'] == 4 and usage['hits'] == 4
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.indicators import ATR, EMA, MACD, RSI, SMA, WMA, Bollinger, atr, bollinger, ema, macd, rsi, sma, wma
+from tests.test_backtest import make_data
+
+
+@pytest.fixture(scope='module')
+def prices():
+    data = make_data(2000, seed=11)
+    rng = np.random.default_rng(3)
+    # Máximas e mínimas com ruído para que o true range não seja só high - low
+    data['high'] = data['close'] * (1 + rng.uniform(0, 0.01, len(data)))
+    data['low'] = data['close'] * (1 - rng.uniform(0, 0.01, len(data)))
+    return data
+
+
+def stream(indicator, *columns):
+    return np.array([indicator.update(*row) for row in zip(*(np.asarray(c).tolist() for c in columns))])
+
+
+@pytest.mark.parametrize('streaming, batch', [
+    (lambda: SMA(21), lambda c: sma(c, 21)),
+    (lambda: EMA(9), lambda c: ema(c, 9)),
+    (lambda: WMA(14), lambda c: wma(c, 14)),
+    (lambda: RSI(14), lambda c: rsi(c, 14)),
+])
+def test_streaming_matches_batch_bit_for_bit(prices, streaming, batch):
+    close = prices['close'].to_numpy()
+    expected = batch(close)
+    result = stream(streaming(), close)
+    assert np.array_equal(result, expected, equal_nan=True)
+    assert result.view(np.int64)[~np.isnan(result)].tolist() == expected.view(np.int64)[~np.isnan(expected)].tolist()
+
+
+def test_multi_output_indicators_match_bit_for_bit(prices):
+    close = prices['close'].to_numpy()
+    high, low = prices['high'].to_numpy(), prices['low'].to_numpy()
+
+    assert np.array_equal(stream(ATR(14), high, low, close), atr(high, low, close, 14), equal_nan=True)
+    for streamed, batch in zip(stream(Bollinger(20, 2.0), close).T, bollinger(close, 20, 2.0)):
+        assert np.array_equal(streamed, batch, equal_nan=True)
+    for streamed, batch in zip(stream(MACD(12, 26, 9), close).T, macd(close, 12, 26, 9)):
+        assert np.array_equal(streamed, batch, equal_nan=True)
+
+
+def test_values_match_reference_formulas(prices):
+    close = prices['close']
+    values = close.to_numpy()
+
+    assert np.allclose(sma(values, 21), close.rolling(21).mean(), equal_nan=True, rtol=1e-12)
+    weights = np.arange(1, 15)
+    expected_wma = close.rolling(14).apply(lambda w: np.dot(w, weights) / weights.sum(), raw=True)
+    assert np.allclose(wma(values, 14), expected_wma, equal_nan=True, rtol=1e-12)
+
+    middle, upper, lower = bollinger(values, 20, 2.0)
+    std = close.rolling(20).std(ddof=0)
+    assert np.allclose(upper - middle, 2 * std, equal_nan=True, rtol=1e-6)
+    assert np.allclose(middle - lower, 2 * std, equal_nan=True, rtol=1e-6)
+
+    # EMA semeada com a SMA e recursão padrão
+    expected_ema = pd.Series(np.r_[np.full(8, np.nan), values[:9].mean(), values[9:]]).ewm(
+        alpha=0.2, adjust=False, ignore_na=True).mean()
+    assert np.allclose(ema(values, 9)[8:], expected_ema[8:], rtol=1e-12)
+
+    line, signal, histogram = macd(values)
+    assert np.allclose(line, ema(values, 12) - ema(values, 26), equal_nan=True)
+    assert np.allclose(histogram, line - signal, equal_nan=True)
+    assert np.isnan(line[24]) and not np.isnan(line[25])
+    assert np.isnan(signal[32]) and not np.isnan(signal[33])
+
+
+def test_rsi_and_atr_edge_cases():
+    rising = np.arange(1.0, 31.0)
+    result = rsi(rising, 14)
+    assert np.isnan(result[13]) and result[14] == 100.0
+    assert rsi(np.full(30, 5.0), 14)[-1] == 50.0
+
+    high, low, close = np.full(20, 11.0), np.full(20, 9.0), np.full(20, 10.0)
+    assert atr(high, low, close, 5)[4] == 2.0
+    assert np.isnan(atr(high, low, close, 5)[3])
+
+    with pytest.raises(ValueError):
+        SMA(0)
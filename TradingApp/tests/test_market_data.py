@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+from src.market_data import AsyncMarketData, run_polling_loop
+
+
+class FakeExchange:
+    """Exchange assíncrona falsa com latência configurável por símbolo."""
+
+    def __init__(self, latency=0.1, slow=None, failing=()):
+        self.latency = latency
+        self.slow = slow or {}
+        self.failing = set(failing)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.closed = False
+
+    async def _respond(self, symbol, value):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.slow.get(symbol, self.latency))
+            if symbol in self.failing:
+                raise ConnectionError(f"{symbol} unavailable")
+            return value
+        finally:
+            self.in_flight -= 1
+
+    async def fetch_ohlcv(self, symbol, timeframe='5m', limit=100):
+        return await self._respond(symbol, [[0, 1.0, 2.0, 0.5, 1.5, 10.0]] * limit)
+
+    async def fetch_ticker(self, symbol):
+        return await self._respond(symbol, {'symbol': symbol, 'last': 1.5})
+
+    async def close(self):
+        self.closed = True
+
+
+SYMBOLS = [f'COIN{i}/USDT' for i in range(10)]
+
+
+def test_poll_fetches_symbols_concurrently():
+    exchange = FakeExchange(latency=0.1)
+    market_data = AsyncMarketData(exchange=exchange)
+
+    start = time.perf_counter()
+    snapshot = asyncio.run(market_data.poll(SYMBOLS, limit=3, tickers=True))
+
+    # Dez símbolos (OHLCV + ticker) em pouco mais que a latência de uma requisição
+    assert time.perf_counter() - start < 0.5
+    assert exchange.max_in_flight == 2 * len(SYMBOLS)
+    assert sorted(snapshot['ohlcv']) == sorted(SYMBOLS)
+    assert len(snapshot['ohlcv']['COIN0/USDT']) == 3
+    assert snapshot['tickers']['COIN9/USDT']['last'] == 1.5
+    assert snapshot['errors'] == {}
+
+
+def test_slow_or_failing_symbols_do_not_block_others():
+    exchange = FakeExchange(latency=0.01, slow={'COIN1/USDT': 5.0}, failing={'COIN2/USDT'})
+    market_data = AsyncMarketData(exchange=exchange, timeout=0.2)
+
+    snapshot = asyncio.run(market_data.poll(SYMBOLS[:4]))
+
+    assert snapshot['elapsed'] < 1.0
+    assert sorted(snapshot['ohlcv']) == ['COIN0/USDT', 'COIN3/USDT']
+    assert isinstance(snapshot['errors']['COIN1/USDT'], TimeoutError)
+    assert isinstance(snapshot['errors']['COIN2/USDT'], ConnectionError)
+
+
+def test_concurrency_limit_and_injected_exchange_is_not_closed():
+    exchange = FakeExchange(latency=0.02)
+
+    async def run():
+        async with AsyncMarketData(exchange=exchange, max_concurrency=3) as market_data:
+            return await market_data.poll(SYMBOLS)
+
+    snapshot = asyncio.run(run())
+    assert len(snapshot['ohlcv']) == len(SYMBOLS)
+    assert exchange.max_in_flight == 3
+    assert not exchange.closed
+
+
+def test_concurrency_limit_is_created_in_the_running_loop():
+    # Construída fora de qualquer loop e usada em dois asyncio.run seguidos
+    exchange = FakeExchange(latency=0.01)
+    market_data = AsyncMarketData(exchange=exchange, max_concurrency=2)
+
+    for _ in range(2):
+        snapshot = asyncio.run(market_data.poll(SYMBOLS))
+        assert len(snapshot['ohlcv']) == len(SYMBOLS)
+    assert exchange.max_in_flight == 2
+
+
+def test_polling_loop_delivers_each_cycle():
+    market_data = AsyncMarketData(exchange=FakeExchange(latency=0.01))
+    snapshots = []
+
+    cycles = asyncio.run(run_polling_loop(market_data, SYMBOLS[:2], snapshots.append, interval=0.02,
+                                          max_cycles=3))
+
+    assert cycles == 3
+    assert all(sorted(s['ohlcv']) == SYMBOLS[:2] for s in snapshots)
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from src.backtesting import Backtest
+from src.metrics import compute_metrics, equity_curve, max_drawdown_stats, position_from_trades
+from src.strategies import MovingAverageCrossover
+from tests.test_backtest import make_data
+
+
+def test_drawdown_stats():
+    equity = np.array([100, 110, 99, 105, 110, 120, 90, 95])
+    max_drawdown, duration = max_drawdown_stats(equity)
+    assert max_drawdown == pytest.approx(25.0)
+    assert duration == 2
+
+
+def test_position_and_equity_curve():
+    close = np.array([10.0, 11.0, 12.0, 6.0, 6.0])
+    timestamps = np.arange(5).astype('datetime64[D]')
+    trades = [{'entry_time': timestamps[1], 'exit_time': timestamps[3]}]
+
+    position = position_from_trades(timestamps, trades)
+    np.testing.assert_array_equal(position, [0, 1, 1, 0, 0])
+    np.testing.assert_allclose(equity_curve(close, position, 1100), [1100, 1100, 1200, 600, 600])
+
+
+def test_bar_level_metrics_agree_with_trade_compounding():
+    data = make_data(3000)
+    backtest = Backtest({})
+    trades = backtest.apply_strategy(data, MovingAverageCrossover(5, 13))
+
+    bar_level = backtest.calculate_metrics(trades, 10000, data)
+    trade_level = backtest.calculate_metrics(trades, 10000)
+
+    assert bar_level['profit_loss'] == pytest.approx(trade_level['profit_loss'])
+    assert bar_level['max_drawdown'] >= trade_level['max_drawdown'] - 1e-9
+    assert 0 < bar_level['exposure'] < 100
+    assert {'sortino_ratio', 'calmar_ratio', 'max_drawdown_duration', 'turnover'} <= set(bar_level)
+
+
+def test_sharpe_is_annualized_by_bars_per_year():
+    rng = np.random.default_rng(1)
+    equity = 100 * np.cumprod(1 + rng.normal(0.001, 0.01, 1000))
+    position = np.ones(1000, dtype=np.int8)
+
+    daily = compute_metrics(equity, position, 365, risk_free_rate=0)
+    five_minutes = compute_metrics(equity, position, 105120, risk_free_rate=0)
+    assert five_minutes['sharpe_ratio'] == pytest.approx(daily['sharpe_ratio'] * np.sqrt(105120 / 365))
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from src.backtesting import Backtest
+from src.monte_carlo import monte_carlo
+from src.strategies import MovingAverageCrossover
+from tests.test_backtest import make_data
+
+
+@pytest.fixture(scope='module')
+def trades():
+    backtest = Backtest({'risk': {'stop_loss_pct': 1.0, 'take_profit_pct': 2.0}})
+    return backtest.apply_strategy(make_data(5000), MovingAverageCrossover(fast_period=5, slow_period=13))
+
+
+def test_shuffle_keeps_final_return_and_spreads_drawdown(trades):
+    result = monte_carlo(trades, simulations=2000, method='shuffle', seed=1)
+    metrics = Backtest({}).calculate_metrics(trades)
+
+    assert result['trades'] == len(trades)
+    assert result['original_return'] == pytest.approx(metrics['profit_loss'])
+    assert result['original_max_drawdown'] == pytest.approx(metrics['max_drawdown'])
+    # Reordenar não muda o produto dos retornos
+    assert all(v == pytest.approx(metrics['profit_loss']) for v in result['final_return'].values())
+    drawdowns = list(result['max_drawdown'].values())
+    assert drawdowns == sorted(drawdowns) and drawdowns[0] < drawdowns[-1]
+    assert drawdowns[0] <= result['original_max_drawdown'] * 1.5
+
+
+def test_chunking_bounds_memory_without_changing_distribution(trades):
+    whole = monte_carlo(trades, simulations=20000, seed=3)
+    chunked = monte_carlo(trades, simulations=20000, seed=3, max_bytes=len(trades) * 16 * 7)
+
+    for key in ('final_return', 'max_drawdown'):
+        for p in (5, 50, 95):
+            assert chunked[key][p] == pytest.approx(whole[key][p], rel=0.05, abs=0.5)
+    assert monte_carlo(trades, simulations=500, seed=9) == monte_carlo(trades, simulations=500, seed=9)
+
+
+@pytest.mark.parametrize('method', ['bootstrap', 'shuffle'])
+def test_chunk_peak_memory_stays_within_budget(method):
+    import tracemalloc
+
+    returns = np.random.default_rng(0).normal(0.1, 1.0, 1000)
+    budget = 4 * 1024 * 1024
+    tracemalloc.start()
+    try:
+        monte_carlo(returns, simulations=5000, method=method, max_bytes=budget, seed=1)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak <= budget
+
+
+def test_risk_of_ruin_and_probability_of_loss():
+    losing = monte_carlo([-10.0] * 10, simulations=100, seed=0)
+    assert losing['risk_of_ruin'] == 100.0
+    assert losing['probability_of_loss'] == 100.0
+    assert losing['max_drawdown'][50] == pytest.approx((1 - 0.9 ** 10) * 100)
+
+    winning = monte_carlo([1.0, 2.0, 0.5], simulations=100, seed=0)
+    assert winning['risk_of_ruin'] == 0.0
+    assert winning['max_drawdown'][95] == 0.0
+
+    mixed = monte_carlo(np.r_[np.full(5, -30.0), np.full(5, 40.0)], simulations=5000, ruin_pct=60, seed=0)
+    assert 0 < mixed['risk_of_ruin'] < 100
+
+    with pytest.raises(ValueError):
+        monte_carlo([], simulations=10)
+    with pytest.raises(ValueError):
+        monte_carlo([1.0], method='jackknife')
@@ -0,0 +1,50 @@
+import pytest
+
+from src.optimizer import apply_parameters, grid_search_space, random_search_space, run_sweep
+from tests.test_backtest import make_data
+
+CONFIG = {
+    'risk': {'stop_loss_pct': 2.0, 'take_profit_pct': 4.0},
+    'strategy': {'type': 'moving_average_crossover', 'fast_period': 9, 'slow_period': 21},
+}
+
+
+def test_search_spaces():
+    space = {'fast_period': [5, 9], 'slow_period': [21, 30, 50]}
+    assert len(grid_search_space(space)) == 6
+    sample = random_search_space(space, 4, seed=1)
+    assert len(sample) == 4
+    assert sample == random_search_space(space, 4, seed=1)
+
+    # Combinações inválidas saem da grade antes do sorteio
+    space = {'fast_period': [5, 9, 21, 30, 50], 'slow_period': [9, 21, 30]}
+    assert all(p['fast_period'] < p['slow_period'] for p in random_search_space(space, 6, seed=2))
+    assert len(random_search_space(space, 6, seed=2)) == 6
+
+    # Espaços enormes são amostrados sem montar a grade
+    huge = {f'p{i}': list(range(10)) for i in range(9)}
+    sample = random_search_space(huge, 50, seed=3)
+    assert len(sample) == 50 == len({tuple(p.values()) for p in sample})
+    assert list(sample[0]) == list(huge)
+
+
+def test_apply_parameters_routes_sections():
+    config = apply_parameters(CONFIG, {'fast_period': 5, 'stop_loss_pct': 1.0})
+    assert config['strategy']['fast_period'] == 5
+    assert config['risk']['stop_loss_pct'] == 1.0
+    assert CONFIG['strategy']['fast_period'] == 9
+
+    # Parâmetros de risco vão para "risk" mesmo sem a seção na configuração base
+    config = apply_parameters({'strategy': {'type': 'moving_average_crossover'}}, {'take_profit_pct': 3.0})
+    assert config['risk'] == {'take_profit_pct': 3.0}
+    assert 'take_profit_pct' not in config['strategy']
+
+
+def test_run_sweep_ranks_results():
+    space = {'fast_period': [5, 9, 30], 'slow_period': [21, 30]}
+    results = run_sweep(CONFIG, make_data(2000), space, workers=2)
+
+    # Combinações com fast_period >= slow_period são descartadas
+    assert len(results) == 4
+    assert results['sharpe_ratio'].is_monotonic_decreasing
+    assert {'total_trades', 'win_rate', 'profit_loss', 'max_drawdown'} <= set(results.columns)
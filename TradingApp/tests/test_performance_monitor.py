@@ -0,0 +1,312 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from src.performance_monitor import AsyncTradeWriter, PerformanceMonitor, TradeJournal
+
+
+def sell(symbol, profit, timestamp):
+    return {'type': 'sell', 'symbol': symbol, 'profit': profit, 'timestamp': timestamp}
+
+
+def test_journal_appends_and_reads_in_order(tmp_path):
+    journal = TradeJournal(str(tmp_path / 'trades.db'))
+    journal.append(sell('SOL/USDT', 1.0, '2024-01-01T10:00:00'))
+    journal.append_many([sell('AVAX/USDT', -0.5, '2024-01-01T11:00:00'),
+                         sell('SOL/USDT', 2.0, '2024-01-02T09:00:00')])
+
+    assert journal.count() == 3
+    assert [t['profit'] for t in journal.read_all()] == [1.0, -0.5, 2.0]
+
+
+def test_monitor_migrates_legacy_json(tmp_path):
+    legacy = [sell('SOL/USDT', 1.0, '2024-01-01T10:00:00'), sell('AVAX/USDT', -2.0, '2024-01-01T11:00:00')]
+    with open(tmp_path / 'trades.json', 'w') as f:
+        json.dump(legacy, f)
+
+    monitor = PerformanceMonitor(str(tmp_path))
+    monitor.record_trade(sell('SOL/USDT', 3.0, '2024-01-02T10:00:00'))
+
+    assert not os.path.exists(tmp_path / 'trades.json')
+    assert os.path.exists(tmp_path / 'trades.json.migrated')
+    assert [t['profit'] for t in monitor.journal.read_all()] == [1.0, -2.0, 3.0]
+
+    monitor.flush()
+    with open(monitor.performance_file) as f:
+        performance = json.load(f)
+    assert performance['total_trades'] == 3
+    assert performance['total_profit'] == 2.0
+
+
+def test_aggregates_match_full_recompute(tmp_path):
+    monitor = PerformanceMonitor(str(tmp_path))
+    monitor.record_trade({'type': 'session_start', 'initial_capital': 300, 'timestamp': '2024-01-01T00:00:00'})
+    trades = [
+        sell('SOL/USDT', 1.5, '2024-01-01T10:00:00'),
+        sell('AVAX/USDT', -0.5, '2024-01-01T11:00:00'),
+        sell('SOL/USDT', -1.0, '2024-01-02T09:00:00'),
+        sell('MATIC/USDT', 4.0, '2024-01-03T09:00:00'),
+    ]
+    for trade in trades:
+        monitor.record_trade(trade)
+
+    performance = monitor.get_performance()
+    assert performance['start_capital'] == 300
+    assert performance['total_trades'] == 4
+    assert performance['winning_trades'] == 2
+    assert performance['total_profit'] == 4.0
+    assert performance['current_capital'] == 304.0
+    assert performance['daily_returns'] == [{'date': '2024-01-01', 'return': 1.0},
+                                            {'date': '2024-01-02', 'return': -1.0},
+                                            {'date': '2024-01-03', 'return': 4.0}]
+    assert performance['best_trade'] == {'symbol': 'MATIC/USDT', 'profit': 4.0}
+    assert performance['worst_trade'] == {'symbol': 'SOL/USDT', 'profit': -1.0}
+
+    stats = monitor.journal.symbol_stats()
+    assert stats['SOL/USDT']['total_trades'] == 2
+    assert stats['SOL/USDT']['best_trade'] == 1.5
+    assert stats['SOL/USDT']['average_profit'] == 0.25
+
+    # Reabrir o diário e reconstruir os agregados chega ao mesmo resultado
+    monitor.journal.rebuild_aggregates()
+    assert monitor.get_performance() == performance
+    with open(monitor.performance_file) as f:
+        assert json.load(f)['total_profit'] == 4.0
+
+
+def test_async_writer_batches_and_flushes_on_close(tmp_path):
+    monitor = PerformanceMonitor(str(tmp_path), async_writes=True, flush_interval=0.05, batch_size=100)
+    for i in range(1000):
+        monitor.record_trade(sell('SOL/USDT', 1.0 if i % 2 else -1.0, f'2024-01-01T10:{i // 60:02d}:{i % 60:02d}'))
+
+    monitor.close()
+    stats = monitor.get_writer_stats()
+    assert stats['records_written'] == 1000
+    assert stats['queue_depth'] == 0
+    assert 10 <= stats['flushes'] < 1000
+    assert stats['max_flush_latency_ms'] >= stats['avg_flush_latency_ms'] > 0
+
+    assert monitor.journal.count() == 1000
+    with open(monitor.performance_file) as f:
+        assert json.load(f)['total_trades'] == 1000
+
+
+def test_async_writer_survives_journal_and_metrics_failures(tmp_path):
+    journal = TradeJournal(str(tmp_path / 'trades.db'))
+    append_many = journal.append_many
+    failures = iter([True])
+
+    def flaky_append_many(trades):
+        if next(failures, False):
+            raise OSError("disk busy")
+        append_many(trades)
+
+    def failing_metrics():
+        raise ValueError("bad metrics")
+
+    journal.append_many = flaky_append_many
+    writer = AsyncTradeWriter(journal, on_flush=failing_metrics, flush_interval=0.01)
+    for i in range(5):
+        writer.record(sell('SOL/USDT', 1.0, f'2024-01-01T10:00:{i:02d}'))
+        writer.flush()
+
+    # flush só retorna depois de gravar, e uma falha de métricas não regrava o lote
+    assert journal.count() == 5
+    writer.close()
+    stats = writer.stats()
+    assert journal.count() == 5
+    assert stats['flush_errors'] == 1
+    assert stats['metrics_errors'] == stats['flushes'] == 5
+    assert stats['records_written'] == 5 and stats['records_lost'] == 0
+
+
+def test_async_writer_counts_trades_lost_on_close(tmp_path):
+    journal = TradeJournal(str(tmp_path / 'trades.db'))
+
+    def broken_append_many(trades):
+        raise OSError("disk full")
+
+    journal.append_many = broken_append_many
+    writer = AsyncTradeWriter(journal, flush_interval=10)
+    writer.record(sell('SOL/USDT', 1.0, '2024-01-01T10:00:00'))
+    writer.record(sell('SOL/USDT', 2.0, '2024-01-01T10:00:01'))
+    writer.close()
+
+    assert writer.stats()['records_lost'] == 2
+    assert journal.count() == 0
+
+
+def test_record_after_close_writes_synchronously(tmp_path):
+    monitor = PerformanceMonitor(str(tmp_path), async_writes=True, flush_interval=10)
+    monitor.record_trade(sell('SOL/USDT', 1.0, '2024-01-01T10:00:00'))
+    monitor.close()
+
+    monitor.record_trade(sell('SOL/USDT', 2.0, '2024-01-01T11:00:00'))
+    monitor.flush()
+    monitor.close()
+    assert monitor.journal.count() == 2
+    assert monitor.get_writer_stats()['records_written'] == 2
+
+
+def test_async_reads_see_queued_trades(tmp_path):
+    monitor = PerformanceMonitor(str(tmp_path), async_writes=True, flush_interval=10)
+    monitor.record_trade(sell('SOL/USDT', 2.0, '2024-01-01T10:00:00'))
+
+    assert monitor.get_performance()['total_trades'] == 1
+    monitor.close()
+
+
+def test_date_range_report_uses_only_the_range(tmp_path):
+    from datetime import datetime
+
+    monitor = PerformanceMonitor(str(tmp_path))
+    monitor.record_trade({'type': 'session_start', 'initial_capital': 1000, 'timestamp': '2024-01-01T00:00:00'})
+    for day in range(1, 29):
+        monitor.record_trade(sell('SOL/USDT' if day % 2 else 'AVAX/USDT', float(day), f'2024-02-{day:02d}T12:00:00'))
+
+    report = monitor.generate_performance_report(datetime(2024, 2, 8), datetime(2024, 2, 14))
+
+    assert report['summary']['total_trades'] == 7
+    assert report['summary']['total_profit'] == sum(range(8, 15))
+    assert report['summary']['start_capital'] == 1000 + sum(range(1, 8))
+    assert report['trading_period'] == {'start_date': '2024-02-08', 'end_date': '2024-02-14'}
+    assert report['per_crypto']['SOL/USDT']['total_trades'] == 3
+    assert report['per_crypto']['AVAX/USDT']['total_profit'] == 8 + 10 + 12 + 14
+
+    html = monitor.generate_report(datetime(2024, 2, 8), datetime(2024, 2, 14))
+    assert '2024-02-08 a 2024-02-14' in html
+    assert 'data:image/png;base64' in html
+
+
+def test_range_query_uses_timestamp_index(tmp_path):
+    journal = TradeJournal(str(tmp_path / 'trades.db'))
+    plan = journal._conn.execute(
+        "EXPLAIN QUERY PLAN SELECT data FROM trades WHERE timestamp >= ? AND timestamp < ?",
+        ('2024-01-01', '2024-01-08')).fetchall()
+    assert any('idx_trades_timestamp' in row[-1] for row in plan)
+
+
+def test_single_pass_stats_match_groupby(tmp_path):
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(0)
+    trades = [sell(f'S{rng.integers(200)}/USDT', float(rng.normal()), f'2024-01-01T00:00:{i:06d}')
+              for i in range(20000)]
+
+    totals, per_crypto, (timestamps, profits) = PerformanceMonitor(str(tmp_path))._aggregate_trades(trades)
+
+    expected = pd.DataFrame(trades).groupby('symbol')['profit'].agg(['count', 'sum', 'max', 'min'])
+    assert len(per_crypto) == len(expected)
+    for symbol, row in expected.iterrows():
+        stats = per_crypto[symbol]
+        assert stats['total_trades'] == row['count']
+        assert stats['total_profit'] == pytest.approx(row['sum'])
+        assert (stats['best_trade'], stats['worst_trade']) == (row['max'], row['min'])
+    assert totals['total_trades'] == 20000
+    assert totals['total_profit'] == pytest.approx(sum(t['profit'] for t in trades))
+    assert len(timestamps) == len(profits) == 20000
+
+
+def test_cli_light_commands_do_not_import_heavy_modules():
+    # Processo novo: neste processo pandas já foi importado por outros testes
+    code = ("import sys, cli, src.performance_monitor; "
+            "print(','.join(m for m in ('pandas', 'numpy', 'matplotlib') if m in sys.modules))")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    os.makedirs(os.path.join(root, 'logs'), exist_ok=True)
+    result = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ''
+
+
+def test_cli_status_reads_journal_without_writing(tmp_path, monkeypatch, capsys):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    os.makedirs(os.path.join(root, 'logs'), exist_ok=True)
+    monkeypatch.chdir(root)
+    import cli
+
+    results = tmp_path / 'results'
+    monitor = PerformanceMonitor(str(results))
+    monitor.record_trade(sell('SOL/USDT', 2.0, '2024-01-01T10:00:00'))
+    monitor.journal.close()
+    (results / 'trades.json').write_text('[]')
+    os.remove(results / 'performance.json')
+
+    def files():
+        # -wal/-shm são arquivos auxiliares do próprio SQLite ao ler um diário WAL
+        return sorted(p.name for p in results.iterdir() if not p.name.endswith(('-wal', '-shm')))
+
+    before = files()
+
+    monkeypatch.chdir(tmp_path)
+    cli.check_status()
+    assert 'Trades: 1 ' in capsys.readouterr().out
+    assert files() == before
+
+    # Sem diário, status não cria um
+    os.remove(results / 'trades.db')
+    cli.check_status()
+    assert not (results / 'trades.db').exists()
+
+
+def test_migrate_json_skips_non_empty_journal(tmp_path):
+    json_path = tmp_path / 'trades.json'
+    json_path.write_text(json.dumps([sell('SOL/USDT', 1.0, '2024-01-01T10:00:00')]))
+    journal = TradeJournal(str(tmp_path / 'trades.db'))
+    journal.append(sell('AVAX/USDT', 2.0, '2024-01-02T10:00:00'))
+
+    assert journal.migrate_json(str(json_path)) == 0
+    assert json_path.exists()
+    assert journal.count() == 1
+
+    journal = TradeJournal(str(tmp_path / 'empty.db'))
+    assert journal.migrate_json(str(json_path)) == 1
+    assert not json_path.exists() and (tmp_path / 'trades.json.migrated').exists()
+
+
+def test_report_treats_null_profit_as_zero(tmp_path):
+    monitor = PerformanceMonitor(str(tmp_path))
+    monitor.record_trade(sell('SOL/USDT', 3.0, '2024-01-01T10:00:00'))
+    monitor.record_trade(sell('SOL/USDT', None, '2024-01-01T11:00:00'))
+
+    report = monitor.generate_performance_report()
+    assert report['summary']['total_trades'] == 2
+    assert report['per_crypto']['SOL/USDT']['total_profit'] == 3.0
+    assert report['summary']['total_profit'] == 3.0
+
+
+def test_full_report_uses_journal_aggregates(tmp_path, monkeypatch):
+    monitor = PerformanceMonitor(str(tmp_path))
+    for i, (symbol, profit) in enumerate([('SOL/USDT', 1.5), ('AVAX/USDT', -0.5), ('SOL/USDT', -1.0)]):
+        monitor.record_trade(sell(symbol, profit, f'2024-01-0{i + 1}T10:00:00'))
+    expected = monitor._aggregate_trades(monitor.journal.read_range(trade_type='sell'))[1]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("full history rescanned")
+
+    monkeypatch.setattr(monitor.journal, 'read_range', fail)
+    monkeypatch.setattr(monitor, '_aggregate_trades', fail)
+    report = monitor.generate_performance_report()
+    assert report['per_crypto'] == expected
+    assert report['summary']['total_trades'] == 3
+
+
+def test_performance_export_is_throttled(tmp_path, monkeypatch):
+    monitor = PerformanceMonitor(str(tmp_path), export_interval=60)
+    exports = []
+    update = monitor.update_performance_metrics
+    monkeypatch.setattr(monitor, 'update_performance_metrics', lambda: (exports.append(1), update()))
+
+    for i in range(50):
+        monitor.record_trade(sell('SOL/USDT', 1.0, f'2024-01-01T10:00:{i:02d}'))
+    # O arquivo foi exportado na criação do monitor; as operações esperam o intervalo ou o close
+    assert exports == []
+    with open(monitor.performance_file) as f:
+        assert json.load(f)['total_trades'] == 0
+
+    monitor.close()
+    assert len(exports) == 1
+    with open(monitor.performance_file) as f:
+        assert json.load(f)['total_trades'] == 50
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from src.backtesting import Backtest
+from src.portfolio import PortfolioBacktest, align_symbols
+from src.strategies import MovingAverageCrossover
+from tests.test_backtest import make_data
+
+
+def open_counts(trades, timestamps):
+    """Posições abertas ao fim de cada barra, reconstruídas dos trades."""
+    counts = np.zeros(len(timestamps), dtype=int)
+    for trade in trades:
+        start, end = np.searchsorted(timestamps, [trade['entry_time'], trade['exit_time']])
+        counts[start:end] += 1
+    return counts
+
+
+def test_single_symbol_all_in_matches_backtest():
+    data = make_data(2000)
+    strategy = MovingAverageCrossover(fast_period=5, slow_period=13)
+    config = {'risk': {'stop_loss_pct': 1.0, 'take_profit_pct': 2.0}}
+
+    result = PortfolioBacktest(config, max_positions=1, allocation='equal_slots').run({'SOL/USDT': data}, strategy)
+    backtest = Backtest(config)
+    trades = backtest.apply_strategy(data, strategy)
+    expected = backtest.calculate_metrics(trades, 10000, data)['equity_curve']
+
+    assert [t['exit_time'] for t in result['trades']] == [t['exit_time'] for t in trades]
+    assert np.allclose(result['equity_curve'], expected, rtol=1e-9)
+
+
+def test_position_cap_and_shared_cash():
+    data = {f'COIN{i}/USDT': make_data(3000, seed=i) for i in range(6)}
+    strategy = MovingAverageCrossover(fast_period=5, slow_period=13)
+
+    result = PortfolioBacktest({'portfolio': {'max_open_positions': 2}}).run(data, strategy, initial_capital=6000)
+    metrics = result['metrics']
+    timestamps = data['COIN0/USDT']['timestamp'].to_numpy()
+
+    assert metrics['max_open_positions'] == 2
+    assert metrics['skipped_trades'] > 0
+    assert open_counts(result['trades'], timestamps).tolist() == result['open_positions']
+    # Alocação por símbolo como no bot ao vivo: capital / número de símbolos
+    assert all(t['quantity'] * t['entry_price'] <= 1000 + 1e-6 for t in result['trades'])
+
+    profit = sum(t['quantity'] * (t['exit_price'] - t['entry_price']) for t in result['trades'])
+    assert result['equity_curve'][-1] == pytest.approx(6000 + profit)
+
+
+def test_equity_fraction_allocation_never_overspends():
+    data = {f'COIN{i}/USDT': make_data(3000, seed=10 + i) for i in range(5)}
+    config = {'risk': {'max_position_size': 0.4}, 'portfolio': {'max_open_positions': 5}}
+
+    result = PortfolioBacktest(config, allocation='max_position_size').run(
+        data, MovingAverageCrossover(fast_period=5, slow_period=13))
+    trades = result['trades']
+
+    timestamps = data['COIN0/USDT']['timestamp'].to_numpy()
+    cash = np.full(len(timestamps) + 1, 10000.0)
+    for trade in trades:
+        start, end = np.searchsorted(timestamps, [trade['entry_time'], trade['exit_time']])
+        cash[start:] -= trade['quantity'] * trade['entry_price']
+        cash[end:] += trade['quantity'] * trade['exit_price']
+
+    assert trades[0]['quantity'] * trades[0]['entry_price'] == pytest.approx(4000)
+    assert cash.min() >= -1e-6
+    assert result['metrics']['skipped_trades'] > 0
+
+
+def test_symbols_with_different_histories_are_aligned():
+    early = make_data(100, seed=1)
+    late = make_data(60, seed=2).iloc[::2]  # barras faltando
+    late = late.assign(timestamp=late['timestamp'] + (early['timestamp'].iloc[40] - late['timestamp'].iloc[0]))
+
+    grid, close, rows = align_symbols({'A': early, 'B': late})
+
+    assert len(grid) == 100
+    assert np.all(close[:40, 1] == 0)
+    assert close[41, 1] == late['close'].iloc[0]  # barra ausente herda o último fechamento
+    assert np.array_equal(close[rows[1], 1], late['close'].to_numpy())
+
+    with pytest.raises(ValueError):
+        PortfolioBacktest({}, allocation='kelly')
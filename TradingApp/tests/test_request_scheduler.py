@@ -0,0 +1,125 @@
+import asyncio
+import time
+
+from src.market_data import AsyncMarketData
+from src.request_scheduler import RequestScheduler, TokenBucket
+
+
+class RateLimitExceeded(Exception):
+    """Mesmo nome do erro da ccxt."""
+
+
+class RecordingExchange:
+    """Exchange falsa que registra a ordem e o instante das chamadas."""
+
+    def __init__(self, latency=0.01, rate_limited=0):
+        self.latency = latency
+        self.rate_limited = rate_limited
+        self.calls = []
+
+    async def _call(self, method, *args):
+        self.calls.append((method, args, time.perf_counter()))
+        await asyncio.sleep(self.latency)
+        if self.rate_limited:
+            self.rate_limited -= 1
+            raise RateLimitExceeded("429")
+        return {'method': method, 'args': args}
+
+    async def fetch_ticker(self, symbol):
+        return await self._call('fetch_ticker', symbol)
+
+    async def fetch_ohlcv(self, symbol, timeframe='5m', limit=100):
+        return await self._call('fetch_ohlcv', symbol)
+
+    async def create_order(self, symbol, type, side, amount, price=None):
+        return await self._call('create_order', symbol, side)
+
+
+def test_token_bucket_refills_over_time():
+    now = [0.0]
+    bucket = TokenBucket(10, 5, clock=lambda: now[0])
+    bucket.consume(10)
+    assert bucket.wait_time(5) == 1.0
+    now[0] = 0.5
+    assert bucket.wait_time(5) == 0.5
+    now[0] = 10.0
+    assert bucket.wait_time(5) == 0.0
+    assert bucket.tokens == 10
+
+
+def test_weight_limit_spreads_requests():
+    exchange = RecordingExchange(latency=0.0)
+
+    async def run():
+        async with RequestScheduler(exchange, limits={'weight': (10, 0.1)}) as scheduler:
+            await asyncio.gather(*(scheduler.fetch_ohlcv(f'COIN{i}/USDT') for i in range(30)))
+            return scheduler.stats()
+
+    start = time.perf_counter()
+    stats = asyncio.run(run())
+    # 60 de peso com capacidade 10 e reposição de 100/s: ao menos 0,5s
+    assert time.perf_counter() - start >= 0.45
+    assert stats['fetch_ohlcv']['requests'] == 30
+    assert stats['fetch_ohlcv']['max_queue_ms'] > 400
+
+
+def test_orders_jump_ahead_of_market_data():
+    exchange = RecordingExchange(latency=0.0)
+
+    async def run():
+        async with RequestScheduler(exchange, limits={'weight': (4, 0.1)}, max_in_flight=1) as scheduler:
+            polls = [asyncio.ensure_future(scheduler.fetch_ohlcv(f'COIN{i}/USDT')) for i in range(10)]
+            await asyncio.sleep(0.01)
+            await scheduler.create_order('SOL/USDT', 'market', 'buy', 1.0)
+            await asyncio.gather(*polls)
+
+    asyncio.run(run())
+    methods = [call[0] for call in exchange.calls]
+    assert methods.index('create_order') <= 4
+
+
+def test_duplicate_fetches_are_coalesced():
+    exchange = RecordingExchange(latency=0.05)
+
+    async def run():
+        async with RequestScheduler(exchange) as scheduler:
+            results = await asyncio.gather(*(scheduler.fetch_ticker('SOL/USDT') for _ in range(20)))
+            await scheduler.fetch_ticker('SOL/USDT')
+            return results, scheduler.stats()
+
+    results, stats = asyncio.run(run())
+    assert all(result == results[0] for result in results)
+    assert len(exchange.calls) == 2
+    assert stats['fetch_ticker']['coalesced'] == 19
+
+    # Cada chamador agrupado recebe sua própria cópia
+    assert len({id(result) for result in results}) == 20
+    results[0]['method'] = 'changed'
+    assert all(result['method'] != 'changed' for result in results[1:])
+
+
+def test_rate_limit_error_backs_off_and_retries():
+    exchange = RecordingExchange(latency=0.0, rate_limited=1)
+
+    async def run():
+        async with RequestScheduler(exchange, limits={'weight': (10, 0.1)}) as scheduler:
+            result = await scheduler.create_order('SOL/USDT', 'market', 'buy', 1.0)
+            return result, scheduler.stats()
+
+    result, stats = asyncio.run(run())
+    assert result['method'] == 'create_order'
+    assert stats['create_order']['rate_limited'] == 1
+    # O retry esperou o balde esvaziado encher de novo
+    assert exchange.calls[1][2] - exchange.calls[0][2] > 0.005
+
+
+def test_scheduler_is_a_drop_in_exchange_for_market_data():
+    exchange = RecordingExchange(latency=0.01)
+
+    async def run():
+        async with RequestScheduler(exchange) as scheduler:
+            return await AsyncMarketData(exchange=scheduler).poll(['A/USDT', 'B/USDT'])
+
+    snapshot = asyncio.run(run())
+    assert sorted(snapshot['ohlcv']) == ['A/USDT', 'B/USDT']
+    assert snapshot['errors'] == {}
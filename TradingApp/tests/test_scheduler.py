@@ -0,0 +1,90 @@
+import asyncio
+
+from src.backtesting import SIGNAL_CODES, Backtest
+from src.scheduler import CandleCloseScheduler, ReplayFeed, candle_open_time, next_candle_close, strategy_dispatcher
+from src.strategies import MovingAverageCrossover, create_strategy
+from tests.test_backtest import make_data
+
+MINUTE = 60 * 1000
+
+
+def test_next_candle_close_is_aligned_with_offset():
+    now = 1704067200000 + 7 * MINUTE + 1234  # 2024-01-01 00:07:01.234 UTC
+    assert next_candle_close(now, '5m') == 1704067200000 + 10 * MINUTE
+    assert next_candle_close(now, '5m', offset=2.0) == 1704067200000 + 10 * MINUTE + 2000
+    # Dentro do offset do fechamento anterior ainda espera por ele
+    assert next_candle_close(1704067200000 + 10 * MINUTE + 500, '5m', offset=2.0) == 1704067200000 + 10 * MINUTE + 2000
+    assert next_candle_close(now, '1h') == 1704067200000 + 60 * MINUTE
+    # Candles semanais abrem na segunda-feira e mensais no dia 1
+    assert candle_open_time(1704499200000, '1w') == 1704067200000  # sáb 2024-01-06 -> seg 2024-01-01
+    assert next_candle_close(1706745600000 + 1, '1M') == 1709251200000  # fev/2024 -> 2024-03-01
+
+
+def test_replay_dispatches_each_closed_candle_once():
+    data = make_data(50)
+    delivered = []
+
+    scheduler = CandleCloseScheduler(['BTC/USDT', 'ETH/USDT'], '5m', lambda s, bar: delivered.append((s, bar)))
+    feed = ReplayFeed({'BTC/USDT': data, 'ETH/USDT': data}, '5m', ticks_per_bar=4)
+    assert asyncio.run(scheduler.consume(feed)) == 100
+
+    btc = [bar for symbol, bar in delivered if symbol == 'BTC/USDT']
+    assert [bar.close for bar in btc] == data['close'].tolist()
+    assert [bar.high for bar in btc] == data['high'].tolist()
+    assert scheduler.dispatched == {'BTC/USDT': 50, 'ETH/USDT': 50}
+
+
+def test_unmarked_stream_closes_candle_on_next_bar():
+    data = make_data(10)
+    delivered = []
+
+    scheduler = CandleCloseScheduler(['BTC/USDT'], '5m', lambda s, bar: delivered.append(bar))
+    feed = ReplayFeed({'BTC/USDT': data}, '5m', ticks_per_bar=3, mark_closed=False)
+    asyncio.run(scheduler.consume(feed))
+
+    # O último candle só fecha quando chegar o seguinte
+    assert [bar.close for bar in delivered] == data['close'].tolist()[:-1]
+    assert scheduler.pending['BTC/USDT'][4] == data['close'].iloc[-1]
+
+
+def test_streaming_signals_match_backtest():
+    data = make_data(400)
+    config = {'strategy': {'type': 'moving_average_crossover', 'fast_period': 5, 'slow_period': 20}}
+    signals = []
+
+    strategies = {'BTC/USDT': create_strategy(config)}
+    on_candle = strategy_dispatcher(strategies, lambda s, signal, bar: signals.append((bar.timestamp, signal)))
+    scheduler = CandleCloseScheduler(['BTC/USDT'], '5m', on_candle)
+    asyncio.run(scheduler.consume(ReplayFeed({'BTC/USDT': data}, '5m', ticks_per_bar=2)))
+
+    # A sequência transmitida é idêntica à dos sinais do backtest, barra a barra
+    backtest = Backtest({})
+    codes = backtest.compute_signals(data, MovingAverageCrossover(5, 20))
+    stamps = data['timestamp'].to_numpy().astype('datetime64[ms]').astype('int64')
+    names = {code: name for name, code in SIGNAL_CODES.items()}
+    assert signals == [(int(ts), names[code]) for ts, code in zip(stamps, codes) if code]
+
+    expected = backtest.apply_strategy(data, MovingAverageCrossover(5, 20))
+    entries = [int(t['entry_time'].timestamp() * 1000) for t in expected]
+    assert [ts for ts, signal in signals if signal == 'BUY'] == entries
+
+
+def test_run_wakes_after_candle_close(monkeypatch):
+    clock = [1704067200.0 + 59.5]
+    delivered = []
+
+    async def sleep_and_advance(delay):
+        clock[0] += delay
+
+    monkeypatch.setattr(asyncio, 'sleep', sleep_and_advance)
+    scheduler = CandleCloseScheduler(['BTC/USDT'], '1m', lambda s, bar: delivered.append(bar),
+                                     offset=0.25, clock=lambda: clock[0])
+
+    async def run():
+        await scheduler.update('BTC/USDT', [1704067200000, 1.0, 2.0, 0.5, 1.5, 10.0])
+        assert delivered == []
+        return await scheduler.run(max_cycles=1)
+
+    assert asyncio.run(run()) == 1
+    assert clock[0] == 1704067200.0 + 60.25
+    assert [bar.close for bar in delivered] == [1.5]
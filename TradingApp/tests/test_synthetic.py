@@ -0,0 +1,39 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.synthetic import MODELS, generate_ohlcv
+from src.timeframes import periods_per_year, timeframe_to_seconds
+
+
+@pytest.mark.parametrize('model', MODELS)
+def test_ohlc_invariants(model):
+    data = generate_ohlcv(50000, '5m', seed=3, model=model)
+
+    assert len(data) == 50000
+    assert (data['low'] <= data[['open', 'close']].min(axis=1)).all()
+    assert (data['high'] >= data[['open', 'close']].max(axis=1)).all()
+    assert (data['open'].to_numpy()[1:] == data['close'].to_numpy()[:-1]).all()
+    assert (data['volume'] > 0).all()
+    assert (data['timestamp'].diff().dropna() == pd.Timedelta(minutes=5)).all()
+
+
+def test_seed_is_reproducible():
+    first = generate_ohlcv(1000, '1h', seed=42)
+    pd.testing.assert_frame_equal(first, generate_ohlcv(1000, '1h', seed=42))
+    assert not np.array_equal(first['close'], generate_ohlcv(1000, '1h', seed=43)['close'])
+
+
+def test_end_date_bounds_bars():
+    data = generate_ohlcv(timeframe='5m', start=datetime(2024, 1, 1), end=datetime(2024, 1, 2), seed=1)
+    assert len(data) == 289
+    assert data['timestamp'].iloc[-1] == pd.Timestamp('2024-01-02')
+
+
+def test_timeframes():
+    assert timeframe_to_seconds('5m') == 300
+    assert periods_per_year('5m') == 105120
+    with pytest.raises(ValueError):
+        timeframe_to_seconds('5x')
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from src.indicators import compute_indicators
+from src.optimizer import run_sweep
+from src.walk_forward import _select_best, evaluate_window, run_walk_forward, walk_forward_folds
+from tests.test_backtest import make_data
+
+CONFIG = {
+    'risk': {'stop_loss_pct': 2.0, 'take_profit_pct': 4.0},
+    'strategy': {'type': 'moving_average_crossover', 'fast_period': 9, 'slow_period': 21},
+}
+SPACE = {'fast_period': [5, 9, 13], 'slow_period': [21, 30]}
+
+
+def test_rolling_and_anchored_folds():
+    assert walk_forward_folds(1000, 400, 250) == [(0, 400, 400, 650), (250, 650, 650, 900), (500, 900, 900, 1000)]
+    assert walk_forward_folds(1000, 400, 300, anchored=True) == [(0, 400, 400, 700), (0, 700, 700, 1000)]
+    assert walk_forward_folds(300, 400, 100) == []
+    with pytest.raises(ValueError):
+        walk_forward_folds(1000, 0, 100)
+
+
+def test_evaluate_window_reuses_precomputed_indicators(monkeypatch):
+    data = make_data(3000)
+    indicators = compute_indicators(data['close'].to_numpy(), [('sma', 5), ('sma', 21)])
+    expected, _, _ = evaluate_window(CONFIG, data, {}, {'fast_period': 5}, 0, 3000)
+
+    def fail(*args):
+        raise AssertionError("indicator recomputed")
+
+    monkeypatch.setattr('src.strategies.sma', fail)
+    metrics, equity, position = evaluate_window(CONFIG, data, indicators, {'fast_period': 5}, 0, 3000)
+    assert metrics == expected
+    assert len(equity) == len(position) == 3000
+
+    # Fatias herdam o aquecimento das médias: há sinais desde a primeira barra do trecho
+    later, _, _ = evaluate_window(CONFIG, data, indicators, {'fast_period': 5}, 1000, 1100)
+    assert later['total_trades'] > 0
+
+
+def test_walk_forward_stitches_out_of_sample_folds():
+    data = make_data(6000)
+    result = run_walk_forward(CONFIG, data, SPACE, train_size=2000, test_size=1000, workers=2)
+    folds = result['folds']
+    equity = result['equity_curve']
+
+    assert len(folds) == 4
+    assert len(equity) == 4000
+    assert equity.index[0] == data['timestamp'].iloc[2000]
+    assert {'fast_period', 'slow_period', 'train_sharpe_ratio', 'profit_loss', 'total_trades'} <= set(folds.columns)
+
+    # O primeiro treino começa na barra 0, então coincide com um sweep só no treino
+    sweep = run_sweep(CONFIG, data.iloc[:2000], SPACE, workers=1)
+    assert folds.loc[0, ['fast_period', 'slow_period']].tolist() == sweep.loc[0, ['fast_period', 'slow_period']].tolist()
+    assert folds.loc[0, 'train_sharpe_ratio'] == pytest.approx(sweep.loc[0, 'sharpe_ratio'])
+
+    # Cada fold começa do capital final do anterior e rende o retorno do seu teste
+    fold_returns = np.prod(1 + folds['profit_loss'].to_numpy() / 100)
+    assert equity.iloc[-1] == pytest.approx(10000 * fold_returns)
+    assert result['metrics']['profit_loss'] == pytest.approx((fold_returns - 1) * 100)
+
+
+def test_windows_without_trades_get_full_metrics_and_rank_last():
+    data = make_data(3000)
+    # Janela curta demais para as médias cruzarem: nenhum trade
+    metrics, equity, _ = evaluate_window(CONFIG, data, {}, {'fast_period': 5}, 0, 15)
+    traded, _, _ = evaluate_window(CONFIG, data, {}, {'fast_period': 5}, 0, 3000)
+
+    assert metrics['total_trades'] == 0
+    assert set(metrics) == set(traded)
+    assert metrics['exposure'] == 0.0 and metrics['profit_loss'] == 0.0
+    assert (equity == 10000).all()
+
+    rows = [metrics, {**traded, 'sharpe_ratio': -1.5}, {**traded, 'sharpe_ratio': -0.5}]
+    assert _select_best(rows, 'sharpe_ratio') == 2